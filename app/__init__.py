@@ -1,47 +1,86 @@
-from datetime import date
-from flask import Flask, request, abort, redirect, url_for
+import time
+from flask import Flask, Response, g, request, abort
 from flask_login import LoginManager
-from flask_talisman import Talisman
 from flask_wtf import CSRFProtect
-from werkzeug.security import generate_password_hash
 from werkzeug.middleware.proxy_fix import ProxyFix
 
-from app.auth import AuthHandler
-from app.database import add_employee, add_review, get_session, init_engine
+from app.database import (
+    get_session,
+    init_engine,
+    init_schema,
+    remove_session,
+    seed_initial_data,
+)
 from app.models import Employee
 from config import Config
 
+# Each feature's modules are imported by the phase that sets it up, so
+# importing the package stays cheap and disabled features are never loaded
+
 
 class AppFactory:
     def __init__(self):
         self.app = None
-        self.session = None
         self.csrf = CSRFProtect()
         self.login_manager = LoginManager()
         self.auth_handler = None
+        self.user_cache = None
 
     def create_app(self, config=None):
         """Set up and return the Flask app"""
         self.app = Flask(__name__)
 
-        # Apply proxy fix if the app is behind a reverse proxy
-        self.app.wsgi_app = ProxyFix(self.app.wsgi_app, x_for=1)
+        # Call all functions of AppFactory, timing each phase of startup
+        phases = [
+            ("configure", lambda: self._configure_app(config)),
+            ("middleware", self._install_middleware),
+            ("csrf", lambda: self.csrf.init_app(self.app)),
+            ("database", self._init_database),
+            ("auth", self._init_auth_handler),
+            ("login_manager", self._login_manager),
+            ("availability", self._init_availability_index),
+            ("fragment_cache", self._init_fragment_cache),
+            ("assets", self._init_assets),
+            ("populate", self._populate_database),
+            # Register app blueprints and CLI commands
+            ("blueprints", self._register_blueprints),
+            ("commands", self._register_commands),
+            # Apply security measures
+            ("security", self._apply_security),
+            ("admission", self._init_admission),
+            ("query_budget", self._init_query_budget),
+        ]
+        timings = {}
+        for name, phase in phases:
+            start = time.perf_counter()
+            phase()
+            timings[name] = time.perf_counter() - start
 
-        # Call all functions of AppFactory
-        self._configure_app(config)
-        self.csrf.init_app(self.app)
-        self._init_database()
-        self._init_auth_handler()
-        self._login_manager()
-        self._populate_database()
+        self.app.extensions["startup_timings"] = timings
+        self.app.logger.info(
+            "App created in %.1f ms (%s)",
+            sum(timings.values()) * 1000,
+            ", ".join(
+                f"{name} {seconds * 1000:.1f}" for name, seconds in timings.items()
+            ),
+        )
 
-        # Register app blueprints
-        self._register_blueprints()
+        return self.app
 
-        # Apply security measures
-        self._apply_security()
+    def _install_middleware(self):
+        """Wrap the WSGI app in compression and proxy middleware"""
+        # Compress text responses for clients that accept it
+        if self.app.config["COMPRESSION_LEVEL"] > 0:
+            from app.compression import CompressionMiddleware
 
-        return self.app
+            self.app.wsgi_app = CompressionMiddleware(
+                self.app.wsgi_app,
+                level=self.app.config["COMPRESSION_LEVEL"],
+                brotli_quality=self.app.config["COMPRESSION_BROTLI_QUALITY"],
+                min_size=self.app.config["COMPRESSION_MIN_SIZE"],
+            )
+        # Apply proxy fix if the app is behind a reverse proxy
+        self.app.wsgi_app = ProxyFix(self.app.wsgi_app, x_for=1)
 
     def _configure_app(self, config):
         """Load configuration"""
@@ -55,63 +94,252 @@ class AppFactory:
         self.login_manager.login_view = "auth.login"
         self.login_manager.init_app(self.app)
 
+        from app.cache import CachedUser, LRUCache
+
+        # Cache loaded employees so most requests skip the user query
+        self.user_cache = LRUCache(
+            self.app.config["USER_CACHE_SIZE"], self.app.config["USER_CACHE_TTL"]
+        )
+        self.app.extensions["user_cache"] = self.user_cache
+
         # Retrieve current user
         @self.login_manager.user_loader
         def load_user(employee_number):
-            return self.session.query(Employee).get(employee_number)
+            try:
+                employee_number = int(employee_number)
+            except ValueError:
+                return None
+
+            user = self.user_cache.get(employee_number)
+            if user is None:
+                employee = get_session().query(Employee).get(employee_number)
+                if employee is None:
+                    return None
+                user = CachedUser(employee)
+                self.user_cache.set(employee_number, user)
+            return user
 
     def _init_database(self):
         """Initialize the database within the app context."""
+        # In fast boot mode the schema is left to the init-db command
+        fast_boot = self.app.config["FAST_BOOT"]
+
         # Use app config for database URI
         with self.app.app_context():
-            init_engine(self.app.config["SQLALCHEMY_DATABASE_URI"])
+            init_engine(self.app.config["SQLALCHEMY_DATABASE_URI"], self.app.config)
 
-        from app.database import Base, engine
+        from app.database import engine
 
         if engine is None:
             raise RuntimeError("Engine is not initialized")
 
-        Base.metadata.create_all(engine)
-        self.session = get_session()
+        if not fast_boot:
+            init_schema(engine)
+
+        # Close each app/request context's session once it is torn down
+        self.app.teardown_appcontext(remove_session)
 
     def _init_auth_handler(self):
-        """Initialize the AuthHandler with the session"""
-        self.auth_handler = AuthHandler(self.session)
+        """Initialize the AuthHandler with the password hasher"""
+        from app.auth import AuthHandler
+        from app.passwords import PasswordHasher
 
-    def _populate_database(self):
-        """Populate the database with initial data if the tables are empty"""
-        # Add admin
-        add_employee(
-            self.session,
-            "John Doe",
-            101,
-            "johndoe1234",
-            "john.doe@example.com",
-            password=generate_password_hash("Password123!"),
-            is_admin=True,
+        password_hasher = PasswordHasher(
+            self.app.config["PASSWORD_HASH_METHOD"],
+            self.app.config["PASSWORD_HASH_WORKERS"],
+            self.app.config["PASSWORD_HASH_TIMEOUT"],
+        )
+        self.app.extensions["password_hasher"] = password_hasher
+        self.auth_handler = AuthHandler(password_hasher)
+
+    def _init_availability_index(self):
+        """Index existing usernames and emails for the availability check"""
+        from app.availability import AvailabilityIndex, load_employee_identities
+
+        self.app.extensions["availability_index"] = AvailabilityIndex(
+            lambda: load_employee_identities(get_session()),
+            self.app.config["AVAILABILITY_REFRESH_INTERVAL"],
         )
 
-        # Add a review for that employee (assuming employee_number 101 exists)
-        add_review(
-            self.session,
-            101,
-            date(2024, 9, 4),
-            202,
-            "Excellent",
-            "My main goal is to take part in leadership opportunities in the next term.",
-            "John has shown great progress in his career goals.",
+    def _init_fragment_cache(self):
+        """Cache rendered review cards, bounded by REVIEW_CARD_CACHE_SIZE entries"""
+        from app.cache import LRUCache
+        from app.fragments import render_review_card
+
+        if self.app.config["REVIEW_CARD_CACHE_SIZE"] > 0:
+            self.app.extensions["review_card_cache"] = LRUCache(
+                self.app.config["REVIEW_CARD_CACHE_SIZE"]
+            )
+        self.app.add_template_global(render_review_card, "review_card")
+
+    def _init_assets(self):
+        """Load the asset manifest and pinned digests and expose the template helpers"""
+        from app.assets import (
+            asset_integrity,
+            asset_url,
+            load_manifest,
+            load_vendor_integrity,
         )
 
+        self.app.extensions["asset_manifest"] = load_manifest(self.app.static_folder)
+        self.app.extensions["vendor_integrity"] = load_vendor_integrity()
+        self.app.add_template_global(asset_url, "asset_url")
+        self.app.add_template_global(asset_integrity, "asset_integrity")
+
+    def _populate_database(self):
+        """Populate the database with initial data if the tables are empty"""
+        # In fast boot mode seeding is left to the init-db command
+        if self.app.config["FAST_BOOT"]:
+            return
+
+        with self.app.app_context():
+            seed_initial_data(
+                get_session(), self.app.extensions["password_hasher"]
+            )
+
     def _register_blueprints(self):
         """Register blueprints"""
         from app.routes import main as main_blueprint
+        from app.api import api as api_blueprint
+        from app.assets import assets as assets_blueprint
 
         self.app.register_blueprint(main_blueprint)
+        self.app.register_blueprint(api_blueprint)
+        self.app.register_blueprint(assets_blueprint)
 
         self.app.register_blueprint(self.auth_handler.auth_bp)
 
+    def _register_commands(self):
+        """Register CLI commands"""
+        from app.commands import (
+            build_assets_command,
+            generate_data_command,
+            import_reviews_command,
+            init_db_command,
+            rebuild_review_summaries_command,
+            startup_report_command,
+        )
+
+        self.app.cli.add_command(import_reviews_command)
+        self.app.cli.add_command(rebuild_review_summaries_command)
+        self.app.cli.add_command(build_assets_command)
+        self.app.cli.add_command(init_db_command)
+        self.app.cli.add_command(startup_report_command)
+        self.app.cli.add_command(generate_data_command)
+
+    def _init_metrics(self):
+        """Record request, SQL and pool metrics and serve them at /metrics"""
+        # Route names, latencies and cache stats are not for the public
+        if not self.app.config["METRICS_TOKEN"]:
+            raise RuntimeError("METRICS_ENABLED requires METRICS_TOKEN to be set")
+
+        import hmac
+        from app.metrics import Metrics, cache_collector, pool_collector
+
+        metrics = Metrics()
+        self.app.extensions["metrics"] = metrics
+
+        from app import database
+
+        metrics.instrument_engine(database.engine)
+        metrics.collectors.append(pool_collector(lambda: database.engine))
+        for name in ["user_cache", "review_card_cache"]:
+            if name in self.app.extensions:
+                metrics.collectors.append(
+                    cache_collector(name, self.app.extensions[name])
+                )
+
+        @self.app.before_request
+        def start_request_metrics():
+            metrics.start_request(request.endpoint)
+
+        @self.app.after_request
+        def record_response_metrics(response):
+            metrics.record_response(
+                request.endpoint, request.method, response.status_code
+            )
+            return response
+
+        @self.app.teardown_request
+        def finish_request_metrics(exception=None):
+            metrics.finish_request(request.endpoint, request.method)
+
+        def metrics_view():
+            token = self.app.config["METRICS_TOKEN"]
+            if not hmac.compare_digest(
+                request.headers.get("Authorization", ""), f"Bearer {token}"
+            ):
+                abort(404)
+            return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+        self.app.add_url_rule("/metrics", "metrics", metrics_view)
+
+    def _init_query_budget(self):
+        """Check each request's SQL statements against its route's budget"""
+        if not (
+            self.app.config["QUERY_BUDGET_ENABLED"]
+            or self.app.debug
+            or self.app.testing
+        ):
+            return
+
+        from app.query_budget import QueryBudget
+
+        # Over budget routes fail in tests and are logged otherwise
+        query_budget = QueryBudget(
+            self.app.config["QUERY_BUDGETS"],
+            self.app.config["QUERY_REPEAT_THRESHOLD"],
+            strict=self.app.testing,
+        )
+        self.app.extensions["query_budget"] = query_budget
+
+        from app.database import engine
+
+        query_budget.instrument_engine(engine)
+        self.app.before_request(query_budget.start_request)
+        self.app.after_request(query_budget.check)
+
+    def _init_admission(self):
+        """Shed expensive requests once their route is saturated"""
+        from app.admission import AdmissionController
+
+        admission = AdmissionController(
+            self.app.config["ADMISSION_LIMITS"],
+            self.app.config["ADMISSION_TOTAL_LIMIT"],
+            self.app.config["ADMISSION_QUEUE_TIMEOUT"],
+        )
+        self.app.extensions["admission"] = admission
+        if "metrics" in self.app.extensions:
+            from app.metrics import admission_collector
+
+            self.app.extensions["metrics"].collectors.append(
+                admission_collector(admission)
+            )
+
+        @self.app.before_request
+        def admit_expensive_requests():
+            gate = admission.gate_for(request)
+            if gate is None:
+                return None
+            if not admission.admit(gate):
+                return (
+                    "503 Service Unavailable: The server is busy. Please try again shortly.",
+                    503,
+                    {"Retry-After": str(self.app.config["ADMISSION_RETRY_AFTER"])},
+                )
+            g.admission_gate = gate
+
+        @self.app.teardown_request
+        def release_admission(exception=None):
+            gate = g.pop("admission_gate", None)
+            if gate is not None:
+                admission.release(gate)
+
     def _apply_security(self):
         """Apply security measures like blocking TRACE, TRACK, OPTIONS methods and removing sensitive headers"""
+        # Registered first so every other hook's time and responses are measured
+        if self.app.config["METRICS_ENABLED"]:
+            self._init_metrics()
 
         # Block TRACE, TRACK, and OPTIONS methods
         @self.app.before_request
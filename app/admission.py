@@ -0,0 +1,137 @@
+import threading
+import time
+
+# Requests on each limited route that are expensive enough to limit, the rest
+# of the route's requests pass straight through
+EXPENSIVE_REQUESTS = {
+    # Password hashing
+    "auth.login": lambda request: request.method == "POST",
+    "auth.register": lambda request: request.method == "POST",
+    # Every employee's reviews
+    "main.home": lambda request: "all_reviews" in request.args,
+    "api.list_reviews": lambda request: "all_reviews" in request.args,
+    "main.export_reviews": lambda request: True,
+    # Unauthenticated lookups of registered usernames and emails, bounded so
+    # they cannot be used to enumerate accounts at full speed
+    "api.check_availability": lambda request: True,
+}
+
+
+class Gate:
+    """Concurrency limit with a bounded queue of waiting requests"""
+
+    def __init__(self, limit, queue):
+        self.limit = limit
+        self.queue = queue
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, timeout):
+        """Take a slot, waiting up to timeout seconds, or return False"""
+        with self._condition:
+            if self.active < self.limit:
+                self.active += 1
+                return True
+            if self.waiting >= self.queue:
+                self.rejected += 1
+                return False
+
+            self.waiting += 1
+            deadline = time.monotonic() + timeout
+            try:
+                while self.active >= self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.rejected += 1
+                        return False
+                    self._condition.wait(remaining)
+            finally:
+                self.waiting -= 1
+            self.active += 1
+            return True
+
+    def reject(self):
+        """Count a request turned away before reaching the gate"""
+        with self._condition:
+            self.rejected += 1
+
+    def release(self):
+        """Free a slot and wake the next waiting request"""
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+    def stats(self):
+        """Return the active, waiting and rejected counters"""
+        with self._condition:
+            return {
+                "active": self.active,
+                "waiting": self.waiting,
+                "rejected": self.rejected,
+            }
+
+
+class AdmissionController:
+    """Shed load on expensive routes so cheap routes keep a free worker thread
+
+    Each limited route has its own gate. When total_limit is set, all expensive
+    requests together, running or queued, are also capped at it so they can
+    never occupy every thread of a worker.
+    """
+
+    def __init__(self, limits, total_limit, timeout):
+        self.gates = {
+            endpoint: Gate(limit, queue) for endpoint, (limit, queue) in limits.items()
+        }
+        if total_limit:
+            too_small = [
+                endpoint
+                for endpoint, (limit, queue) in limits.items()
+                if limit + queue > total_limit
+            ]
+            if too_small:
+                raise ValueError(
+                    f"ADMISSION_TOTAL_LIMIT {total_limit} is below the limit plus "
+                    f"queue of {', '.join(too_small)}"
+                )
+        self.total_limit = total_limit
+        self.timeout = timeout
+        self.admitted = 0
+        self._lock = threading.Lock()
+
+    def gate_for(self, request):
+        """Return the gate the request must pass, or None for cheap requests"""
+        gate = self.gates.get(request.endpoint)
+        # Routes without an entry in EXPENSIVE_REQUESTS are limited on every request
+        is_expensive = EXPENSIVE_REQUESTS.get(request.endpoint, lambda request: True)
+        if gate is None or not is_expensive(request):
+            return None
+        return gate
+
+    def admit(self, gate):
+        """Return True once the request holds a slot of the gate"""
+        with self._lock:
+            if self.total_limit and self.admitted >= self.total_limit:
+                gate.reject()
+                return False
+            self.admitted += 1
+
+        if gate.acquire(self.timeout):
+            return True
+        self._leave()
+        return False
+
+    def release(self, gate):
+        """Give back the slot taken by admit"""
+        gate.release()
+        self._leave()
+
+    def _leave(self):
+        with self._lock:
+            self.admitted -= 1
+
+    def stats(self):
+        """Return the counters of every gate"""
+        return {endpoint: gate.stats() for endpoint, gate in self.gates.items()}
@@ -0,0 +1,235 @@
+import hashlib
+from flask import Blueprint, abort, current_app, jsonify, request
+from flask_login import current_user, login_required
+from app.availability import AVAILABILITY_FIELDS
+from app.database import get_session
+from app.models import Review
+from app.pagination import keyset_page
+
+# Create blueprint
+api = Blueprint("api", __name__, url_prefix="/api")
+
+
+def review_to_dict(review):
+    """Return the JSON representation of a review"""
+    return {
+        "review_id": review.review_id,
+        "employee_number": review.employee_number,
+        "review_date": review.review_date.isoformat(),
+        "reviewer_id": review.reviewer_id,
+        "overall_performance_rating": review.overall_performance_rating,
+        "goals": review.goals,
+        "reviewer_comments": review.reviewer_comments,
+        "version": review.version_id,
+    }
+
+
+# Enough of a review to page, authorise and tag it without loading its text
+REVIEW_KEY_COLUMNS = (
+    Review.review_id,
+    Review.version_id,
+    Review.review_date,
+    Review.employee_number,
+)
+
+
+def review_etag(reviews, *extra):
+    """Strong ETag over the id and row version of each review
+
+    Any update bumps the row version and any insert or delete changes the ids,
+    which are never reused, so the tag changes exactly when the representation
+    does. `extra` holds other parts of the response, such as page cursors.
+    """
+    digest = hashlib.sha256()
+    for review in reviews:
+        digest.update(f"{review.review_id}:{review.version_id};".encode())
+    digest.update(repr(extra).encode())
+    return digest.hexdigest()
+
+
+def _tagged(response, etag):
+    response.set_etag(etag)
+    # Clients may keep the response but must revalidate before reusing it
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def not_modified(etag):
+    """Return a 304 response if the client holds the current version, else None"""
+    if request.if_none_match.contains(etag):
+        return _tagged(current_app.response_class(status=304), etag)
+    return None
+
+
+def conditional_json(etag, build):
+    """Return 304 if the client holds the current version, else the JSON from build()
+
+    The body is only built when it is needed, so unchanged polls skip loading
+    the review text, the serialisation and the transfer entirely.
+    """
+    return not_modified(etag) or _tagged(jsonify(build()), etag)
+
+
+def in_id_order(review_ids, rows):
+    """Return the rows in the order of review_ids, leaving out missing ids"""
+    found = {row.review_id: row for row in rows}
+    return [found[review_id] for review_id in review_ids if review_id in found]
+
+
+def load_reviews(review_ids):
+    """Load the full reviews for the given ids in one query, in that order"""
+    query = get_session().query(Review).filter(Review.review_id.in_(review_ids))
+    return in_id_order(review_ids, query)
+
+
+def can_view(review):
+    """Employees can view their own reviews, admins can view all reviews"""
+    return (
+        current_user.is_admin or review.employee_number == current_user.employee_number
+    )
+
+
+def parse_review_ids():
+    """Return the unique ids in the ids argument, in order, or abort with 400"""
+    try:
+        review_ids = list(
+            dict.fromkeys(
+                int(review_id)
+                for review_id in request.args.get("ids", "").split(",")
+                if review_id.strip()
+            )
+        )
+    except ValueError:
+        abort(400, description="Review ids must be integers")
+
+    if not review_ids:
+        abort(400, description="No review ids given")
+    if len(review_ids) > current_app.config["API_MAX_REVIEW_IDS"]:
+        abort(400, description="Too many review ids")
+    return review_ids
+
+
+def page_etag(page):
+    """ETag of a page of review keys and its cursors"""
+    return review_etag(page.items, page.next_cursor, page.prev_cursor)
+
+
+def page_body(page, reviews):
+    """JSON body of a page, given the full reviews for its keys"""
+    return {
+        "reviews": [review_to_dict(review) for review in reviews],
+        "next_cursor": page.next_cursor,
+        "prev_cursor": page.prev_cursor,
+    }
+
+
+def list_response(page, load=load_reviews):
+    """Conditional JSON response for a page of review keys"""
+    review_ids = [key.review_id for key in page.items]
+    return conditional_json(page_etag(page), lambda: page_body(page, load(review_ids)))
+
+
+def batch_response(review_ids, keys, load=load_reviews):
+    """Conditional JSON response for a multi-get, in the order the ids were asked for"""
+    keys = in_id_order(review_ids, keys)
+    return conditional_json(
+        review_etag(keys),
+        lambda: {
+            "reviews": [
+                review_to_dict(review)
+                for review in load([key.review_id for key in keys])
+            ]
+        },
+    )
+
+
+class ReviewAPI:
+    @staticmethod
+    @api.route("/reviews")
+    @login_required
+    def list_reviews():
+        """Return a page of reviews with the same scoping and sorting as home"""
+        session = get_session()
+        sort_order = request.args.get("sort", "newest")
+
+        # Page over the review keys only, the text is loaded if the page changed
+        employee_reviews = session.query(*REVIEW_KEY_COLUMNS)
+        # Check if user is admin before returning all reviews
+        if not (current_user.is_admin and "all_reviews" in request.args):
+            employee_reviews = employee_reviews.filter(
+                Review.employee_number == current_user.employee_number
+            )
+
+        try:
+            page = keyset_page(
+                employee_reviews,
+                sort_order,
+                current_app.config["REVIEWS_PER_PAGE"],
+                after=request.args.get("after"),
+                before=request.args.get("before"),
+            )
+        except ValueError:
+            abort(400, description="Invalid page cursor")
+
+        return list_response(page)
+
+    @staticmethod
+    @api.route("/reviews/<int:review_id>")
+    @login_required
+    def get_review(review_id):
+        """Return a single review"""
+        session = get_session()
+        key = (
+            session.query(*REVIEW_KEY_COLUMNS)
+            .filter(Review.review_id == review_id)
+            .first()
+        )
+
+        # Reviews the user cannot view are reported as missing
+        if key is None or not can_view(key):
+            abort(404)
+
+        return conditional_json(
+            review_etag([key]), lambda: review_to_dict(session.get(Review, review_id))
+        )
+
+    @staticmethod
+    @api.route("/reviews/batch")
+    @login_required
+    def get_reviews():
+        """Return the reviews for a comma separated list of ids in one query
+
+        Ids that do not exist or cannot be viewed are left out of the result.
+        """
+        review_ids = parse_review_ids()
+        keys = (
+            get_session()
+            .query(*REVIEW_KEY_COLUMNS)
+            .filter(Review.review_id.in_(review_ids))
+        )
+        if not current_user.is_admin:
+            keys = keys.filter(Review.employee_number == current_user.employee_number)
+        return batch_response(review_ids, keys)
+
+
+class AvailabilityAPI:
+    @staticmethod
+    @api.route("/availability")
+    def check_availability():
+        """Report whether a username and/or email are still free to register
+
+        Answered from the per-worker index, so checks made while typing do not
+        reach the database. Registration remains the final check.
+        """
+        index = current_app.extensions["availability_index"]
+        result = {
+            field: not index.is_taken(field, request.args[field])
+            for field in AVAILABILITY_FIELDS
+            if field in request.args
+        }
+        if not result:
+            abort(400, description="Give a username or email to check")
+
+        response = jsonify(result)
+        response.headers["Cache-Control"] = "no-store"
+        return response
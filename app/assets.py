@@ -0,0 +1,245 @@
+import base64
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+from flask import Blueprint, abort, current_app, request, send_file, url_for
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # Optional, only gzip variants are built without it
+    brotli = None
+
+# Create blueprint
+assets = Blueprint("assets", __name__)
+
+# Build output under the static folder, and the manifest mapping logical names
+# to fingerprinted ones
+DIST_DIR = "dist"
+MANIFEST_NAME = "manifest.json"
+
+JSDELIVR = "https://cdn.jsdelivr.net/npm"
+MDI = f"{JSDELIVR}/@mdi/font@7.4.47"
+BOOTSTRAP_ICONS = f"{JSDELIVR}/bootstrap-icons@1.3.0/font"
+CLOUDINARY = "https://res.cloudinary.com/d3/image/upload"
+
+# Third-party assets downloaded into static/vendor, keeping each package's layout
+# so relative url() references in their stylesheets still resolve
+VENDOR_ASSETS = {
+    "vendor/bootstrap/bootstrap.min.css": f"{JSDELIVR}/bootstrap@4.0.0/dist/css/bootstrap.min.css",
+    "vendor/bootstrap/bootstrap.min.js": f"{JSDELIVR}/bootstrap@5.3.0/dist/js/bootstrap.min.js",
+    "vendor/jquery/jquery.slim.min.js": f"{JSDELIVR}/jquery@3.7.1/dist/jquery.slim.min.js",
+    "vendor/popper/popper.min.js": f"{JSDELIVR}/@popperjs/core@2.11.8/dist/umd/popper.min.js",
+    "vendor/mdi/css/materialdesignicons.min.css": f"{MDI}/css/materialdesignicons.min.css",
+    "vendor/mdi/fonts/materialdesignicons-webfont.eot": f"{MDI}/fonts/materialdesignicons-webfont.eot",
+    "vendor/mdi/fonts/materialdesignicons-webfont.woff2": f"{MDI}/fonts/materialdesignicons-webfont.woff2",
+    "vendor/mdi/fonts/materialdesignicons-webfont.woff": f"{MDI}/fonts/materialdesignicons-webfont.woff",
+    "vendor/mdi/fonts/materialdesignicons-webfont.ttf": f"{MDI}/fonts/materialdesignicons-webfont.ttf",
+    "vendor/bootstrap-icons/bootstrap-icons.css": f"{BOOTSTRAP_ICONS}/bootstrap-icons.css",
+    "vendor/bootstrap-icons/fonts/bootstrap-icons.woff2": f"{BOOTSTRAP_ICONS}/fonts/bootstrap-icons.woff2",
+    "vendor/bootstrap-icons/fonts/bootstrap-icons.woff": f"{BOOTSTRAP_ICONS}/fonts/bootstrap-icons.woff",
+    "vendor/card-background.jpg": f"{CLOUDINARY}/c_scale,q_auto:good,w_1110/trianglify-v1-cs85g_cc5d2i.jpg",
+}
+
+# Subresource integrity digest of every vendor asset, checked when downloading and
+# sent with CDN links. `flask build-assets --pin` records digests for new assets
+VENDOR_INTEGRITY_PATH = os.path.join(os.path.dirname(__file__), "vendor_integrity.json")
+INTEGRITY_ALGORITHM = "sha384"
+
+# Formats that are already compressed gain nothing from gzip or brotli
+PRECOMPRESS_EXTENSIONS = {".css", ".js", ".svg", ".eot", ".ttf", ".json", ".txt"}
+
+# Precompressed variants in order of preference
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+CSS_URL = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+
+def fingerprint(path, content):
+    """Insert a hash of the content before the extension, style.css -> style.<hash>.css"""
+    root, ext = posixpath.splitext(path)
+    return f"{root}.{hashlib.sha256(content).hexdigest()[:12]}{ext}"
+
+
+def load_vendor_integrity():
+    """Return the pinned digest of each vendor asset"""
+    with open(VENDOR_INTEGRITY_PATH) as f:
+        return json.load(f)
+
+
+def integrity(content, algorithm=INTEGRITY_ALGORITHM):
+    """Subresource integrity value of the content, e.g. sha384-<base64 digest>"""
+    digest = base64.b64encode(hashlib.new(algorithm, content).digest()).decode()
+    return f"{algorithm}-{digest}"
+
+
+def download_vendor_assets(static_dir, refresh=False, pin=False):
+    """Download the third-party assets into static/vendor, returning the paths fetched
+
+    Every download must match its pinned digest. Assets without one are refused,
+    unless pin is set, which records the digest of what was downloaded.
+    """
+    # Only the build step downloads, keep urllib out of the app's startup
+    import urllib.request
+
+    pins = load_vendor_integrity()
+    unpinned = sorted(set(VENDOR_ASSETS) - set(pins))
+    if unpinned and not pin:
+        raise ValueError(
+            f"No pinned digest for {', '.join(unpinned)}, "
+            "check the files and run `flask build-assets --pin`"
+        )
+
+    fetched = []
+    for path, url in VENDOR_ASSETS.items():
+        target = os.path.join(static_dir, *path.split("/"))
+        if os.path.exists(target) and not refresh and path in pins:
+            continue
+
+        with urllib.request.urlopen(url, timeout=30) as response:
+            content = response.read()
+        if path not in pins:
+            pins[path] = integrity(content)
+        algorithm = pins[path].split("-", 1)[0]
+        if integrity(content, algorithm) != pins[path]:
+            raise ValueError(f"Integrity check failed for {url}")
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as f:
+            f.write(content)
+        fetched.append(path)
+
+    if unpinned:
+        with open(VENDOR_INTEGRITY_PATH, "w") as f:
+            json.dump(pins, f, indent=2, sort_keys=True)
+            f.write("\n")
+    return fetched
+
+
+def _rewrite_css_urls(path, css, manifest):
+    """Point url() references in a stylesheet at the fingerprinted files"""
+    directory = posixpath.dirname(path)
+
+    def replace(match):
+        quote, reference = match.groups()
+        if re.match(r"^([a-z]+:|/|#)", reference):
+            return match.group(0)
+        # Keep query strings and fragments, such as font cache busters
+        target, suffix = re.match(r"([^?#]*)(.*)", reference).groups()
+        resolved = posixpath.normpath(posixpath.join(directory, target))
+        if resolved not in manifest:
+            return match.group(0)
+        relative = posixpath.relpath(manifest[resolved], directory)
+        return f"url({quote}{relative}{suffix}{quote})"
+
+    return CSS_URL.sub(replace, css)
+
+
+def _write_variants(target, content):
+    """Write a file with its gzip and brotli variants where they are smaller"""
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, "wb") as f:
+        f.write(content)
+
+    if posixpath.splitext(target)[1] not in PRECOMPRESS_EXTENSIONS:
+        return
+    variants = {".gz": gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(content, quality=11)
+    for suffix, compressed in variants.items():
+        if len(compressed) < len(content):
+            with open(target + suffix, "wb") as f:
+                f.write(compressed)
+
+
+def build_assets(static_dir):
+    """Fingerprint every static file into static/dist and write the manifest
+
+    Stylesheets are built last so their url() references can be rewritten to
+    the fingerprinted names. Returns the manifest.
+    """
+    sources = []
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = sorted(d for d in dirs if d != DIST_DIR)
+        for name in sorted(files):
+            full = os.path.join(root, name)
+            sources.append(os.path.relpath(full, static_dir).replace(os.sep, "/"))
+    sources.sort(key=lambda path: path.endswith(".css"))
+
+    dist_dir = os.path.join(static_dir, DIST_DIR)
+    manifest = {}
+    for path in sources:
+        with open(os.path.join(static_dir, *path.split("/")), "rb") as f:
+            content = f.read()
+        if path.endswith(".css"):
+            content = _rewrite_css_urls(path, content.decode(), manifest).encode()
+
+        manifest[path] = fingerprint(path, content)
+        _write_variants(os.path.join(dist_dir, *manifest[path].split("/")), content)
+
+    with open(os.path.join(dist_dir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(static_dir):
+    """Return the asset manifest, or an empty one when assets have not been built"""
+    try:
+        with open(os.path.join(static_dir, DIST_DIR, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def asset_url(filename):
+    """URL for a static asset, fingerprinted when the assets have been built
+
+    Unbuilt assets fall back to the static folder, or the CDN for vendor files,
+    so development works without a build step.
+    """
+    manifest = current_app.extensions.get("asset_manifest", {})
+    if filename in manifest:
+        return url_for("assets.asset", filename=manifest[filename])
+    if filename in VENDOR_ASSETS:
+        return VENDOR_ASSETS[filename]
+    return url_for("static", filename=filename)
+
+
+def asset_integrity(filename):
+    """Pinned digest for a vendor asset served from its CDN, None otherwise"""
+    if filename in current_app.extensions.get("asset_manifest", {}):
+        return None
+    return current_app.extensions.get("vendor_integrity", {}).get(filename)
+
+
+class AssetHandler:
+    @staticmethod
+    @assets.route("/assets/<path:filename>")
+    def asset(filename):
+        """Serve a fingerprinted asset, precompressed when the client accepts it"""
+        dist_dir = os.path.join(current_app.static_folder, DIST_DIR)
+        path = safe_join(dist_dir, filename)
+        if path is None or not os.path.isfile(path):
+            abort(404)
+
+        mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        encoding = None
+        for name, suffix in ENCODINGS:
+            if request.accept_encodings[name] and os.path.isfile(path + suffix):
+                encoding, path = name, path + suffix
+                break
+
+        # The name changes whenever the content does, so it never needs revalidating
+        response = send_file(
+            path, mimetype=mimetype, max_age=current_app.config["ASSETS_MAX_AGE"]
+        )
+        if encoding is not None:
+            response.headers["Content-Encoding"] = encoding
+        response.vary.add("Accept-Encoding")
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
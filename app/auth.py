@@ -1,16 +1,17 @@
 from urllib.parse import urljoin, urlparse
 from flask import Blueprint, flash, render_template, redirect, url_for, request, abort
 from flask_login import current_user, login_user, login_required, logout_user
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy.exc import IntegrityError
+from app.database import get_session
 from app.forms import LoginForm, RegistrationForm
 from app.models import Employee
 import re
 
 
 class AuthHandler:
-    def __init__(self, session):
-        # Initialize with session, create blueprint for auth
-        self.session = session
+    def __init__(self, password_hasher):
+        # Hashes and verifies passwords off the request thread
+        self.password_hasher = password_hasher
 
         # Create blueprint for auth routes
         self.auth_bp = Blueprint("auth", __name__)
@@ -25,6 +26,11 @@ class AuthHandler:
         )
         self.auth_bp.add_url_rule("/logout", view_func=self.logout, methods=["POST"])
 
+    @property
+    def session(self):
+        """Session bound to the current request"""
+        return get_session()
+
     def is_safe_url(self, target):
         """Validate URL to prevent open redirect vulnerability"""
         # Extract current host URL and the target URL
@@ -42,6 +48,17 @@ class AuthHandler:
             abort(400, description="Invalid input detected")
         return value
 
+    def upgrade_password_hash(self, employee, password):
+        """Rehash a verified password if the hash method or cost has changed"""
+        if not self.password_hasher.needs_rehash(employee.password):
+            return
+        employee.password = self.password_hasher.hash(password)
+        try:
+            self.session.commit()
+        except Exception:
+            # Keep the old hash, the upgrade is retried at the next login
+            self.session.rollback()
+
     def login(self):
         """Log user into application"""
         # If the user is already logged in, redirect to home page
@@ -59,7 +76,8 @@ class AuthHandler:
             employee = self.session.query(Employee).filter_by(username=username).first()
 
             # If employee found and password matches, log them in
-            if employee and check_password_hash(employee.password, password):
+            if employee and self.password_hasher.verify(employee.password, password):
+                self.upgrade_password_hash(employee, password)
                 login_user(employee, remember=remember)
 
                 next_url = request.args.get("next")
@@ -79,48 +97,34 @@ class AuthHandler:
         if form.validate_on_submit():
             # Sanitize inputs for registration
             name = self.sanitize_input(form.name.data)
-            employee_number = self.sanitize_input(form.employee_number.data)
             email = self.sanitize_input(form.email.data)
             username = self.sanitize_input(form.username.data)
             password = form.password.data
 
-            # Check if email or employee number already exists in the database
-            existing_email = self.session.query(Employee).filter_by(email=email).first()
-            existing_employee = (
-                self.session.query(Employee)
-                .filter_by(employee_number=employee_number)
-                .first()
-            )
-
-            # Display error message if the email or employee number is already taken
-            if existing_email:
-                flash("Email address already exists.", "danger")
-                return redirect(url_for("auth.register"))
-
-            if existing_employee:
-                flash(
-                    "This employee number already exists. Please log in instead.",
-                    "danger",
-                )
-                return redirect(url_for("auth.register"))
-
-            # Create a new employee and add to database
+            # Insert straight away, the unique constraints on employee number,
+            # email and username reject duplicates in the same round trip
             new_employee = Employee(
                 name=name,
-                employee_number=employee_number,
+                employee_number=form.employee_number.data,
                 email=email,
                 username=username,
                 # Secure password hashing
-                password=generate_password_hash(password, method="pbkdf2:sha256"),
+                password=self.password_hasher.hash(password),
                 is_admin=False,
             )
-
-            # Attempt to commit the new employee to the database
             self.session.add(new_employee)
             try:
                 self.session.commit()
                 flash("Your account has been created! You can now log in.", "success")
                 return redirect(url_for("auth.login"))
+            except IntegrityError as e:
+                self.session.rollback()
+                # Show which of the unique fields is already taken
+                if not form.add_conflict_errors(e):
+                    flash(
+                        f"An error occurred while creating your account: {str(e)}",
+                        "danger",
+                    )
             except Exception as e:
                 # If there's an error, roll back and show an error message
                 self.session.rollback()
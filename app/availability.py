@@ -0,0 +1,119 @@
+import threading
+import time
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect, select
+from app.models import Employee
+
+# Employee columns that registration requires to be unique and can be checked
+AVAILABILITY_FIELDS = ("username", "email")
+
+
+class AvailabilityIndex:
+    """Per-process sets of the usernames and emails already registered
+
+    Lookups are served from memory. The sets are loaded on first use and
+    reloaded in full once older than refresh_interval seconds, which picks up
+    employees registered through other workers or bulk inserts. Employees
+    inserted through this process are added as soon as they are flushed. An
+    answer can be out of date by up to one interval, so registration still
+    relies on the unique constraints. Only one thread reloads at a time, the
+    others keep answering from the previous sets meanwhile.
+    """
+
+    def __init__(self, load, refresh_interval):
+        # Returns an iterable of (username, email) rows for every employee
+        self.load = load
+        self.refresh_interval = refresh_interval
+        self.loads = 0
+        self._values = None
+        self._loaded_at = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def refresh(self):
+        """Reload every username and email"""
+        values = {field: set() for field in AVAILABILITY_FIELDS}
+        for username, email in self.load():
+            values["username"].add(username)
+            values["email"].add(email)
+        with self._lock:
+            self._values = values
+            self._loaded_at = time.monotonic()
+            self.loads += 1
+
+    def _stale(self):
+        loaded_at = self._loaded_at
+        return loaded_at is None or time.monotonic() - loaded_at > self.refresh_interval
+
+    def _current(self):
+        """Return the sets, reloading them first if missing or stale"""
+        if not self._stale():
+            return self._values
+        # Wait for the first load, after that only one thread reloads
+        if self._refresh_lock.acquire(blocking=self._values is None):
+            try:
+                if self._stale():
+                    self.refresh()
+            finally:
+                self._refresh_lock.release()
+        return self._values
+
+    def is_taken(self, field, value):
+        """Return True if an employee already has this username or email"""
+        return value in self._current()[field]
+
+    def add(self, username, email):
+        """Record a newly inserted employee without a reload"""
+        with self._lock:
+            if self._values is not None:
+                self._values["username"].add(username)
+                self._values["email"].add(email)
+
+    def expire(self):
+        """Reload on the next lookup, for changes that can free a value"""
+        with self._lock:
+            self._loaded_at = None
+
+    def stats(self):
+        """Return the number of indexed employees and full loads"""
+        with self._lock:
+            return {
+                "size": len(self._values["username"]) if self._values else 0,
+                "loads": self.loads,
+            }
+
+
+def load_employee_identities(session):
+    """Return the username and email of every employee"""
+    return session.execute(select(Employee.username, Employee.email)).all()
+
+
+def _availability_index():
+    if has_app_context():
+        return current_app.extensions.get("availability_index")
+    return None
+
+
+@event.listens_for(Employee, "after_insert")
+def index_new_employee(mapper, connection, target):
+    """Mark a new employee's username and email as taken straight away"""
+    index = _availability_index()
+    if index is not None:
+        index.add(target.username, target.email)
+
+
+@event.listens_for(Employee, "after_delete")
+def expire_availability_index(mapper, connection, target):
+    """Reload the index once an employee's username or email may have been freed"""
+    index = _availability_index()
+    if index is not None:
+        index.expire()
+
+
+@event.listens_for(Employee, "after_update")
+def expire_on_identity_change(mapper, connection, target):
+    """Reload the index once an employee's username or email has changed"""
+    # Most updates, such as a password rehash at login, leave both alone
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in AVAILABILITY_FIELDS):
+        expire_availability_index(mapper, connection, target)
@@ -0,0 +1,199 @@
+import csv
+import json
+import os
+from datetime import datetime
+from itertools import islice
+from sqlalchemy import insert, select
+from app.forms import COMMENTS_MAX_LENGTH, GOALS_MIN_LENGTH
+from app.models import Employee, Review
+from app.summaries import update_review_summaries
+
+# Rows validated and inserted per transaction
+IMPORT_BATCH_SIZE = 1000
+
+# File extensions mapped to import formats
+IMPORT_FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+RATINGS = frozenset(Review.overall_performance_rating.type.enums)
+
+
+class ImportReport:
+    """Number of reviews inserted and the rows rejected with their line numbers"""
+
+    def __init__(self):
+        self.inserted = 0
+        self.rejected = []
+
+
+def detect_format(filename):
+    """Return the import format for a filename, raising ValueError if unsupported"""
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension not in IMPORT_FORMATS:
+        raise ValueError("Only CSV or NDJSON files are accepted.")
+    return IMPORT_FORMATS[extension]
+
+
+def read_records(stream, file_format):
+    """Yield (line_number, record) from a text stream, record is None if unreadable"""
+    if file_format == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield line_number, record if isinstance(record, dict) else None
+
+
+# Column checks mirroring CreateReviewForm, each returns the clean value or raises
+def _required(value):
+    if value is None or not str(value).strip():
+        raise ValueError("This field is required.")
+    return value
+
+
+def _integer(value):
+    value = _required(value)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError("Not a valid integer value.")
+
+
+def _check_employee_number(value):
+    return _integer(value)
+
+
+def _check_review_date(value):
+    value = _required(value)
+    try:
+        return datetime.strptime(str(value).strip(), "%Y-%m-%d")
+    except ValueError:
+        raise ValueError("Not a valid date value.")
+
+
+def _check_reviewer_id(value):
+    reviewer_id = _integer(value)
+    if reviewer_id < 1:
+        raise ValueError("Reviewer ID must be a positive integer")
+    return reviewer_id
+
+
+def _check_rating(value):
+    if _required(value) not in RATINGS:
+        raise ValueError("Not a valid choice.")
+    return value
+
+
+def _check_goals(value):
+    goals = str(_required(value))
+    if len(goals) < GOALS_MIN_LENGTH:
+        raise ValueError(f"Field must be at least {GOALS_MIN_LENGTH} characters long.")
+    return goals
+
+
+def _check_comments(value):
+    comments = str(_required(value))
+    if len(comments) > COMMENTS_MAX_LENGTH:
+        raise ValueError(f"Comments cannot exceed {COMMENTS_MAX_LENGTH} characters")
+    return comments
+
+
+COLUMN_CHECKS = {
+    "employee_number": _check_employee_number,
+    "review_date": _check_review_date,
+    "reviewer_id": _check_reviewer_id,
+    "overall_performance_rating": _check_rating,
+    "goals": _check_goals,
+    "reviewer_comments": _check_comments,
+}
+
+
+def validate_batch(records, find_employees):
+    """Validate a batch one column at a time, returning (rows, errors)
+
+    `find_employees` is given the set of employee numbers in the batch and returns
+    those that exist. `errors` holds a list of messages per record, `rows` the
+    clean values of every record without errors, ready to insert.
+    """
+    errors = [[] if record is not None else ["Unreadable row."] for record in records]
+    columns = {}
+
+    for field, check in COLUMN_CHECKS.items():
+        column = []
+        for index, record in enumerate(records):
+            value = None
+            if record is not None:
+                try:
+                    value = check(record.get(field))
+                except (TypeError, ValueError) as e:
+                    errors[index].append(f"{field}: {e}")
+            column.append(value)
+        columns[field] = column
+
+    # Reviews can only be imported for employees that exist
+    known_employees = find_employees(
+        {number for number in columns["employee_number"] if number is not None}
+    )
+    for index, employee_number in enumerate(columns["employee_number"]):
+        if employee_number is not None and employee_number not in known_employees:
+            errors[index].append("employee_number: Employee does not exist.")
+
+    rows = [
+        {field: columns[field][index] for field in COLUMN_CHECKS}
+        for index, messages in enumerate(errors)
+        if not messages
+    ]
+    return rows, errors
+
+
+def import_reviews(session, stream, file_format, batch_size=IMPORT_BATCH_SIZE):
+    """Stream reviews from a file into the database, one transaction per batch"""
+    report = ImportReport()
+    records = read_records(stream, file_format)
+
+    def find_employees(employee_numbers):
+        """Look up every employee referenced by a batch in one query"""
+        return set(
+            session.scalars(
+                select(Employee.employee_number).where(
+                    Employee.employee_number.in_(employee_numbers)
+                )
+            )
+        )
+
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            return report
+
+        line_numbers = [line_number for line_number, _ in batch]
+        batch_records = [record for _, record in batch]
+
+        rows, errors = validate_batch(batch_records, find_employees)
+        for line_number, messages in zip(line_numbers, errors):
+            if messages:
+                report.rejected.append((line_number, "; ".join(messages)))
+
+        if rows:
+            try:
+                # A list of parameter sets is sent as a single executemany
+                session.execute(insert(Review), rows)
+                update_review_summaries(
+                    session.connection(),
+                    (
+                        (1, row["employee_number"], row["overall_performance_rating"])
+                        for row in rows
+                    ),
+                )
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+            report.inserted += len(rows)
@@ -0,0 +1,116 @@
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, has_app_context
+from flask_login import UserMixin
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from app.models import Employee
+
+
+class LRUCache:
+    """Thread-safe in-process cache with LRU eviction and an optional TTL"""
+
+    def __init__(self, maxsize, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        """Cache a value, evicting the least recently used entry when full"""
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        """Drop the entry for key if it is cached"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return the hit and miss counters and current size"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+            }
+
+
+class CachedUser(UserMixin):
+    """Snapshot of the employee fields a logged in user needs, for the user cache
+
+    One instance is shared by every thread serving that user, so it holds plain
+    values rather than a detached Employee whose relationships cannot load.
+    """
+
+    FIELDS = ("employee_number", "name", "username", "email", "is_admin")
+
+    def __init__(self, employee):
+        for field in self.FIELDS:
+            setattr(self, field, getattr(employee, field))
+
+    def __repr__(self):
+        return f"<CachedUser {self.name}>"
+
+    def get_id(self):
+        return self.employee_number
+
+
+# Employees changed in a session, evicted from the user cache once it commits
+PENDING_EVICTIONS = "user_cache_evictions"
+
+
+@event.listens_for(Employee, "after_update")
+@event.listens_for(Employee, "after_delete")
+def invalidate_cached_employee(mapper, connection, target):
+    """Mark an employee for eviction from the user cache once their change commits
+
+    Evicting at flush time would let another request re-cache the old committed
+    row before the commit, and would evict for changes that are rolled back.
+    """
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(PENDING_EVICTIONS, set()).add(target.employee_number)
+
+
+@event.listens_for(Session, "after_commit")
+def evict_committed_employees(session):
+    """Evict the employees changed in a transaction that has just committed"""
+    employee_numbers = session.info.pop(PENDING_EVICTIONS, ())
+    if employee_numbers and has_app_context():
+        user_cache = current_app.extensions.get("user_cache")
+        if user_cache is not None:
+            for employee_number in employee_numbers:
+                user_cache.invalidate(employee_number)
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_pending_evictions(session):
+    """Keep cached employees whose changes were rolled back"""
+    session.info.pop(PENDING_EVICTIONS, None)
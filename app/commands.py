@@ -0,0 +1,114 @@
+import time
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from app.assets import build_assets, download_vendor_assets
+from app import database
+from app.bulk_import import IMPORT_BATCH_SIZE, detect_format, import_reviews
+from app.database import get_session, init_schema, seed_initial_data
+from app.summaries import rebuild_review_summaries
+from app.synthetic import GENERATE_BATCH_SIZE, SYNTHETIC_PASSWORD, generate_data
+
+
+@click.command("import-reviews")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--format",
+    "file_format",
+    type=click.Choice(["csv", "ndjson"]),
+    help="File format, detected from the extension by default.",
+)
+@click.option("--batch-size", default=IMPORT_BATCH_SIZE, show_default=True)
+@with_appcontext
+def import_reviews_command(path, file_format, batch_size):
+    """Import reviews from a CSV or NDJSON file"""
+    try:
+        file_format = file_format or detect_format(path)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="PATH")
+
+    with open(path, encoding="utf-8", newline="") as stream:
+        report = import_reviews(get_session(), stream, file_format, batch_size)
+
+    for line_number, message in report.rejected:
+        click.echo(f"Line {line_number}: {message}", err=True)
+    click.echo(
+        f"Imported {report.inserted} reviews, rejected {len(report.rejected)} rows."
+    )
+
+
+@click.command("rebuild-review-summaries")
+@with_appcontext
+def rebuild_review_summaries_command():
+    """Recompute the per-employee rating summaries from all reviews"""
+    session = get_session()
+    rebuild_review_summaries(session.connection())
+    session.commit()
+    click.echo("Review summaries rebuilt.")
+
+
+@click.command("generate-data")
+@click.option("--employees", default=1000, show_default=True)
+@click.option("--reviews", default=100000, show_default=True)
+@click.option("--seed", default=0, show_default=True, help="Same seed, same data.")
+@click.option("--years", default=5, show_default=True, help="Years of reviews.")
+@click.option("--batch-size", default=GENERATE_BATCH_SIZE, show_default=True)
+@with_appcontext
+def generate_data_command(employees, reviews, seed, years, batch_size):
+    """Bulk insert realistic synthetic employees and reviews for scale testing"""
+    start = time.perf_counter()
+    # Hashed once and shared, hashing per employee would dominate the run
+    password_hash = current_app.extensions["password_hasher"].hash(SYNTHETIC_PASSWORD)
+    try:
+        generate_data(
+            get_session(),
+            password_hash,
+            employees,
+            reviews,
+            seed=seed,
+            years=years,
+            batch_size=batch_size,
+        )
+    except ValueError as e:
+        raise click.UsageError(str(e))
+
+    click.echo(
+        f"Generated {employees} employees and {reviews} reviews in "
+        f"{time.perf_counter() - start:.1f} s. "
+        f"Generated employees log in with the password {SYNTHETIC_PASSWORD}."
+    )
+
+
+@click.command("build-assets")
+@click.option("--refresh", is_flag=True, help="Download vendor assets again.")
+@click.option(
+    "--pin", is_flag=True, help="Record digests for vendor assets without one."
+)
+@with_appcontext
+def build_assets_command(refresh, pin):
+    """Vendor third-party assets and build fingerprinted, precompressed copies"""
+    static_dir = current_app.static_folder
+    for path in download_vendor_assets(static_dir, refresh, pin):
+        click.echo(f"Downloaded {path}")
+
+    manifest = build_assets(static_dir)
+    click.echo(f"Built {len(manifest)} assets, restart the app to serve them.")
+
+
+@click.command("init-db")
+@with_appcontext
+def init_db_command():
+    """Create the database schema and add the initial admin employee and review"""
+    init_schema(database.engine)
+    seed_initial_data(get_session(), current_app.extensions["password_hasher"])
+    click.echo("Database initialised.")
+
+
+@click.command("startup-report")
+@with_appcontext
+def startup_report_command():
+    """Show how long each phase of creating the app took"""
+    timings = current_app.extensions["startup_timings"]
+    for name, seconds in timings.items():
+        click.echo(f"{name:<16}{seconds * 1000:>9.1f} ms")
+    click.echo(f"{'total':<16}{sum(timings.values()) * 1000:>9.1f} ms")
@@ -0,0 +1,175 @@
+import zlib
+from werkzeug.datastructures import Headers
+from werkzeug.http import parse_accept_header, parse_cache_control_header
+from werkzeug.wsgi import ClosingIterator
+
+try:
+    import brotli
+except ImportError:  # Optional, responses are only gzipped without it
+    brotli = None
+
+# Text formats worth compressing, images and fonts are compressed already
+COMPRESSIBLE_TYPES = {
+    "application/javascript",
+    "application/json",
+    "application/x-ndjson",
+    "application/xml",
+    "image/svg+xml",
+    "text/css",
+    "text/csv",
+    "text/html",
+    "text/javascript",
+    "text/plain",
+    "text/xml",
+}
+
+
+class CompressionMiddleware:
+    """Compress text responses with brotli or gzip as negotiated by the client
+
+    Responses with a Content-Length are compressed in one go and skipped when
+    smaller than `min_size` or when compressing does not save anything.
+    Streamed responses are compressed chunk by chunk, flushing after each one
+    so the client still receives rows as they are produced.
+    """
+
+    def __init__(self, app, level=6, brotli_quality=4, min_size=500):
+        self.app = app
+        self.level = level
+        self.brotli_quality = brotli_quality
+        self.min_size = min_size
+
+    def negotiate(self, environ):
+        """Return the encoding to use for this request, or None"""
+        accepted = parse_accept_header(environ.get("HTTP_ACCEPT_ENCODING"))
+        if brotli is not None and accepted["br"]:
+            return "br"
+        if accepted["gzip"]:
+            return "gzip"
+        return None
+
+    def __call__(self, environ, start_response):
+        encoding = self.negotiate(environ)
+        # Conditional requests carry the ETag of the compressed representation
+        matched_suffix = _strip_etag_suffixes(environ)
+
+        captured = []
+
+        def capture(status, headers, exc_info=None):
+            captured[:] = [status, headers, exc_info]
+            return _no_write
+
+        app_iter = self.app(environ, capture)
+        status, headers, exc_info = captured
+        headers = Headers(headers)
+
+        if status.startswith("304") and matched_suffix:
+            _add_etag_suffix(headers, matched_suffix)
+        if not self.compressible(environ, status, headers):
+            start_response(status, headers.to_wsgi_list(), exc_info)
+            return app_iter
+
+        # The body depends on Accept-Encoding whether or not it is compressed
+        vary = headers.get("Vary")
+        if not vary or "accept-encoding" not in vary.lower():
+            headers["Vary"] = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+
+        length = headers.get("Content-Length", type=int)
+        if encoding is None or (length is not None and length < self.min_size):
+            start_response(status, headers.to_wsgi_list(), exc_info)
+            return app_iter
+
+        if length is None:
+            # Streamed response, compress as it is sent
+            del headers["Content-Length"]
+            headers["Content-Encoding"] = encoding
+            _add_etag_suffix(headers, encoding)
+            start_response(status, headers.to_wsgi_list(), exc_info)
+            return ClosingIterator(
+                self.compress_stream(app_iter, encoding),
+                getattr(app_iter, "close", None),
+            )
+
+        try:
+            body = b"".join(app_iter)
+        finally:
+            if hasattr(app_iter, "close"):
+                app_iter.close()
+
+        compressed = self.compress(body, encoding)
+        if len(compressed) < len(body):
+            body = compressed
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            _add_etag_suffix(headers, encoding)
+        start_response(status, headers.to_wsgi_list(), exc_info)
+        return [body]
+
+    def compressible(self, environ, status, headers):
+        """Whether the response may be compressed at all"""
+        if environ["REQUEST_METHOD"] == "HEAD":
+            return False
+        code = int(status.split(None, 1)[0])
+        if code < 200 or code in (204, 206, 304):
+            return False
+        if "Content-Encoding" in headers or "Content-Range" in headers:
+            return False
+        if "no-transform" in parse_cache_control_header(headers.get("Cache-Control")):
+            return False
+        mimetype = headers.get("Content-Type", "").split(";")[0].strip().lower()
+        return mimetype in COMPRESSIBLE_TYPES
+
+    def compress(self, body, encoding):
+        """Compress a whole body"""
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return compressor.compress(body) + compressor.flush()
+
+    def compress_stream(self, chunks, encoding):
+        """Compress chunks as they arrive, flushing each to the client"""
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=self.brotli_quality)
+            for chunk in chunks:
+                data = compressor.process(chunk) + compressor.flush()
+                if data:
+                    yield data
+            yield compressor.finish()
+        else:
+            compressor = zlib.compressobj(
+                self.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+            )
+            for chunk in chunks:
+                data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+                if data:
+                    yield data
+            yield compressor.flush()
+
+
+def _no_write(data):
+    raise RuntimeError("CompressionMiddleware does not support the write() callable")
+
+
+def _add_etag_suffix(headers, encoding):
+    """Give the compressed representation its own strong ETag, "tag" -> "tag-gzip" """
+    etag = headers.get("ETag")
+    if etag and etag.endswith('"'):
+        headers["ETag"] = f'{etag[:-1]}-{encoding}"'
+
+
+def _strip_etag_suffixes(environ):
+    """Remove encoding suffixes from If-None-Match so the app sees its own ETags
+
+    Returns the suffix that was removed, if any, to put back on a 304.
+    """
+    value = environ.get("HTTP_IF_NONE_MATCH")
+    if not value:
+        return None
+    matched = None
+    for encoding in ("br", "gzip"):
+        suffix = f'-{encoding}"'
+        if suffix in value:
+            value = value.replace(suffix, '"')
+            matched = encoding
+    environ["HTTP_IF_NONE_MATCH"] = value
+    return matched
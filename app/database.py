@@ -1,35 +1,245 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from datetime import date
+
+from flask import has_app_context
+from flask.globals import app_ctx
+from sqlalchemy import MetaData, create_engine, event, exc, inspect
+from sqlalchemy.schema import CreateColumn, CreateTable
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.pool import QueuePool
 from app.models import Base, Employee, Review
+from config import Config
 
 # Initialize engine and session variables for interacting with the database
 engine = None
 Session = sessionmaker()
 
 
-def init_engine(database_uri):
-    """Initialize the database engine and create tables if they do not exist"""
+def _session_scope():
+    """Key sessions by the active app context, falling back to the current thread"""
+    if has_app_context():
+        return id(app_ctx._get_current_object())
+    return threading.get_ident()
+
+
+# One session per app/request context, shared by everything within that context
+db_session = scoped_session(Session, scopefunc=_session_scope)
+
+
+def init_engine(database_uri, options=None):
+    """Initialize the database engine and bind sessions to it
+
+    The schema is left to init_schema, run at startup or by the init-db command.
+    """
     global engine
-    # `echo=True` enables logging of SQL queries
-    engine = create_engine(database_uri, echo=True)
-    Base.metadata.create_all(engine)
+    engine = build_engine(database_uri, options)
+    Session.configure(bind=engine)
+
+
+def init_schema(bind):
+    """Create missing tables, indexes and columns, then the data derived from them"""
+    # Only needed when the schema is checked, which fast boot skips
+    from app.search import ensure_search_index
+    from app.summaries import ensure_review_summaries
+
+    Base.metadata.create_all(bind)
+    ensure_indexes(bind)
+
+    # Add new columns to existing tables, then fill the summary table and
+    # search index the first time they are created on existing data
+    with bind.begin() as connection:
+        ensure_columns(connection)
+        ensure_review_autoincrement(connection)
+        ensure_review_summaries(connection)
+        ensure_search_index(connection)
+
+
+def ensure_indexes(bind):
+    """Create any model indexes missing from tables that already existed"""
+    # create_all only adds indexes when it creates the table itself
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind, checkfirst=True)
+
+
+def ensure_columns(connection):
+    """Add model columns missing from tables that already existed"""
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                spec = CreateColumn(column).compile(dialect=connection.dialect)
+                connection.exec_driver_sql(
+                    f"ALTER TABLE {table.name} ADD COLUMN {spec}"
+                )
+
+
+def ensure_review_autoincrement(connection):
+    """Rebuild a reviews table created without AUTOINCREMENT
+
+    Without it SQLite hands the id of the newest deleted review to the next
+    insert. The rows keep their ids, and the indexes and search triggers are
+    recreated on the rebuilt table.
+    """
+    if connection.dialect.name != "sqlite":
+        return
+    sql = connection.exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'reviews'"
+    ).scalar()
+    if sql is None or "AUTOINCREMENT" in sql.upper():
+        return
+
+    # The copy's foreign key needs the employees table in the same metadata
+    metadata = MetaData()
+    Employee.__table__.to_metadata(metadata)
+    rebuilt = Review.__table__.to_metadata(metadata, name="reviews_rebuild")
+    columns = ", ".join(column.name for column in Review.__table__.columns)
+    connection.execute(CreateTable(rebuilt))
+    connection.exec_driver_sql(
+        f"INSERT INTO reviews_rebuild ({columns}) SELECT {columns} FROM reviews"
+    )
+    # Dropping the table also drops its indexes and search triggers
+    connection.exec_driver_sql("DROP TABLE reviews")
+    connection.exec_driver_sql("ALTER TABLE reviews_rebuild RENAME TO reviews")
+    ensure_indexes(connection)
+
+
+def _setting(options, name):
+    """Read a setting from the given options, falling back to Config"""
+    return options.get(name, getattr(Config, name))
+
+
+def add_sqlite_pragmas(bind, options=None):
+    """Apply the configured SQLite pragmas to every new connection of an engine"""
+    options = options or {}
+    pragmas = {
+        "journal_mode": _setting(options, "SQLITE_JOURNAL_MODE"),
+        "synchronous": _setting(options, "SQLITE_SYNCHRONOUS"),
+        "busy_timeout": _setting(options, "SQLITE_BUSY_TIMEOUT"),
+        "mmap_size": _setting(options, "SQLITE_MMAP_SIZE"),
+        "cache_size": _setting(options, "SQLITE_CACHE_SIZE"),
+    }
+
+    @event.listens_for(bind, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+class TimedQueuePool(QueuePool):
+    """Queue pool that counts checkouts and the time spent waiting for them"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.checkout_seconds = 0.0
+        self.checkout_timeouts = 0
+        self._stats_lock = threading.Lock()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.checkout_timeouts += 1
+            raise
+        with self._stats_lock:
+            self.checkouts += 1
+            self.checkout_seconds += time.perf_counter() - start
+        return connection
+
+    def stats(self):
+        """Return the checkout counters and current pool usage"""
+        with self._stats_lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_seconds": self.checkout_seconds,
+                "checkout_timeouts": self.checkout_timeouts,
+                "size": self.size(),
+                "checked_out": self.checkedout(),
+                "overflow": max(self.overflow(), 0),
+            }
+
+
+def build_engine(database_uri, options=None):
+    """Create an engine with pool settings from config and SQLite pragmas"""
+    options = options or {}
+    url = make_url(database_uri)
+    kwargs = {
+        # SQL logging is opt-in through SQLALCHEMY_ECHO
+        "echo": _setting(options, "SQLALCHEMY_ECHO"),
+        "pool_pre_ping": _setting(options, "SQLALCHEMY_POOL_PRE_PING"),
+    }
+
+    # In-memory SQLite uses a single-connection pool that cannot be sized
+    if url.get_backend_name() != "sqlite" or url.database not in (None, "", ":memory:"):
+        kwargs.update(
+            poolclass=TimedQueuePool,
+            pool_size=_setting(options, "SQLALCHEMY_POOL_SIZE"),
+            max_overflow=_setting(options, "SQLALCHEMY_MAX_OVERFLOW"),
+            pool_recycle=_setting(options, "SQLALCHEMY_POOL_RECYCLE"),
+        )
+
+    new_engine = create_engine(database_uri, **kwargs)
+
+    if url.get_backend_name() == "sqlite":
+        add_sqlite_pragmas(new_engine, options)
+
+    return new_engine
 
 
 def get_session():
-    """Retrieve a session for database operations"""
+    """Retrieve the session bound to the current app/request context"""
     # Ensure the engine is initialized before proceeding
     if engine is None:
         raise RuntimeError("Engine is not initialized")
-    # Create a scoped session which ensures thread safety when using sessions
-    Session = scoped_session(sessionmaker(bind=engine))
-    return Session()
+    return db_session()
+
+
+def remove_session(exception=None):
+    """Close the context's session and return its connection to the pool"""
+    db_session.remove()
+
+
+def seed_initial_data(session, password_hasher):
+    """Add the admin employee and their first review to an empty database"""
+    # Add admin, only hashing the password when the table is empty as hashing
+    # is deliberately slow
+    if session.query(Employee.employee_number).first() is None:
+        add_employee(
+            session,
+            "John Doe",
+            101,
+            "johndoe1234",
+            "john.doe@example.com",
+            password=password_hasher.hash_inline("Password123!"),
+            is_admin=True,
+        )
+
+    # Add a review for that employee (assuming employee_number 101 exists)
+    add_review(
+        session,
+        101,
+        date(2024, 9, 4),
+        202,
+        "Excellent",
+        "My main goal is to take part in leadership opportunities in the next term.",
+        "John has shown great progress in his career goals.",
+    )
 
 
 def add_employee(
     session, name, employee_number, username, email, password, is_admin=False
 ):
     """Add a new employee to the database if the Employee table is empty"""
-    if session.query(Employee).count() == 0:
+    # Check if there are any existing employees, without counting them all
+    if session.query(Employee.employee_number).first() is None:
         # Create a new Employee instance with the provided details
         new_employee = Employee(
             employee_number=employee_number,
@@ -57,8 +267,8 @@ def add_review(
     reviewer_comments,
 ):
     """Add a review for an employee if the Review table is empty"""
-    # Check if there are any existing reviews in the database
-    if session.query(Review).count() == 0:
+    # Check if there are any existing reviews, without counting them all
+    if session.query(Review.review_id).first() is None:
         new_review = Review(
             employee_number=employee_number,
             review_date=review_date,
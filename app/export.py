@@ -0,0 +1,91 @@
+import csv
+import io
+import json
+from datetime import timedelta
+from sqlalchemy import select
+from app.models import Review
+
+# Columns written for each review, in export order
+EXPORT_COLUMNS = [
+    Review.review_id,
+    Review.employee_number,
+    Review.review_date,
+    Review.reviewer_id,
+    Review.overall_performance_rating,
+    Review.goals,
+    Review.reviewer_comments,
+]
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+# Rows fetched from the cursor, and written to the response, per batch
+EXPORT_BATCH_SIZE = 1000
+
+
+def export_statement(
+    employee_number=None, start_date=None, end_date=None, sort_order="newest"
+):
+    """Build the review export query with the same filters and sort as the home page"""
+    statement = select(*EXPORT_COLUMNS)
+
+    if employee_number is not None:
+        statement = statement.where(Review.employee_number == employee_number)
+    if start_date is not None:
+        statement = statement.where(Review.review_date >= start_date)
+    if end_date is not None:
+        # Include reviews on the end date itself
+        statement = statement.where(Review.review_date < end_date + timedelta(days=1))
+
+    if sort_order == "oldest":
+        statement = statement.order_by(Review.review_date.asc(), Review.review_id.asc())
+    else:
+        statement = statement.order_by(
+            Review.review_date.desc(), Review.review_id.desc()
+        )
+
+    # Stream rows from the cursor in batches rather than buffering the result
+    return statement.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE)
+
+
+def _batches(session, statement):
+    """Yield lists of rows as they are fetched from the database"""
+    result = session.execute(statement)
+    try:
+        for batch in result.partitions():
+            yield batch
+    finally:
+        result.close()
+
+
+def iter_csv(session, statement):
+    """Yield the export as CSV text, one chunk per batch of rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    # Send the header before the query runs so the download starts at once
+    writer.writerow(EXPORT_FIELDS)
+    yield _drain(buffer)
+
+    for batch in _batches(session, statement):
+        writer.writerows(
+            (*row[:2], row.review_date.date().isoformat(), *row[3:]) for row in batch
+        )
+        yield _drain(buffer)
+
+
+def _drain(buffer):
+    """Return the buffered text and empty the buffer for reuse"""
+    text = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return text
+
+
+def iter_ndjson(session, statement):
+    """Yield the export as newline-delimited JSON, one chunk per batch of rows"""
+    for batch in _batches(session, statement):
+        lines = []
+        for row in batch:
+            record = row._asdict()
+            record["review_date"] = row.review_date.date().isoformat()
+            lines.append(json.dumps(record))
+        yield "\n".join(lines) + "\n"
@@ -1,5 +1,6 @@
 import re
 from flask_wtf import FlaskForm
+from flask_wtf.file import FileAllowed, FileField, FileRequired
 from wtforms import (
     DateField,
     IntegerField,
@@ -18,8 +19,51 @@ from wtforms.validators import (
     NumberRange,
     Regexp,
 )
-from app.database import get_session
-from app.models import Employee
+
+# Review text limits, shared with the bulk review import
+GOALS_MIN_LENGTH = 10
+COMMENTS_MAX_LENGTH = 500
+# Field errors for registrations hitting a unique constraint on the employee
+REGISTRATION_CONFLICTS = {
+    "employee_number": "This employee number already exists. Please log in instead.",
+    "email": "There is already an account with this email. Please login.",
+    "username": "That username is taken. Please choose a different one.",
+}
+# How each database names the failed constraint in its error message. SQLite
+# and MySQL name the column (employees.username, employees.PRIMARY for the key),
+# PostgreSQL the constraint (employees_username_key, employees_pkey)
+REGISTRATION_CONSTRAINTS = {
+    "employee_number": [
+        "employees.employee_number",
+        "employees.PRIMARY",
+        "employees_pkey",
+        "employees_employee_number_key",
+    ],
+    "email": ["employees.email", "employees_email_key"],
+    "username": ["employees.username", "employees_username_key"],
+}
+# Where each database's message names the failed constraint, read only from
+# there since MySQL and PostgreSQL messages also quote the submitted values.
+# MySQL puts its key last, so the final match is the one it reported
+CONSTRAINT_PATTERNS = [
+    (re.compile(r"UNIQUE constraint failed: ([\w.]+)"), 0),
+    (re.compile(r"for key '([^']+)'"), -1),
+    (re.compile(r'violates unique constraint "([^"]+)"'), 0),
+]
+
+
+def failed_constraint(error):
+    """Return the name of the constraint an IntegrityError failed, if given"""
+    # PostgreSQL drivers report the constraint apart from the message
+    name = getattr(getattr(error.orig, "diag", None), "constraint_name", None)
+    if name:
+        return name
+    message = str(error.orig)
+    for pattern, index in CONSTRAINT_PATTERNS:
+        names = pattern.findall(message)
+        if names:
+            return names[index]
+    return None
 
 
 class LoginForm(FlaskForm):
@@ -51,22 +95,6 @@ class RegistrationForm(FlaskForm):
     password = PasswordField("Password", validators=[DataRequired()])
     submit = SubmitField("Sign Up")
 
-    def __init__(self, session=None, *args, **kwargs):
-        """Initialize form with optional session parameter for database access"""
-        super().__init__(*args, **kwargs)
-        self.session = get_session()
-
-    def validate_username(self, username):
-        """Custom validator to check if the username already exists"""
-        # Query the database to check if the username already exists
-        employee_exists = (
-            self.session.query(Employee).filter_by(username=username.data).first()
-        )
-        if employee_exists:
-            raise ValidationError(
-                "That username is taken. Please choose a different one."
-            )
-
     def validate_password(self, password):
         """Custom validator to ensure password meets complexity requirements"""
         if len(password.data) < 8:
@@ -87,17 +115,18 @@ class RegistrationForm(FlaskForm):
                 "Password must contain at least one special character."
             )
 
-    def validate_email(self, email):
-        """Custom validator to check if the email is already associated with an existing account"""
-        # Query the database to check if the email already exists
-        employee_exists = (
-            self.session.query(Employee).filter_by(email=email.data).first()
-        )
-        # Raise a validation error if the email is already in use
-        if employee_exists:
-            raise ValidationError(
-                "There is already an account with this email. Please login."
-            )
+    def add_conflict_errors(self, error):
+        """Map a unique constraint IntegrityError onto the fields it names
+
+        Return True if any field error was added. The database reports one
+        failing constraint at a time, so only that field gets an error.
+        """
+        name = failed_constraint(error)
+        for field, names in REGISTRATION_CONSTRAINTS.items():
+            if name in names:
+                getattr(self, field).errors.append(REGISTRATION_CONFLICTS[field])
+                return True
+        return False
 
 
 class CreateReviewForm(FlaskForm):
@@ -128,11 +157,31 @@ class CreateReviewForm(FlaskForm):
         validators=[DataRequired()],
     )
     # Goals field, required and with a minimum length of 10 characters
-    goals = TextAreaField("Goals", validators=[DataRequired(), Length(min=10)])
+    goals = TextAreaField(
+        "Goals", validators=[DataRequired(), Length(min=GOALS_MIN_LENGTH)]
+    )
     reviewer_comments = TextAreaField(
         "Reviewer Comments",
         validators=[
             DataRequired(),
-            Length(max=500, message="Comments cannot exceed 500 characters"),
+            Length(
+                max=COMMENTS_MAX_LENGTH,
+                message=f"Comments cannot exceed {COMMENTS_MAX_LENGTH} characters",
+            ),
+        ],
+    )
+
+
+class ImportReviewsForm(FlaskForm):
+    """Form to upload a CSV or NDJSON file of reviews"""
+
+    file = FileField(
+        "Reviews File",
+        validators=[
+            FileRequired(),
+            FileAllowed(
+                ["csv", "ndjson", "jsonl"], "Only CSV or NDJSON files are accepted."
+            ),
         ],
     )
+    submit = SubmitField("Import")
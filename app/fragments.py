@@ -0,0 +1,52 @@
+from flask import current_app
+from markupsafe import Markup
+
+REVIEW_CARD_TEMPLATE = "_review_card.html"
+
+# The card differs only by whether the viewer is an admin and owns the review
+VIEWER_ROLES = ("employee", "admin", "admin_owner")
+
+
+def viewer_role(review, user):
+    """Return which variant of a review card the user sees"""
+    if not user.is_admin:
+        return "employee"
+    if user.employee_number == review.employee_number:
+        return "admin_owner"
+    return "admin"
+
+
+def _card_key(review_id, version_id, role):
+    # The row version changes on every edit and review ids are never reused,
+    # so a stale card is never served even when another worker made the change
+    return (review_id, version_id, role)
+
+
+def render_review_card(review, user):
+    """Return the HTML for a review card, rendering it only on a cache miss"""
+    role = viewer_role(review, user)
+    cache = current_app.extensions.get("review_card_cache")
+    key = _card_key(review.review_id, review.version_id, role)
+
+    if cache is not None:
+        html = cache.get(key)
+        if html is not None:
+            return html
+
+    template = current_app.jinja_env.get_template(REVIEW_CARD_TEMPLATE)
+    html = Markup(
+        template.render(
+            review=review, is_admin=role != "employee", is_owner=role == "admin_owner"
+        )
+    )
+    if cache is not None:
+        cache.set(key, html)
+    return html
+
+
+def invalidate_review_card(review):
+    """Drop every cached variant of the review's current version"""
+    cache = current_app.extensions.get("review_card_cache")
+    if cache is not None:
+        for role in VIEWER_ROLES:
+            cache.invalidate(_card_key(review.review_id, review.version_id, role))
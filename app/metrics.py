@@ -0,0 +1,319 @@
+import threading
+import time
+from flask import g, has_request_context
+from sqlalchemy import event
+
+# Histogram buckets in seconds for request and database time
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Histogram buckets for the number of SQL queries run by one request
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+
+def format_labels(labels):
+    """Render label pairs in the Prometheus text format"""
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels:
+        value = (
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class Counter:
+    """Monotonic value per label set"""
+
+    type = "counter"
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        """Yield (name, labels, value) for every label set"""
+        with self._lock:
+            values = list(self._values.items())
+        for label_values, value in values:
+            yield self.name, list(zip(self.label_names, label_values)), value
+
+
+class Gauge(Counter):
+    """Value per label set that can go up and down"""
+
+    type = "gauge"
+
+    def dec(self, *label_values, amount=1):
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram(Counter):
+    """Bucketed observations per label set, with their sum and count"""
+
+    type = "histogram"
+
+    def __init__(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = buckets
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            counts = self._values.get(label_values)
+            if counts is None:
+                # One count per bucket, then +Inf, then the sum
+                counts = self._values[label_values] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-2] += 1
+            counts[-1] += value
+
+    def samples(self):
+        with self._lock:
+            values = [(labels, list(counts)) for labels, counts in self._values.items()]
+        for label_values, counts in values:
+            labels = list(zip(self.label_names, label_values))
+            for bound, count in zip(self.buckets, counts):
+                yield f"{self.name}_bucket", labels + [("le", bound)], count
+            yield f"{self.name}_bucket", labels + [("le", "+Inf")], counts[-2]
+            yield f"{self.name}_sum", labels, counts[-1]
+            yield f"{self.name}_count", labels, counts[-2]
+
+
+class Metrics:
+    """Request, SQL and pool metrics of one worker process in the Prometheus format
+
+    Request hooks record latency, status codes and in-flight requests per
+    endpoint, and engine events count the queries and database time of each
+    request. Pool and cache stats are read when the metrics are rendered.
+    """
+
+    def __init__(self):
+        self.request_seconds = Histogram(
+            "epms_request_duration_seconds",
+            "Time spent handling a request",
+            ("endpoint", "method"),
+        )
+        self.request_queries = Histogram(
+            "epms_request_queries",
+            "SQL queries run by a request",
+            ("endpoint",),
+            QUERY_BUCKETS,
+        )
+        self.request_db_seconds = Histogram(
+            "epms_request_db_seconds",
+            "Time a request spent running SQL queries",
+            ("endpoint",),
+        )
+        self.responses = Counter(
+            "epms_responses_total",
+            "Responses sent by status code",
+            ("endpoint", "method", "status"),
+        )
+        self.in_flight = Gauge(
+            "epms_requests_in_flight", "Requests being handled", ("endpoint",)
+        )
+        self.queries = Counter("epms_db_queries_total", "SQL queries run")
+        self.query_seconds = Counter(
+            "epms_db_query_seconds_total", "Time spent running SQL queries"
+        )
+        self.metrics = [
+            self.request_seconds,
+            self.request_queries,
+            self.request_db_seconds,
+            self.responses,
+            self.in_flight,
+            self.queries,
+            self.query_seconds,
+        ]
+        # Callables returning [(name, type, help, [(labels, value)])] at render time
+        self.collectors = []
+
+    def instrument_engine(self, engine):
+        """Time every SQL statement run through the engine"""
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def start_query(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def end_query(conn, cursor, statement, parameters, context, executemany):
+            self._record_query(time.perf_counter() - conn.info["query_start"].pop())
+
+        @event.listens_for(engine, "handle_error")
+        def failed_query(context):
+            starts = (
+                context.connection.info.get("query_start")
+                if context.connection
+                else None
+            )
+            if starts:
+                self._record_query(time.perf_counter() - starts.pop())
+
+    def _record_query(self, seconds):
+        self.queries.inc()
+        self.query_seconds.inc(amount=seconds)
+        if has_request_context() and "metrics_start" in g:
+            g.metrics_queries += 1
+            g.metrics_db_seconds += seconds
+
+    def start_request(self, endpoint):
+        """Mark a request as in flight and start its timers"""
+        g.metrics_start = time.perf_counter()
+        g.metrics_queries = 0
+        g.metrics_db_seconds = 0.0
+        self.in_flight.inc(endpoint)
+
+    def record_response(self, endpoint, method, status):
+        self.responses.inc(endpoint, method, status)
+
+    def finish_request(self, endpoint, method):
+        """Record the time and queries of a request started with start_request"""
+        start = g.pop("metrics_start", None)
+        if start is None:
+            return
+        self.in_flight.dec(endpoint)
+        self.request_seconds.observe(time.perf_counter() - start, endpoint, method)
+        self.request_queries.observe(g.metrics_queries, endpoint)
+        self.request_db_seconds.observe(g.metrics_db_seconds, endpoint)
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format"""
+        families = {
+            metric.name: (metric.type, metric.help_text, list(metric.samples()))
+            for metric in self.metrics
+        }
+        # Collectors may add samples to the same family, e.g. one per cache
+        for collect in self.collectors:
+            for name, metric_type, help_text, values in collect():
+                family = families.setdefault(name, (metric_type, help_text, []))
+                family[2].extend((name, labels, value) for labels, value in values)
+
+        lines = []
+        for name, (metric_type, help_text, samples) in families.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for sample_name, labels, value in samples:
+                lines.append(f"{sample_name}{format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def pool_collector(get_engine):
+    """Collector for the checkout stats and usage of the engine's pool"""
+
+    def collect():
+        engine = get_engine()
+        if engine is None or not hasattr(engine.pool, "stats"):
+            return []
+        stats = engine.pool.stats()
+        return [
+            (
+                "epms_db_pool_checkouts_total",
+                "counter",
+                "Connections checked out",
+                [([], stats["checkouts"])],
+            ),
+            (
+                "epms_db_pool_checkout_seconds_total",
+                "counter",
+                "Time spent waiting for a connection",
+                [([], stats["checkout_seconds"])],
+            ),
+            (
+                "epms_db_pool_checkout_timeouts_total",
+                "counter",
+                "Checkouts that timed out waiting for a connection",
+                [([], stats["checkout_timeouts"])],
+            ),
+            (
+                "epms_db_pool_connections",
+                "gauge",
+                "Connections by state",
+                [
+                    ([("state", "checked_out")], stats["checked_out"]),
+                    ([("state", "overflow")], stats["overflow"]),
+                ],
+            ),
+            (
+                "epms_db_pool_size",
+                "gauge",
+                "Configured pool size",
+                [([], stats["size"])],
+            ),
+        ]
+
+    return collect
+
+
+def cache_collector(name, cache):
+    """Collector for the hit, miss and size counters of an LRUCache"""
+
+    def collect():
+        stats = cache.stats()
+        labels = [("cache", name)]
+        return [
+            (
+                "epms_cache_hits_total",
+                "counter",
+                "Cache hits",
+                [(labels, stats["hits"])],
+            ),
+            (
+                "epms_cache_misses_total",
+                "counter",
+                "Cache misses",
+                [(labels, stats["misses"])],
+            ),
+            (
+                "epms_cache_entries",
+                "gauge",
+                "Cached entries",
+                [(labels, stats["size"])],
+            ),
+        ]
+
+    return collect
+
+
+def admission_collector(admission):
+    """Collector for the active, waiting and rejected counters of each gate"""
+
+    def collect():
+        stats = admission.stats()
+
+        def values(key):
+            return [
+                ([("endpoint", endpoint)], gate[key])
+                for endpoint, gate in stats.items()
+            ]
+
+        return [
+            (
+                "epms_admission_active",
+                "gauge",
+                "Expensive requests running",
+                values("active"),
+            ),
+            (
+                "epms_admission_waiting",
+                "gauge",
+                "Expensive requests queued",
+                values("waiting"),
+            ),
+            (
+                "epms_admission_rejected_total",
+                "counter",
+                "Expensive requests shed with a 503",
+                values("rejected"),
+            ),
+        ]
+
+    return collect
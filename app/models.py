@@ -1,5 +1,14 @@
 from flask_login import UserMixin
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Enum
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Enum,
+)
 from sqlalchemy.orm import relationship, declarative_base
 
 Base = declarative_base()
@@ -47,6 +56,43 @@ class Review(Base):
     )
     goals = Column(String, nullable=False)
     reviewer_comments = Column(String, nullable=False)
+    # Row version, incremented by the ORM on every update
+    version_id = Column(Integer, nullable=False, server_default="1")
+
+    # Indexes match the access paths in routes.py; SQLite scans them backwards
+    # for newest first, so one ascending index serves both sort orders
+    __table_args__ = (
+        # An employee's own reviews, paged by (review_date, review_id)
+        Index("ix_reviews_employee_date", employee_number, review_date, review_id),
+        # Admin view of all reviews, paged by (review_date, review_id)
+        Index("ix_reviews_date", review_date, review_id),
+        # Reviews written by a reviewer
+        Index("ix_reviews_reviewer_date", reviewer_id, review_date),
+        # Never reuse the id of a deleted review, caches and ETags are keyed by
+        # (review_id, version_id) and a reused id starts again at version 1
+        {"sqlite_autoincrement": True},
+    )
+    __mapper_args__ = {"version_id_col": version_id}
 
     def __repr__(self):
         return f"<Review {self.review_id} - Employee {self.reviewer_id}>"
+
+
+# Review Summary Table, one row of rating counts per employee
+class ReviewSummary(Base):
+    __tablename__ = "review_summaries"
+
+    employee_number = Column(
+        Integer, ForeignKey("employees.employee_number"), primary_key=True
+    )
+    # One count per overall performance rating
+    excellent_count = Column(Integer, nullable=False, default=0)
+    good_count = Column(Integer, nullable=False, default=0)
+    satisfactory_count = Column(Integer, nullable=False, default=0)
+    needs_improvement_count = Column(Integer, nullable=False, default=0)
+    unsatisfactory_count = Column(Integer, nullable=False, default=0)
+    total_count = Column(Integer, nullable=False, default=0)
+    latest_review_date = Column(DateTime)
+
+    def __repr__(self):
+        return f"<ReviewSummary Employee {self.employee_number}>"
@@ -0,0 +1,70 @@
+import base64
+from datetime import datetime
+from sqlalchemy import tuple_
+from app.models import Review
+
+
+class ReviewPage:
+    """One page of reviews with the cursors to the pages either side"""
+
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+
+def encode_cursor(review):
+    """Encode the (review_date, review_id) position of a review as a URL-safe token"""
+    key = f"{review.review_date.isoformat()}|{review.review_id}"
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Decode a cursor token back to (review_date, review_id), raising ValueError if invalid"""
+    try:
+        review_date, review_id = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        )
+        return datetime.fromisoformat(review_date), int(review_id)
+    except (UnicodeError, ValueError, TypeError) as e:
+        raise ValueError("Invalid page cursor") from e
+
+
+def keyset_page(query, sort_order, per_page, after=None, before=None):
+    """Return a page of the review query seeking past a cursor instead of using OFFSET"""
+    key = tuple_(Review.review_date, Review.review_id)
+    newest_first = sort_order != "oldest"
+
+    if before:
+        # Walk backwards from the cursor, then flip the rows back into display order
+        position = decode_cursor(before)
+        query = query.filter(key > position if newest_first else key < position)
+        descending = not newest_first
+    else:
+        if after:
+            position = decode_cursor(after)
+            query = query.filter(key < position if newest_first else key > position)
+        descending = newest_first
+
+    if descending:
+        query = query.order_by(Review.review_date.desc(), Review.review_id.desc())
+    else:
+        query = query.order_by(Review.review_date.asc(), Review.review_id.asc())
+
+    # Fetch one extra row to learn whether another page exists
+    rows = query.limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    if before:
+        rows.reverse()
+        has_next, has_prev = True, has_more
+    else:
+        # An empty cursor, as in ?after=, is the first page too
+        has_next, has_prev = has_more, bool(after)
+
+    return ReviewPage(
+        rows,
+        next_cursor=encode_cursor(rows[-1]) if rows and has_next else None,
+        prev_cursor=encode_cursor(rows[0]) if rows and has_prev else None,
+    )
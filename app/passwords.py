@@ -0,0 +1,102 @@
+import os
+import threading
+from werkzeug.security import (
+    DEFAULT_PBKDF2_ITERATIONS,
+    check_password_hash,
+    generate_password_hash,
+)
+
+# Werkzeug's parameters for methods given without them
+DEFAULT_METHOD_PARAMS = {
+    "pbkdf2": ["sha256", str(DEFAULT_PBKDF2_ITERATIONS)],
+    "scrypt": ["32768", "8", "1"],
+}
+# Hash methods from weakest to strongest, hashes are never moved down this list
+METHOD_STRENGTH = ["pbkdf2", "scrypt"]
+
+
+def normalize_method(method):
+    """Spell out a hash method with every cost parameter, as stored in the hash"""
+    name, *params = method.split(":")
+    defaults = DEFAULT_METHOD_PARAMS.get(name, [])
+    given = len(params)
+    return ":".join([name, *params, *defaults[given:]])
+
+
+def method_strength(name):
+    """Rank a hash method, unknown methods rank below every known one"""
+    return METHOD_STRENGTH.index(name) if name in METHOD_STRENGTH else -1
+
+
+class PasswordHasher:
+    """Hash and verify passwords in a bounded process pool off the request thread"""
+
+    def __init__(self, method, workers, timeout=None):
+        self.method = normalize_method(method)
+        # With no workers, hashing runs inline on the calling thread
+        self.workers = workers
+        self.timeout = timeout
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        with self._lock:
+            # Pools do not survive a fork, so each server process starts its own
+            if self._executor is None or self._pid != os.getpid():
+                # Imported on first use, multiprocessing is slow to import
+                from concurrent.futures import ProcessPoolExecutor
+                from multiprocessing import get_context
+
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=get_context("spawn")
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def _run(self, func, *args):
+        if not self.workers:
+            return func(*args)
+        return self._pool().submit(func, *args).result(timeout=self.timeout)
+
+    def hash(self, password):
+        """Return a new hash of the password using the configured method"""
+        return self._run(generate_password_hash, password, self.method)
+
+    def hash_inline(self, password):
+        """hash() on the calling thread, for seeding and commands with no pool"""
+        return generate_password_hash(password, self.method)
+
+    def verify(self, pwhash, password):
+        """Return True if the password matches the stored hash"""
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """Return True if the hash is weaker than the configured method and cost
+
+        Hashes made with a stronger method or a higher cost are kept, so
+        lowering PASSWORD_HASH_METHOD never downgrades stored hashes.
+        """
+        name, *params = normalize_method(pwhash.split("$", 1)[0]).split(":")
+        target, *target_params = self.method.split(":")
+        if name != target:
+            return method_strength(name) < method_strength(target)
+        if name == "pbkdf2":
+            # pbkdf2:<digest>:<iterations>, a different digest is replaced
+            if params[0] != target_params[0]:
+                return True
+            params, target_params = params[1:], target_params[1:]
+        try:
+            return any(
+                int(value) < int(target_value)
+                for value, target_value in zip(params, target_params)
+            )
+        except ValueError:
+            return True
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown()
+            self._executor = None
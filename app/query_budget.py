@@ -0,0 +1,78 @@
+import re
+from collections import Counter
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+# Placeholder lists of expanded IN clauses, collapsed so they compare equal
+PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A route ran more SQL statements than its declared budget"""
+
+
+def normalize_statement(statement):
+    """Reduce a statement to its shape, so runs differing only in parameters match"""
+    return " ".join(PLACEHOLDER_LIST.sub("?", statement).split())
+
+
+def repeated_statements(statements, threshold):
+    """Return {statement: count} for statements run at least threshold times"""
+    counts = Counter(normalize_statement(statement) for statement in statements)
+    return {
+        statement: count for statement, count in counts.items() if count >= threshold
+    }
+
+
+class QueryBudget:
+    """Count the SQL statements of each request and check them against a budget
+
+    Meant for development and tests. Statements repeated within one request are
+    logged as a likely N+1 pattern, and a route running more statements than its
+    budget is logged, or fails with QueryBudgetExceeded when strict.
+    """
+
+    def __init__(self, budgets, repeat_threshold, strict):
+        # A copy, so budgets changed at runtime never leak into Config
+        self.budgets = dict(budgets)
+        self.repeat_threshold = repeat_threshold
+        self.strict = strict
+
+    def instrument_engine(self, engine):
+        """Record every statement run through the engine during a request"""
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def record_statement(conn, cursor, statement, parameters, context, many):
+            if has_request_context() and "query_statements" in g:
+                g.query_statements.append(statement)
+
+    def start_request(self):
+        g.query_statements = []
+
+    def check(self, response):
+        """Flag repeated statements and enforce the route's budget"""
+        statements = g.pop("query_statements", None)
+        if statements is None:
+            return response
+        response.headers["X-Query-Count"] = str(len(statements))
+
+        for statement, count in repeated_statements(
+            statements, self.repeat_threshold
+        ).items():
+            current_app.logger.warning(
+                "Possible N+1 on %s: statement ran %d times: %s",
+                request.endpoint,
+                count,
+                statement,
+            )
+
+        budget = self.budgets.get(request.endpoint)
+        if budget is not None and len(statements) > budget:
+            message = (
+                f"{request.endpoint} ran {len(statements)} queries, "
+                f"its budget is {budget}:\n" + "\n".join(statements)
+            )
+            if self.strict:
+                raise QueryBudgetExceeded(message)
+            current_app.logger.warning(message)
+        return response
@@ -1,12 +1,49 @@
-from flask import flash, redirect, render_template, Blueprint, request, url_for
+import io
+from datetime import date
+from flask import (
+    abort,
+    current_app,
+    flash,
+    redirect,
+    render_template,
+    Blueprint,
+    Response,
+    request,
+    stream_with_context,
+    url_for,
+)
 from flask_login import login_required, current_user
+from app.bulk_import import detect_format, import_reviews
 from app.database import get_session
-from app.forms import CreateReviewForm
-from app.models import Review
+from app.export import export_statement, iter_csv, iter_ndjson
+from app.forms import CreateReviewForm, ImportReviewsForm
+from app.fragments import invalidate_review_card
+from app.models import Review, ReviewSummary
+from app.pagination import keyset_page
+from app.search import search_reviews
 
 # Create blueprint
 main = Blueprint("main", __name__)
-session = get_session()
+
+# Export formats mapped to their row writer and content type
+EXPORT_FORMATS = {
+    "csv": (iter_csv, "text/csv"),
+    "ndjson": (iter_ndjson, "application/x-ndjson"),
+}
+
+
+def parse_arg(name, convert):
+    """Convert a query string argument, aborting with 400 if it is malformed
+
+    Missing or empty arguments give None, so an unset filter is not applied.
+    """
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return convert(value)
+    except ValueError:
+        abort(400, description=f"Invalid {name}")
 
 
 class ReviewHandler:
@@ -14,7 +51,9 @@ class ReviewHandler:
     @main.route("/home")
     @login_required
     def home():
-        """Render homepage to present all reviews for a user with sorting"""
+        """Render homepage to present a page of reviews for a user with sorting"""
+        session = get_session()
+
         # Default sort is newest
         sort_order = request.args.get("sort", "newest")
 
@@ -27,16 +66,38 @@ class ReviewHandler:
                 employee_number=current_user.employee_number
             )
 
-        # Apply sorting based on user selection
-        if sort_order == "oldest":
-            employee_reviews = employee_reviews.order_by(Review.review_date.asc())
-        else:
-            employee_reviews = employee_reviews.order_by(Review.review_date.desc())
+        # Fetch one page at a time, seeking from the cursor on (review_date, review_id)
+        try:
+            page = keyset_page(
+                employee_reviews,
+                sort_order,
+                current_app.config["REVIEWS_PER_PAGE"],
+                after=request.args.get("after"),
+                before=request.args.get("before"),
+            )
+        except ValueError:
+            abort(400, description="Invalid page cursor")
 
-        # Execute the query and get all reviews
-        employee_reviews = employee_reviews.all()
+        return render_template("home.html", reviews=page.items, page=page)
 
-        return render_template("home.html", reviews=employee_reviews)
+    @staticmethod
+    @main.route("/search")
+    @login_required
+    def search():
+        """Full-text search over review goals and reviewer comments"""
+        terms = request.args.get("q", "").strip()
+        all_reviews = current_user.is_admin and "all_reviews" in request.args
+
+        # Same scoping as home, own reviews unless an admin asks for all
+        results = search_reviews(
+            get_session(),
+            terms,
+            employee_number=None if all_reviews else current_user.employee_number,
+            limit=current_app.config["SEARCH_RESULTS_LIMIT"],
+        )
+        return render_template(
+            "search.html", terms=terms, results=results, all_reviews=all_reviews
+        )
 
     @staticmethod
     @main.route("/create-review", methods=["GET", "POST"])
@@ -48,6 +109,7 @@ class ReviewHandler:
         # Check data is valid
         form = CreateReviewForm()
         if form.validate_on_submit():
+            session = get_session()
             review = Review(
                 employee_number=current_user.employee_number,
                 review_date=form.review_date.data,
@@ -75,6 +137,7 @@ class ReviewHandler:
     @login_required
     def update_review(review_id):
         """Update review of review_id selected"""
+        session = get_session()
         review = session.query(Review).get(review_id)
 
         if request.method == "GET":
@@ -89,6 +152,7 @@ class ReviewHandler:
             review.overall_performance_rating = form.overall_performance_rating.data
             review.goals = form.goals.data
             review.reviewer_comments = form.reviewer_comments.data
+            invalidate_review_card(review)
 
             try:
                 session.commit()
@@ -107,6 +171,7 @@ class ReviewHandler:
     @login_required
     def delete_review(review_id):
         """Delete review from Review table"""
+        session = get_session()
         review = session.query(Review).get(review_id)
 
         # Validation of users to delete
@@ -117,6 +182,7 @@ class ReviewHandler:
             flash("You do not have permission to delete this review.", "danger")
             return redirect(url_for("main.home"))
 
+        invalidate_review_card(review)
         session.delete(review)
         try:
             session.commit()
@@ -126,3 +192,85 @@ class ReviewHandler:
             flash(f"An error occurred while deleting the review: {str(e)}", "danger")
 
         return redirect(url_for("main.home"))
+
+    @staticmethod
+    @main.route("/review-summary")
+    @login_required
+    def review_summary():
+        """Show rating counts per employee from the summary table for admins"""
+        if not current_user.is_admin:
+            flash("You do not have permission to view the review summary.", "danger")
+            return redirect(url_for("main.home"))
+
+        # One row per employee, maintained alongside reviews
+        summaries = (
+            get_session()
+            .query(ReviewSummary)
+            .order_by(ReviewSummary.employee_number)
+            .all()
+        )
+        return render_template("review_summary.html", summaries=summaries)
+
+    @staticmethod
+    @main.route("/export-reviews")
+    @login_required
+    def export_reviews():
+        """Stream reviews as CSV or NDJSON for admins"""
+        if not current_user.is_admin:
+            flash("You do not have permission to export reviews.", "danger")
+            return redirect(url_for("main.home"))
+
+        export_format = request.args.get("format", "csv")
+        if export_format not in EXPORT_FORMATS:
+            abort(400, description="Unsupported export format")
+        write_rows, mimetype = EXPORT_FORMATS[export_format]
+
+        # Same employee, date range and sort filters as the home page
+        statement = export_statement(
+            employee_number=parse_arg("employee_number", int),
+            start_date=parse_arg("start_date", date.fromisoformat),
+            end_date=parse_arg("end_date", date.fromisoformat),
+            sort_order=request.args.get("sort", "newest"),
+        )
+
+        # Rows are written to the response as they are fetched from the cursor
+        return Response(
+            stream_with_context(write_rows(get_session(), statement)),
+            mimetype=mimetype,
+            headers={
+                "Content-Disposition": f"attachment; filename=reviews.{export_format}"
+            },
+        )
+
+    @staticmethod
+    @main.route("/import-reviews", methods=["GET", "POST"])
+    @login_required
+    def import_reviews():
+        """Bulk import reviews from an uploaded CSV or NDJSON file for admins"""
+        if not current_user.is_admin:
+            flash("You do not have permission to import reviews.", "danger")
+            return redirect(url_for("main.home"))
+
+        form = ImportReviewsForm()
+        report = None
+        if form.validate_on_submit():
+            upload = form.file.data
+            # Read the upload as text line by line rather than loading it whole
+            stream = io.TextIOWrapper(upload.stream, encoding="utf-8", newline="")
+            try:
+                report = import_reviews(
+                    get_session(), stream, detect_format(upload.filename)
+                )
+            except Exception as e:
+                flash(
+                    f"An error occurred while importing the reviews: {str(e)}",
+                    "danger",
+                )
+            else:
+                flash(
+                    f"Imported {report.inserted} reviews, "
+                    f"rejected {len(report.rejected)} rows.",
+                    "warning" if report.rejected else "success",
+                )
+
+        return render_template("import_reviews.html", form=form, report=report)
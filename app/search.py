@@ -0,0 +1,217 @@
+import re
+from markupsafe import Markup, escape
+from sqlalchemy import and_, or_, select, text
+from app.models import Review
+
+# Characters that never appear in review text, marking matches in snippets
+MATCH_START = "\x02"
+MATCH_END = "\x03"
+# Words of review text around the first match shown by the LIKE fallback
+SNIPPET_WORDS = 12
+
+# External-content FTS5 index over the review text, kept in sync by triggers so
+# that ORM writes, bulk inserts and manual edits are all indexed
+SEARCH_INDEX_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS reviews_fts USING fts5(
+        goals, reviewer_comments,
+        content='reviews', content_rowid='review_id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS reviews_fts_insert AFTER INSERT ON reviews BEGIN
+        INSERT INTO reviews_fts(rowid, goals, reviewer_comments)
+        VALUES (new.review_id, new.goals, new.reviewer_comments);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS reviews_fts_delete AFTER DELETE ON reviews BEGIN
+        INSERT INTO reviews_fts(reviews_fts, rowid, goals, reviewer_comments)
+        VALUES ('delete', old.review_id, old.goals, old.reviewer_comments);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS reviews_fts_update
+    AFTER UPDATE OF goals, reviewer_comments ON reviews BEGIN
+        INSERT INTO reviews_fts(reviews_fts, rowid, goals, reviewer_comments)
+        VALUES ('delete', old.review_id, old.goals, old.reviewer_comments);
+        INSERT INTO reviews_fts(rowid, goals, reviewer_comments)
+        VALUES (new.review_id, new.goals, new.reviewer_comments);
+    END
+    """,
+]
+
+
+class SearchResult:
+    """A matching review with a highlighted snippet of the matching text"""
+
+    def __init__(self, review, snippet, rank):
+        self.review = review
+        self.snippet = snippet
+        self.rank = rank
+
+
+def ensure_search_index(connection):
+    """Create the review search index and its triggers, indexing existing reviews"""
+    # FTS5 is specific to SQLite
+    if connection.dialect.name != "sqlite":
+        return
+
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE name = 'reviews_fts'"
+    ).first()
+    for statement in SEARCH_INDEX_DDL:
+        connection.exec_driver_sql(statement)
+    if exists is None:
+        rebuild_search_index(connection)
+
+
+def rebuild_search_index(connection):
+    """Reindex every review from the reviews table"""
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql(
+            "INSERT INTO reviews_fts(reviews_fts) VALUES ('rebuild')"
+        )
+
+
+def drop_search_triggers(connection):
+    """Stop indexing review writes, until ensure_search_index restores the triggers"""
+    if connection.dialect.name == "sqlite":
+        for trigger in [
+            "reviews_fts_insert",
+            "reviews_fts_delete",
+            "reviews_fts_update",
+        ]:
+            connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+
+
+def build_match_query(terms):
+    """Turn user input into an FTS5 query, a trailing * searches by prefix
+
+    Each word is quoted so FTS5 operators typed by users are matched literally.
+    Returns None when there is nothing to search for.
+    """
+    words = [
+        f'"{word}"{prefix}' for word, prefix in re.findall(r"(\w+)(\*?)", terms or "")
+    ]
+    return " ".join(words) or None
+
+
+def highlight(snippet):
+    """Escape a snippet for HTML, wrapping the matched words in <mark>"""
+    return Markup(
+        str(escape(snippet))
+        .replace(MATCH_START, "<mark>")
+        .replace(MATCH_END, "</mark>")
+    )
+
+
+def like_snippet(content, words):
+    """Cut the content around the first matching word, marking the matches"""
+    pattern = re.compile("|".join(re.escape(word) for word in words), re.IGNORECASE)
+    tokens = content.split()
+    first = next((i for i, token in enumerate(tokens) if pattern.search(token)), 0)
+    start = max(0, first - SNIPPET_WORDS // 2)
+    end = start + SNIPPET_WORDS
+    snippet = pattern.sub(
+        lambda match: f"{MATCH_START}{match.group(0)}{MATCH_END}",
+        " ".join(tokens[start:end]),
+    )
+    return ("…" if start > 0 else "") + snippet + ("…" if end < len(tokens) else "")
+
+
+def search_reviews_like(session, terms, employee_number=None, limit=50):
+    """search_reviews() for databases without FTS5, newest match first
+
+    Every word must appear in the goals or comments, as a case-insensitive
+    substring. There is no stemming or ranking, and each search scans the
+    reviews table.
+    """
+    words = [word for word, _ in re.findall(r"(\w+)(\*?)", terms or "")]
+    if not words:
+        return []
+
+    statement = (
+        select(Review)
+        .where(
+            and_(
+                *(
+                    or_(
+                        Review.goals.icontains(word, autoescape=True),
+                        Review.reviewer_comments.icontains(word, autoescape=True),
+                    )
+                    for word in words
+                )
+            )
+        )
+        .order_by(Review.review_date.desc(), Review.review_id.desc())
+        .limit(limit)
+    )
+    if employee_number is not None:
+        statement = statement.where(Review.employee_number == employee_number)
+
+    results = []
+    for review in session.scalars(statement):
+        goals = review.goals.lower()
+        source = (
+            review.goals
+            if any(word.lower() in goals for word in words)
+            else review.reviewer_comments
+        )
+        results.append(
+            SearchResult(review, highlight(like_snippet(source, words)), None)
+        )
+    return results
+
+
+def search_reviews(session, terms, employee_number=None, limit=50):
+    """Return reviews matching the terms, best match first
+
+    When employee_number is given only that employee's reviews are searched.
+    The index is SQLite FTS5, other databases fall back to search_reviews_like.
+    """
+    if session.get_bind().dialect.name != "sqlite":
+        return search_reviews_like(session, terms, employee_number, limit)
+
+    match_query = build_match_query(terms)
+    if match_query is None:
+        return []
+
+    scope = (
+        "AND reviews.employee_number = :employee_number"
+        if employee_number is not None
+        else ""
+    )
+    matches = session.execute(
+        text(f"""
+            SELECT reviews_fts.rowid AS review_id,
+                   snippet(reviews_fts, -1, :start, :end, '…', 12) AS snippet,
+                   bm25(reviews_fts) AS rank
+            FROM reviews_fts
+            JOIN reviews ON reviews.review_id = reviews_fts.rowid
+            WHERE reviews_fts MATCH :query {scope}
+            ORDER BY rank
+            LIMIT :limit
+            """),
+        {
+            "query": match_query,
+            "employee_number": employee_number,
+            "start": MATCH_START,
+            "end": MATCH_END,
+            "limit": limit,
+        },
+    ).all()
+    if not matches:
+        return []
+
+    reviews = {
+        review.review_id: review
+        for review in session.query(Review).filter(
+            Review.review_id.in_([match.review_id for match in matches])
+        )
+    }
+    return [
+        SearchResult(reviews[match.review_id], highlight(match.snippet), match.rank)
+        for match in matches
+    ]
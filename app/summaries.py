@@ -0,0 +1,139 @@
+from collections import Counter, defaultdict
+from sqlalchemy import case, delete, event, func, insert, inspect, select, update
+from sqlalchemy.orm import Session
+from app.models import Review, ReviewSummary
+
+# Summary count column for each overall performance rating
+RATING_COLUMNS = {
+    "Excellent": "excellent_count",
+    "Good": "good_count",
+    "Satisfactory": "satisfactory_count",
+    "Needs Improvement": "needs_improvement_count",
+    "Unsatisfactory": "unsatisfactory_count",
+}
+
+
+def update_review_summaries(connection, changes):
+    """Apply review changes to the summary table on the given connection
+
+    `changes` is an iterable of (delta, employee_number, rating), where delta is
+    1 for an added review, -1 for a removed one and 0 when only the date changed.
+    """
+    deltas = defaultdict(Counter)
+    for delta, employee_number, rating in changes:
+        counts = deltas[employee_number]
+        counts[RATING_COLUMNS[rating]] += delta
+        counts["total_count"] += delta
+
+    for employee_number, counts in deltas.items():
+        # Indexed lookup of the employee's newest review
+        latest = (
+            select(func.max(Review.review_date))
+            .where(Review.employee_number == employee_number)
+            .scalar_subquery()
+        )
+        result = connection.execute(
+            update(ReviewSummary)
+            .where(ReviewSummary.employee_number == employee_number)
+            .values(
+                {
+                    **{
+                        column: getattr(ReviewSummary, column) + delta
+                        for column, delta in counts.items()
+                        if delta
+                    },
+                    "latest_review_date": latest,
+                }
+            )
+        )
+        if result.rowcount == 0:
+            connection.execute(
+                insert(ReviewSummary).values(
+                    {
+                        **{column: max(delta, 0) for column, delta in counts.items()},
+                        "employee_number": employee_number,
+                        "latest_review_date": latest,
+                    }
+                )
+            )
+
+
+def rebuild_review_summaries(connection):
+    """Recompute every summary row from the reviews table"""
+    connection.execute(delete(ReviewSummary))
+
+    rating_counts = [
+        func.sum(case((Review.overall_performance_rating == rating, 1), else_=0))
+        for rating in RATING_COLUMNS
+    ]
+    connection.execute(
+        insert(ReviewSummary).from_select(
+            [
+                "employee_number",
+                *RATING_COLUMNS.values(),
+                "total_count",
+                "latest_review_date",
+            ],
+            select(
+                Review.employee_number,
+                *rating_counts,
+                func.count(),
+                func.max(Review.review_date),
+            ).group_by(Review.employee_number),
+        )
+    )
+
+
+def ensure_review_summaries(connection):
+    """Build the summaries for a database with reviews but no summary rows yet"""
+    has_summaries = connection.execute(select(ReviewSummary.employee_number).limit(1))
+    if has_summaries.first() is None:
+        has_reviews = connection.execute(select(Review.review_id).limit(1))
+        if has_reviews.first() is not None:
+            rebuild_review_summaries(connection)
+
+
+def _load_previous_value(target, value, oldvalue, initiator):
+    pass
+
+
+# Load the old value when these are set on an expired review, so flushes can tell
+# which summary row the review is leaving
+for attribute in (Review.employee_number, Review.overall_performance_rating):
+    event.listen(attribute, "set", _load_previous_value, active_history=True)
+
+
+def _persisted(review):
+    """Return the (employee_number, rating) a review had before this flush"""
+    state = inspect(review)
+    values = []
+    for name in ("employee_number", "overall_performance_rating"):
+        history = state.attrs[name].history
+        values.append((history.deleted or history.unchanged or history.added)[0])
+    return tuple(values)
+
+
+@event.listens_for(Session, "after_flush")
+def track_review_changes(session, flush_context):
+    """Keep the summary table in step with reviews, in the flush's transaction"""
+    changes = []
+    for review in session.new:
+        if isinstance(review, Review):
+            changes.append(
+                (1, review.employee_number, review.overall_performance_rating)
+            )
+    for review in session.deleted:
+        if isinstance(review, Review):
+            changes.append((-1, *_persisted(review)))
+    for review in session.dirty:
+        if isinstance(review, Review) and session.is_modified(review):
+            before = _persisted(review)
+            after = (review.employee_number, review.overall_performance_rating)
+            if before != after:
+                changes.extend([(-1, *before), (1, *after)])
+            else:
+                # The date may have changed, refresh the latest review date
+                changes.append((0, *after))
+
+    if changes:
+        update_review_summaries(session.connection(), changes)
@@ -0,0 +1,190 @@
+import bisect
+import itertools
+import random
+from datetime import date, datetime, timedelta
+from sqlalchemy import func, insert, select
+from app.forms import COMMENTS_MAX_LENGTH, GOALS_MIN_LENGTH
+from app.models import Employee, Review
+from app.search import drop_search_triggers, ensure_search_index, rebuild_search_index
+from app.summaries import rebuild_review_summaries
+
+# Password of every generated employee, so load tests can log in as any of them
+SYNTHETIC_PASSWORD = "Password123!"
+# Rows inserted per executemany and transaction
+GENERATE_BATCH_SIZE = 10000
+
+# fmt: off
+FIRST_NAMES = [
+    "Aisha", "Ben", "Carla", "Daniel", "Elena", "Farid", "Grace", "Hiro",
+    "Ines", "James", "Kemi", "Liam", "Maria", "Nikhil", "Olivia", "Pavel",
+    "Quinn", "Rosa", "Samir", "Tara", "Umar", "Vera", "Wei", "Ximena",
+    "Yusuf", "Zoe",
+]
+LAST_NAMES = [
+    "Adams", "Bianchi", "Chen", "Diaz", "Evans", "Fischer", "Garcia", "Hughes",
+    "Ivanova", "Jones", "Khan", "Lopez", "Mensah", "Nowak", "Okafor", "Patel",
+    "Quist", "Rossi", "Smith", "Tanaka", "Usman", "Valdez", "Walsh", "Young",
+    "Zhang",
+]
+# fmt: on
+
+# Share of reviews with each rating, skewed towards Good as in most review cycles
+RATING_WEIGHTS = {
+    "Excellent": 0.15,
+    "Good": 0.40,
+    "Satisfactory": 0.30,
+    "Needs Improvement": 0.10,
+    "Unsatisfactory": 0.05,
+}
+# Reviews cluster in the weeks after the start of each half-year review cycle
+REVIEW_CYCLE_MONTHS = (1, 7)
+CYCLE_SHARE = 0.7
+CYCLE_DAYS = 42
+
+GOAL_SENTENCES = [
+    "Lead the quarterly planning sessions for the team.",
+    "Take part in leadership opportunities across the department.",
+    "Improve presentation skills by presenting at two all-hands meetings.",
+    "Complete the advanced certification in the current tool set.",
+    "Mentor a new starter through their first six months.",
+    "Reduce the turnaround time of customer tickets by a fifth.",
+    "Document the team's release process end to end.",
+    "Build stronger relationships with partner teams.",
+]
+COMMENT_SENTENCES = [
+    "Has shown great progress in their goals.",
+    "Consistently delivers work of a high standard.",
+    "Communicates clearly with colleagues and stakeholders.",
+    "Would benefit from planning work further ahead.",
+    "Took on extra responsibility during a busy quarter.",
+    "Needs to follow up on actions agreed in meetings.",
+    "Is a supportive and reliable member of the team.",
+    "Met most of the objectives set in the last review.",
+    "Should seek more feedback on early drafts.",
+    "Handled a difficult project with good judgement.",
+]
+
+
+def _text(rng, sentences, min_length, max_length):
+    """Join random sentences until the text is between the two lengths"""
+    target = rng.randint(min_length, max_length)
+    parts = [rng.choice(sentences)]
+    while len(" ".join(parts)) < target:
+        parts.append(rng.choice(sentences))
+    text = " ".join(parts)
+    if len(text) > max_length:
+        text = text[:max_length].rsplit(" ", 1)[0]
+    return text
+
+
+def _review_date(rng, start, end):
+    """A date between start and end, most in the weeks after a cycle starts"""
+    if rng.random() < CYCLE_SHARE:
+        year = rng.randint(start.year, end.year)
+        cycle = date(year, rng.choice(REVIEW_CYCLE_MONTHS), 1)
+        day = cycle + timedelta(days=int(rng.triangular(0, CYCLE_DAYS, 7)))
+        if start <= day <= end:
+            return day
+    return start + timedelta(days=rng.randint(0, (end - start).days))
+
+
+def generate_employees(rng, first_number, count, password_hash):
+    """Yield employee rows with unique numbers, usernames and emails"""
+    for employee_number in range(first_number, first_number + count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        username = f"{first}{last}{employee_number:05d}".lower()
+        yield {
+            "name": f"{first} {last}",
+            "employee_number": employee_number,
+            "username": username,
+            "email": f"{username}@example.com",
+            "password": password_hash,
+            "is_admin": False,
+        }
+
+
+def generate_reviews(rng, employee_numbers, count, start, end):
+    """Yield review rows for the given employees
+
+    Some employees are reviewed far more often than others, drawn from a
+    lognormal activity level, and every review is written by another employee.
+    """
+    # Cumulative activity weights, so each pick is a binary search
+    cumulative = list(
+        itertools.accumulate(rng.lognormvariate(0, 0.75) for _ in employee_numbers)
+    )
+    total = cumulative[-1]
+    ratings = list(RATING_WEIGHTS)
+    rating_weights = list(itertools.accumulate(RATING_WEIGHTS.values()))
+
+    for _ in range(count):
+        index = bisect.bisect(cumulative, rng.random() * total)
+        index = min(index, len(employee_numbers) - 1)
+        reviewer = rng.randrange(len(employee_numbers) - 1)
+        if reviewer >= index:
+            reviewer += 1
+        review_date = _review_date(rng, start, end)
+        yield {
+            "employee_number": employee_numbers[index],
+            "review_date": datetime(
+                review_date.year, review_date.month, review_date.day
+            ),
+            "reviewer_id": employee_numbers[reviewer],
+            "overall_performance_rating": rng.choices(
+                ratings, cum_weights=rating_weights
+            )[0],
+            "goals": _text(rng, GOAL_SENTENCES, GOALS_MIN_LENGTH, 250),
+            "reviewer_comments": _text(rng, COMMENT_SENTENCES, 40, COMMENTS_MAX_LENGTH),
+        }
+
+
+def generate_data(
+    session,
+    password_hash,
+    employees,
+    reviews,
+    seed=0,
+    years=5,
+    end=date(2025, 12, 31),
+    batch_size=GENERATE_BATCH_SIZE,
+):
+    """Bulk insert synthetic employees and reviews, returning their counts
+
+    The same seed, arguments and starting database always give the same rows.
+    New employees are numbered after the highest existing employee number, and
+    reviews are spread over them and every existing employee. The search index
+    triggers are dropped during the load and the index and rating summaries are
+    rebuilt once at the end.
+    """
+    rng = random.Random(seed)
+    first_number = (session.scalar(select(func.max(Employee.employee_number))) or 0) + 1
+
+    rows = generate_employees(rng, first_number, employees, password_hash)
+    while batch := list(itertools.islice(rows, batch_size)):
+        session.execute(insert(Employee), batch)
+        session.commit()
+
+    employee_numbers = list(
+        session.scalars(
+            select(Employee.employee_number).order_by(Employee.employee_number)
+        )
+    )
+    if reviews and len(employee_numbers) < 2:
+        raise ValueError("At least two employees are needed to generate reviews")
+
+    start = end - timedelta(days=round(365.25 * years))
+    # Indexing every row through the triggers is slower than one rebuild
+    drop_search_triggers(session.connection())
+    session.commit()
+    try:
+        rows = generate_reviews(rng, employee_numbers, reviews, start, end)
+        while batch := list(itertools.islice(rows, batch_size)):
+            session.execute(insert(Review), batch)
+            session.commit()
+    finally:
+        session.rollback()
+        ensure_search_index(session.connection())
+        rebuild_search_index(session.connection())
+        rebuild_review_summaries(session.connection())
+        session.commit()
+    return employees, reviews
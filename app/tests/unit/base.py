@@ -0,0 +1,39 @@
+import os
+import tempfile
+import unittest
+from app import create_app
+
+
+class AppTestCase(unittest.TestCase):
+    """Runs each test against an app backed by its own temporary SQLite database
+
+    Subclasses set CONFIG to override settings of the app built for each test.
+    """
+
+    CONFIG = {}
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.app = self.make_app(self.CONFIG)
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        from app.database import engine
+
+        engine.dispose()
+        self.tmp.cleanup()
+
+    def make_app(self, config):
+        return create_app(
+            {
+                "TESTING": True,
+                "WTF_CSRF_ENABLED": False,
+                "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(self.tmp.name, 'epms.db')}",
+                **config,
+            }
+        )
+
+    def login(self, employee_number):
+        with self.client.session_transaction() as session:
+            session["_user_id"] = str(employee_number)
+            session["_fresh"] = True
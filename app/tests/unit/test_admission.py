@@ -0,0 +1,116 @@
+import threading
+import unittest
+from app.admission import AdmissionController, Gate
+from app.tests.unit.base import AppTestCase
+
+
+class TestGate(unittest.TestCase):
+
+    # Check requests beyond the limit wait for a slot and get it once freed
+    def test_queued_request_admitted(self):
+        gate = Gate(limit=1, queue=1)
+        self.assertTrue(gate.acquire(timeout=0))
+
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(gate.acquire(5)))
+        waiter.start()
+        while gate.stats()["waiting"] == 0:
+            pass
+        gate.release()
+        waiter.join()
+
+        self.assertEqual(results, [True])
+        self.assertEqual(gate.stats(), {"active": 1, "waiting": 0, "rejected": 0})
+
+    # Check a full queue rejects at once and queued requests time out
+    def test_rejected(self):
+        gate = Gate(limit=1, queue=0)
+        self.assertTrue(gate.acquire(timeout=0))
+        self.assertFalse(gate.acquire(timeout=5))
+
+        gate.queue = 1
+        self.assertFalse(gate.acquire(timeout=0.01))
+        self.assertEqual(gate.stats()["rejected"], 2)
+
+
+class TestAdmissionController(unittest.TestCase):
+
+    # Check the total limit caps expensive requests across all routes
+    def test_total_limit(self):
+        admission = AdmissionController(
+            {"auth.login": (2, 0), "main.export_reviews": (2, 0)},
+            total_limit=2,
+            timeout=0,
+        )
+        login = admission.gates["auth.login"]
+        export = admission.gates["main.export_reviews"]
+
+        self.assertTrue(admission.admit(login))
+        self.assertTrue(admission.admit(export))
+        self.assertFalse(admission.admit(login))
+
+        admission.release(export)
+        self.assertTrue(admission.admit(login))
+        self.assertEqual(admission.stats()["auth.login"]["active"], 2)
+
+    # Check without a total limit each route is only bound by its own gate
+    def test_no_total_limit(self):
+        admission = AdmissionController(
+            {"auth.login": (2, 0), "main.export_reviews": (1, 0)},
+            total_limit=0,
+            timeout=0,
+        )
+        login = admission.gates["auth.login"]
+        export = admission.gates["main.export_reviews"]
+
+        self.assertTrue(admission.admit(login))
+        self.assertTrue(admission.admit(login))
+        self.assertTrue(admission.admit(export))
+        self.assertFalse(admission.admit(login))
+
+    # Check a total limit that would keep a route's queue from filling is refused
+    def test_total_limit_below_route(self):
+        with self.assertRaises(ValueError):
+            AdmissionController({"auth.login": (2, 4)}, total_limit=3, timeout=0)
+
+
+class TestAdmissionHooks(AppTestCase):
+
+    CONFIG = {"ADMISSION_QUEUE_TIMEOUT": 0}
+
+    def setUp(self):
+        super().setUp()
+        self.admission = self.app.extensions["admission"]
+
+    def saturate(self, endpoint):
+        gate = self.admission.gates[endpoint]
+        gate.queue = 0
+        for _ in range(gate.limit):
+            self.admission.admit(gate)
+
+    # Check saturated login attempts are shed while cheap requests still pass
+    def test_sheds_saturated_route(self):
+        self.saturate("auth.login")
+
+        response = self.client.post(
+            "/login", data={"username": "johndoe1234", "password": "Password123!"}
+        )
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers["Retry-After"], "5")
+        self.assertEqual(self.client.get("/login").status_code, 200)
+
+    # Check slots are given back once a request finishes
+    def test_releases_slot(self):
+        self.client.post(
+            "/login", data={"username": "johndoe1234", "password": "Password123!"}
+        )
+        self.client.get("/home?all_reviews=True")
+
+        stats = self.admission.stats()
+        self.assertEqual(stats["auth.login"]["active"], 0)
+        self.assertEqual(stats["main.home"]["active"], 0)
+        self.assertEqual(self.admission.admitted, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import unittest
+from datetime import datetime
+from app.database import get_session
+from app.models import Employee, Review
+from app.tests.unit.base import AppTestCase
+
+
+class TestReviewAPI(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        with self.app.app_context():
+            session = get_session()
+            session.add(
+                Employee(
+                    name="Jane Doe",
+                    employee_number=202,
+                    username="janedoe1234",
+                    email="jane@example.com",
+                    password="hashed_password",
+                )
+            )
+            session.add(
+                Review(
+                    employee_number=202,
+                    review_date=datetime(2024, 2, 1),
+                    reviewer_id=101,
+                    overall_performance_rating="Good",
+                    goals="Improve presentation skills",
+                    reviewer_comments="Presented well",
+                )
+            )
+            session.commit()
+
+    def edit_review(self, review_id, goals):
+        with self.app.app_context():
+            session = get_session()
+            session.get(Review, review_id).goals = goals
+            session.commit()
+
+    # Check the list is scoped to the user's own reviews unless an admin asks
+    def test_list_scoping(self):
+        self.login(101)
+        own = self.client.get("/api/reviews").get_json()
+        every = self.client.get("/api/reviews?all_reviews=True&sort=oldest").get_json()
+
+        self.assertEqual([review["review_id"] for review in own["reviews"]], [1])
+        self.assertEqual([review["review_id"] for review in every["reviews"]], [2, 1])
+        self.assertIsNone(every["next_cursor"])
+
+    # Check an unchanged list is answered with 304 and an edit changes the ETag
+    def test_list_conditional_get(self):
+        self.login(101)
+        response = self.client.get("/api/reviews")
+        etag = response.headers["ETag"]
+        self.assertFalse(etag.startswith("W/"))
+
+        unchanged = self.client.get("/api/reviews", headers={"If-None-Match": etag})
+        self.assertEqual(unchanged.status_code, 304)
+        self.assertEqual(unchanged.data, b"")
+
+        self.edit_review(1, "Mentor new starters in the team")
+        changed = self.client.get("/api/reviews", headers={"If-None-Match": etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers["ETag"], etag)
+        self.assertEqual(changed.get_json()["reviews"][0]["version"], 2)
+
+    # Check a 304 is decided from the review keys, without loading the text
+    def test_not_modified_skips_review_text(self):
+        self.login(202)
+        # Warm the user cache, so both requests below only query the review
+        self.client.get("/api/reviews/2")
+        response = self.client.get("/api/reviews/2")
+        unchanged = self.client.get(
+            "/api/reviews/2", headers={"If-None-Match": response.headers["ETag"]}
+        )
+        self.assertEqual(unchanged.status_code, 304)
+        self.assertEqual(response.headers["X-Query-Count"], "2")
+        self.assertEqual(unchanged.headers["X-Query-Count"], "1")
+
+    # Check a review created after a delete never matches the deleted one's ETag
+    def test_recreated_review_changes_etag(self):
+        self.login(202)
+        etag = self.client.get("/api/reviews").headers["ETag"]
+        with self.app.app_context():
+            session = get_session()
+            review = session.get(Review, 2)
+            session.delete(review)
+            session.commit()
+            session.add(
+                Review(
+                    employee_number=202,
+                    review_date=datetime(2024, 2, 1),
+                    reviewer_id=101,
+                    overall_performance_rating="Good",
+                    goals="Run the team retrospectives",
+                    reviewer_comments="Ran them well",
+                )
+            )
+            session.commit()
+
+        response = self.client.get("/api/reviews", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.get_json()["reviews"][0]["goals"], "Run the team retrospectives"
+        )
+
+    # Check a single review is returned to its owner and hidden from others
+    def test_get_review(self):
+        self.login(202)
+        response = self.client.get("/api/reviews/2")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["goals"], "Improve presentation skills")
+
+        etag = response.headers["ETag"]
+        unchanged = self.client.get("/api/reviews/2", headers={"If-None-Match": etag})
+        self.assertEqual(unchanged.status_code, 304)
+
+        self.assertEqual(self.client.get("/api/reviews/1").status_code, 404)
+        self.assertEqual(self.client.get("/api/reviews/99").status_code, 404)
+
+    # Check the multi-get keeps the requested order and drops hidden reviews
+    def test_get_reviews(self):
+        self.login(101)
+        response = self.client.get("/api/reviews/batch?ids=2,1,99,2")
+        ids = [review["review_id"] for review in response.get_json()["reviews"]]
+        self.assertEqual(ids, [2, 1])
+
+        self.login(202)
+        response = self.client.get("/api/reviews/batch?ids=1,2")
+        ids = [review["review_id"] for review in response.get_json()["reviews"]]
+        self.assertEqual(ids, [2])
+
+    # Check malformed multi-get requests are rejected
+    def test_get_reviews_invalid(self):
+        self.login(101)
+        self.assertEqual(self.client.get("/api/reviews/batch?ids=a").status_code, 400)
+        self.assertEqual(self.client.get("/api/reviews/batch").status_code, 400)
+
+        ids = ",".join(str(review_id) for review_id in range(1, 102))
+        response = self.client.get(f"/api/reviews/batch?ids={ids}")
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,215 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+from app.assets import (
+    VENDOR_ASSETS,
+    asset_url,
+    build_assets,
+    download_vendor_assets,
+    fingerprint,
+    integrity,
+    load_vendor_integrity,
+)
+from app.tests.unit.base import AppTestCase
+
+STYLESHEET = (
+    "@font-face { src: url('../fonts/icons.woff2?v=1') format('woff2'), "
+    'url("https://example.com/remote.woff"); }\n'
+    ".card { background: url(missing.png); }\n" * 20
+)
+
+
+class TestBuildAssets(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static_dir = self.tmp.name
+        self.write("vendor/icons/css/icons.css", STYLESHEET.encode())
+        self.write("vendor/icons/fonts/icons.woff2", b"\x00font" * 100)
+        self.write("script.js", b"console.log('hello');\n" * 50)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, content):
+        full = os.path.join(self.static_dir, *path.split("/"))
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, "wb") as f:
+            f.write(content)
+
+    def read(self, path):
+        with open(os.path.join(self.static_dir, "dist", *path.split("/")), "rb") as f:
+            return f.read()
+
+    # Check fingerprints change with the content and keep the extension
+    def test_fingerprint(self):
+        first = fingerprint("css/style.css", b"a")
+        self.assertRegex(first, r"^css/style\.[0-9a-f]{12}\.css$")
+        self.assertNotEqual(first, fingerprint("css/style.css", b"b"))
+
+    # Check every file is fingerprinted and stylesheets point at the new names
+    def test_build(self):
+        manifest = build_assets(self.static_dir)
+
+        self.assertEqual(
+            sorted(manifest),
+            [
+                "script.js",
+                "vendor/icons/css/icons.css",
+                "vendor/icons/fonts/icons.woff2",
+            ],
+        )
+        css = self.read(manifest["vendor/icons/css/icons.css"]).decode()
+        font = os.path.basename(manifest["vendor/icons/fonts/icons.woff2"])
+        self.assertIn(f"url('../fonts/{font}?v=1')", css)
+        self.assertIn('url("https://example.com/remote.woff")', css)
+        self.assertIn("url(missing.png)", css)
+
+    # Check compressible files get smaller gzip variants and fonts do not
+    def test_precompressed_variants(self):
+        manifest = build_assets(self.static_dir)
+
+        script = manifest["script.js"]
+        self.assertEqual(gzip.decompress(self.read(script + ".gz")), self.read(script))
+        font = os.path.join(
+            self.static_dir, "dist", manifest["vendor/icons/fonts/icons.woff2"]
+        )
+        self.assertFalse(os.path.exists(font + ".gz"))
+
+
+class TestDownloadVendorAssets(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static_dir = os.path.join(self.tmp.name, "static")
+        self.pins_path = os.path.join(self.tmp.name, "pins.json")
+        self.assets = {"vendor/lib.js": "https://cdn.example.com/lib.js"}
+
+        patches = [
+            patch("app.assets.VENDOR_ASSETS", self.assets),
+            patch("app.assets.VENDOR_INTEGRITY_PATH", self.pins_path),
+            patch("urllib.request.urlopen", self.urlopen),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def urlopen(self, url, timeout):
+        response = MagicMock()
+        response.__enter__.return_value.read.return_value = b"console.log(1);"
+        return response
+
+    def pin(self, digests):
+        with open(self.pins_path, "w") as f:
+            json.dump(digests, f)
+
+    # Check a download matching its pinned digest is written
+    def test_pinned_download(self):
+        self.pin({"vendor/lib.js": integrity(b"console.log(1);", "sha256")})
+        self.assertEqual(download_vendor_assets(self.static_dir), ["vendor/lib.js"])
+
+    # Check a download not matching its pinned digest is refused
+    def test_digest_mismatch(self):
+        self.pin({"vendor/lib.js": integrity(b"tampered")})
+        with self.assertRaisesRegex(ValueError, "Integrity check failed"):
+            download_vendor_assets(self.static_dir)
+        self.assertFalse(os.path.exists(self.static_dir))
+
+    # Check assets without a pin are refused unless pinning is asked for
+    def test_unpinned(self):
+        self.pin({})
+        with self.assertRaisesRegex(ValueError, "No pinned digest for vendor/lib.js"):
+            download_vendor_assets(self.static_dir)
+
+        download_vendor_assets(self.static_dir, pin=True)
+        self.assertEqual(
+            load_vendor_integrity(),
+            {"vendor/lib.js": integrity(b"console.log(1);")},
+        )
+
+
+class TestServeAssets(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.static_dir = os.path.join(self.tmp.name, "static")
+        os.makedirs(self.static_dir)
+        with open(os.path.join(self.static_dir, "style.css"), "w") as f:
+            f.write("body { margin: 0; }\n" * 50)
+        self.app.static_folder = self.static_dir
+
+    def build(self):
+        self.app.extensions["asset_manifest"] = build_assets(self.static_dir)
+
+    def url(self, filename):
+        with self.app.test_request_context():
+            return asset_url(filename)
+
+    # Check unbuilt assets fall back to the static folder or the CDN
+    def test_url_fallback(self):
+        self.assertEqual(self.url("style.css"), "/static/style.css")
+        self.assertEqual(
+            self.url("vendor/jquery/jquery.slim.min.js"),
+            VENDOR_ASSETS["vendor/jquery/jquery.slim.min.js"],
+        )
+
+    # Check CDN links carry their pinned digest and built assets do not
+    def test_cdn_integrity(self):
+        self.app.extensions["vendor_integrity"] = {
+            "vendor/bootstrap/bootstrap.min.css": "sha384-pinned"
+        }
+        page = self.client.get("/login").data.decode()
+        self.assertIn(
+            f'href="{VENDOR_ASSETS["vendor/bootstrap/bootstrap.min.css"]}" '
+            'integrity="sha384-pinned" crossorigin="anonymous"',
+            page,
+        )
+
+        self.app.extensions["asset_manifest"] = {
+            "vendor/bootstrap/bootstrap.min.css": "bootstrap.min.0123456789ab.css"
+        }
+        page = self.client.get("/login").data.decode()
+        self.assertNotIn("integrity=", page)
+
+    # Check built assets are served with immutable caching
+    def test_serve_fingerprinted(self):
+        self.build()
+        url = self.url("style.css")
+        self.assertRegex(url, r"^/assets/style\.[0-9a-f]{12}\.css$")
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "text/css")
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertIn("immutable", response.headers["Cache-Control"])
+        self.assertIn("max-age=31536000", response.headers["Cache-Control"])
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+
+    # Check the gzip variant is sent to clients that accept it
+    def test_serve_precompressed(self):
+        self.build()
+        response = self.client.get(
+            self.url("style.css"), headers={"Accept-Encoding": "gzip, deflate"}
+        )
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(response.mimetype, "text/css")
+        self.assertTrue(
+            gzip.decompress(response.data).startswith(b"body { margin: 0; }")
+        )
+
+    # Check unknown names and paths outside the build are not served
+    def test_missing_asset(self):
+        self.build()
+        self.assertEqual(self.client.get("/assets/nothing.css").status_code, 404)
+        self.assertEqual(self.client.get("/assets/../style.css").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
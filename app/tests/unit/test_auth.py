@@ -3,24 +3,17 @@ from unittest.mock import patch, MagicMock
 from flask import url_for
 from flask_login import current_user
 from werkzeug.security import generate_password_hash, check_password_hash
-from app import create_app
 from app.database import get_session
 from app.forms import LoginForm
 from app.models import Employee
+from app.tests.unit.base import AppTestCase
 from app.tests.unit.test_main import User
 
 
-class AuthTestCase(unittest.TestCase):
+class AuthTestCase(AppTestCase):
 
     def setUp(self):
-        self.app = create_app(
-            {
-                "TESTING": True,
-                # Disable CSRF for testing
-                "WTF_CSRF_ENABLED": False,
-            }
-        )
-        self.client = self.app.test_client()
+        super().setUp()
         self.app_context = self.app.app_context()
         self.app_context.push()
 
@@ -38,6 +31,7 @@ class AuthTestCase(unittest.TestCase):
     def tearDown(self):
         self.app_context.pop()
         patch.stopall()
+        super().tearDown()
 
     def test_login_success(self):
         with self.app.test_request_context():
@@ -199,5 +193,43 @@ class AuthTestCase(unittest.TestCase):
             self.mock_session.add.assert_not_called()
 
 
+class RegisterTestCase(AppTestCase):
+
+    def register(self, **fields):
+        data = {
+            "name": "Newuser",
+            "employee_number": 54321,
+            "email": "newuser@example.com",
+            "username": "newuser1234",
+            "password": "NewPassword123!",
+        }
+        data.update(fields)
+        return self.client.post("/register", data=data)
+
+    # Check a new employee is stored with a single INSERT and sent to log in
+    def test_register_single_query(self):
+        response = self.register()
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.headers["X-Query-Count"], "1")
+        with self.app.app_context():
+            employee = get_session().get(Employee, 54321)
+            self.assertEqual(employee.username, "newuser1234")
+
+    # Check each duplicate unique field is reported on that field
+    def test_register_conflicts(self):
+        cases = [
+            ({"username": "johndoe1234"}, b"That username is taken."),
+            ({"email": "john.doe@example.com"}, b"There is already an account"),
+            ({"employee_number": 101}, b"This employee number already exists."),
+        ]
+        for fields, message in cases:
+            with self.subTest(fields=fields):
+                response = self.register(**fields)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn(message, response.data)
+        with self.app.app_context():
+            self.assertIsNone(get_session().get(Employee, 54321))
+
+
 if __name__ == "__main__":
     unittest.main()
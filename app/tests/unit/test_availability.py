@@ -0,0 +1,184 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+from sqlalchemy import insert
+from app.availability import AvailabilityIndex
+from app.database import get_session
+from app.models import Employee
+from app.tests.unit.base import AppTestCase
+
+
+class TestAvailabilityIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.load = MagicMock(return_value=[("johndoe1234", "john.doe@example.com")])
+        self.index = AvailabilityIndex(self.load, refresh_interval=60)
+
+    # Check lookups are exact and only load the rows once
+    def test_lookup(self):
+        self.assertTrue(self.index.is_taken("username", "johndoe1234"))
+        self.assertTrue(self.index.is_taken("email", "john.doe@example.com"))
+        self.assertFalse(self.index.is_taken("username", "janedoe1234"))
+        self.assertFalse(self.index.is_taken("email", "johndoe1234"))
+        self.load.assert_called_once()
+
+    # Check added employees are taken without a reload
+    def test_add(self):
+        self.index.is_taken("username", "johndoe1234")
+        self.index.add("janedoe1234", "jane@example.com")
+
+        self.assertTrue(self.index.is_taken("username", "janedoe1234"))
+        self.assertTrue(self.index.is_taken("email", "jane@example.com"))
+        self.load.assert_called_once()
+
+    # Check the rows are reloaded once older than the refresh interval
+    @patch("app.availability.time.monotonic")
+    def test_refresh_interval(self, mock_monotonic):
+        mock_monotonic.return_value = 100
+        self.assertFalse(self.index.is_taken("username", "janedoe1234"))
+
+        self.load.return_value = [("janedoe1234", "jane@example.com")]
+        mock_monotonic.return_value = 150
+        self.assertFalse(self.index.is_taken("username", "janedoe1234"))
+        mock_monotonic.return_value = 161
+        self.assertTrue(self.index.is_taken("username", "janedoe1234"))
+        self.assertFalse(self.index.is_taken("username", "johndoe1234"))
+        self.assertEqual(self.load.call_count, 2)
+
+    # Check an expired index reloads on the next lookup
+    def test_expire(self):
+        self.index.is_taken("username", "johndoe1234")
+        self.load.return_value = []
+        self.index.expire()
+
+        self.assertFalse(self.index.is_taken("username", "johndoe1234"))
+        self.assertEqual(self.index.stats(), {"size": 0, "loads": 2})
+
+    # Check concurrent lookups on a stale index reload it only once
+    def test_single_reload(self):
+        self.index.is_taken("username", "johndoe1234")
+        started, release = threading.Event(), threading.Event()
+
+        def slow_load():
+            started.set()
+            release.wait(5)
+            return []
+
+        self.load.side_effect = slow_load
+        self.index.expire()
+        reloading = threading.Thread(
+            target=self.index.is_taken, args=("username", "johndoe1234")
+        )
+        reloading.start()
+        started.wait(5)
+
+        # Answered from the previous sets while the reload runs
+        self.assertTrue(self.index.is_taken("username", "johndoe1234"))
+        release.set()
+        reloading.join()
+        self.assertEqual(self.load.call_count, 2)
+        self.assertFalse(self.index.is_taken("username", "johndoe1234"))
+
+
+class TestAvailabilityAPI(AppTestCase):
+
+    # Check taken and free values are reported without logging in
+    def test_check_availability(self):
+        response = self.client.get(
+            "/api/availability?username=johndoe1234&email=jane@example.com"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, {"username": False, "email": True})
+        self.assertEqual(response.headers["Cache-Control"], "no-store")
+
+    # Check the database is only queried to load the index
+    def test_checks_served_from_memory(self):
+        response = self.client.get("/api/availability?username=janedoe1234")
+        self.assertEqual(response.headers["X-Query-Count"], "1")
+        response = self.client.get("/api/availability?username=janedoe12345")
+        self.assertEqual(response.headers["X-Query-Count"], "0")
+        self.assertTrue(response.json["username"])
+
+    # Check an employee registered through this worker is taken straight away
+    def test_registered_employee_is_taken(self):
+        self.client.get("/api/availability?username=janedoe1234")
+        self.client.post(
+            "/register",
+            data={
+                "name": "Jane",
+                "employee_number": 54321,
+                "email": "jane@example.com",
+                "username": "janedoe1234",
+                "password": "NewPassword123!",
+            },
+        )
+
+        response = self.client.get(
+            "/api/availability?username=janedoe1234&email=jane@example.com"
+        )
+        self.assertEqual(response.json, {"username": False, "email": False})
+        self.assertEqual(response.headers["X-Query-Count"], "0")
+
+    # Check bulk inserts, which skip ORM events, are seen after the refresh
+    def test_bulk_insert_seen_after_refresh(self):
+        self.client.get("/api/availability?username=bulkuser1234")
+        with self.app.app_context():
+            session = get_session()
+            session.execute(
+                insert(Employee),
+                [
+                    {
+                        "name": "Bulk User",
+                        "employee_number": 500,
+                        "username": "bulkuser1234",
+                        "email": "bulk@example.com",
+                        "password": "unused",
+                    }
+                ],
+            )
+            session.commit()
+
+        response = self.client.get("/api/availability?username=bulkuser1234")
+        self.assertTrue(response.json["username"])
+        self.app.extensions["availability_index"].expire()
+        response = self.client.get("/api/availability?username=bulkuser1234")
+        self.assertFalse(response.json["username"])
+
+    # Check only username and email changes reload the index
+    def test_update_expires_on_identity_change(self):
+        self.client.get("/api/availability?username=janedoe1234")
+        index = self.app.extensions["availability_index"]
+        with self.app.app_context():
+            session = get_session()
+            employee = session.get(Employee, 101)
+            employee.password = "rehashed"
+            session.commit()
+            self.client.get("/api/availability?username=janedoe1234")
+            self.assertEqual(index.stats()["loads"], 1)
+
+            employee.username = "janedoe1234"
+            session.commit()
+
+        response = self.client.get("/api/availability?username=janedoe1234")
+        self.assertFalse(response.json["username"])
+        self.assertEqual(index.stats()["loads"], 2)
+
+    # Check lookups are shed once their admission limit is reached
+    def test_admission_limited(self):
+        admission = self.app.extensions["admission"]
+        gate = admission.gates["api.check_availability"]
+        gate.queue = 0
+        for _ in range(gate.limit):
+            admission.admit(gate)
+
+        response = self.client.get("/api/availability?username=janedoe1234")
+        self.assertEqual(response.status_code, 503)
+
+    # Check a request without a username or email is rejected
+    def test_missing_fields(self):
+        response = self.client.get("/api/availability")
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+import io
+import os
+import unittest
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.bulk_import import (
+    detect_format,
+    import_reviews,
+    read_records,
+    validate_batch,
+)
+from app.database import get_session
+from app.models import Base, Employee, Review
+from app.tests.unit.base import AppTestCase
+
+VALID_RECORD = {
+    "employee_number": "1",
+    "review_date": "2024-09-20",
+    "reviewer_id": "12",
+    "overall_performance_rating": "Good",
+    "goals": "Goals for the review",
+    "reviewer_comments": "Great job!",
+}
+
+CSV_FILE = """employee_number,review_date,reviewer_id,overall_performance_rating,goals,reviewer_comments
+1,2024-09-20,12,Good,Goals for the review,Great job!
+1,20-09-2024,12,Good,Goals for the review,Great job!
+1,2024-09-21,-1,Good,Short,Great job!
+2,2024-09-22,12,Good,Goals for the review,Great job!
+1,2024-09-23,12,Outstanding,Goals for the review,Great job!
+1,2024-09-24,12,Excellent,Goals for the review,Well done.
+"""
+
+
+class TestValidateBatch(unittest.TestCase):
+
+    def validate(self, **changes):
+        rows, errors = validate_batch([{**VALID_RECORD, **changes}], lambda _: {1})
+        return rows, errors[0]
+
+    # Check a valid record is converted to insertable values
+    def test_valid_record(self):
+        rows, errors = self.validate()
+        self.assertEqual(errors, [])
+        self.assertEqual(rows[0]["review_date"], datetime(2024, 9, 20))
+        self.assertEqual(rows[0]["reviewer_id"], 12)
+
+    # Check each CreateReviewForm rule is applied
+    def test_form_rules(self):
+        cases = {
+            "review_date": ("not a date", "Not a valid date value."),
+            "reviewer_id": ("-1", "Reviewer ID must be a positive integer"),
+            "overall_performance_rating": ("Outstanding", "Not a valid choice."),
+            "goals": ("Short", "Field must be at least 10 characters long."),
+            "reviewer_comments": ("x" * 600, "Comments cannot exceed 500 characters"),
+        }
+        for field, (value, message) in cases.items():
+            rows, errors = self.validate(**{field: value})
+            self.assertEqual(rows, [])
+            self.assertEqual(errors, [f"{field}: {message}"])
+
+    # Check missing values and unknown employees are rejected
+    def test_required_and_unknown_employee(self):
+        _, errors = self.validate(goals="")
+        self.assertEqual(errors, ["goals: This field is required."])
+
+        _, errors = self.validate(employee_number="2")
+        self.assertEqual(errors, ["employee_number: Employee does not exist."])
+
+
+class TestReadRecords(unittest.TestCase):
+
+    # Check CSV records are numbered by their line in the file
+    def test_csv_line_numbers(self):
+        records = list(read_records(io.StringIO(CSV_FILE), "csv"))
+        self.assertEqual([line for line, _ in records], [2, 3, 4, 5, 6, 7])
+
+    # Check unreadable NDJSON lines are kept with no record and blank lines skipped
+    def test_ndjson(self):
+        stream = io.StringIO('{"goals": "abc"}\n\nnot json\n[1, 2]\n')
+        self.assertEqual(
+            list(read_records(stream, "ndjson")),
+            [(1, {"goals": "abc"}), (3, None), (4, None)],
+        )
+
+    # Check formats are detected from the file extension
+    def test_detect_format(self):
+        self.assertEqual(detect_format("reviews.CSV"), "csv")
+        self.assertEqual(detect_format("reviews.jsonl"), "ndjson")
+        with self.assertRaises(ValueError):
+            detect_format("reviews.xlsx")
+
+
+class TestImportReviews(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+        self.session.add(
+            Employee(
+                name="Jane Doe",
+                employee_number=1,
+                username="janedoe1234",
+                email="jane@example.com",
+                password="hashed_password",
+            )
+        )
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+
+    # Check valid rows are inserted across batches and rejected rows reported
+    def test_import_csv(self):
+        report = import_reviews(self.session, io.StringIO(CSV_FILE), "csv", 2)
+
+        self.assertEqual(report.inserted, 2)
+        self.assertEqual([line for line, _ in report.rejected], [3, 4, 5, 6])
+        self.assertIn("reviewer_id", report.rejected[1][1])
+        self.assertIn("goals", report.rejected[1][1])
+        self.assertEqual(
+            [review.reviewer_comments for review in self.session.query(Review)],
+            ["Great job!", "Well done."],
+        )
+
+
+class TestImportCommandAndRoute(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.csv_file = CSV_FILE.replace("\n1,", "\n101,")
+
+    def review_count(self):
+        with self.app.app_context():
+            return get_session().query(Review).count()
+
+    # Check the CLI command imports the file and reports rejected lines
+    def test_import_command(self):
+        path = os.path.join(self.tmp.name, "reviews.csv")
+        with open(path, "w") as f:
+            f.write(self.csv_file)
+
+        result = self.app.test_cli_runner().invoke(args=["import-reviews", path])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Imported 2 reviews, rejected 4 rows.", result.output)
+        self.assertIn("Line 3: review_date: Not a valid date value.", result.output)
+        # The seeded review plus the two imported
+        self.assertEqual(self.review_count(), 3)
+
+    # Check an admin can upload a file of reviews
+    def test_admin_upload(self):
+        self.login(101)
+
+        response = self.client.post(
+            "/import-reviews",
+            data={"file": (io.BytesIO(self.csv_file.encode()), "reviews.csv")},
+            content_type="multipart/form-data",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"Imported 2 reviews, rejected 4 rows.", response.data)
+        self.assertEqual(self.review_count(), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+from unittest.mock import patch
+from app.cache import CachedUser, LRUCache
+from app.database import get_session
+from app.models import Employee
+from app.tests.unit.base import AppTestCase
+
+
+class TestLRUCache(unittest.TestCase):
+
+    # Check the least recently used entry is evicted when full
+    def test_lru_eviction(self):
+        cache = LRUCache(maxsize=2)
+        cache.set(1, "one")
+        cache.set(2, "two")
+        cache.get(1)
+        cache.set(3, "three")
+
+        self.assertEqual(cache.get(1), "one")
+        self.assertIsNone(cache.get(2))
+        self.assertEqual(cache.get(3), "three")
+
+    # Check entries expire after the TTL
+    @patch("app.cache.time.monotonic")
+    def test_ttl_expiry(self, mock_monotonic):
+        cache = LRUCache(maxsize=2, ttl=10)
+        mock_monotonic.return_value = 100
+        cache.set(1, "one")
+
+        mock_monotonic.return_value = 109
+        self.assertEqual(cache.get(1), "one")
+        mock_monotonic.return_value = 111
+        self.assertIsNone(cache.get(1))
+
+    # Check hits, misses and invalidation are counted
+    def test_stats_and_invalidate(self):
+        cache = LRUCache(maxsize=2)
+        cache.set(1, "one")
+        cache.get(1)
+        cache.invalidate(1)
+        cache.get(1)
+
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "size": 0})
+
+
+class TestUserLoaderCache(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user_cache = self.app.extensions["user_cache"]
+
+        self.login(101)
+
+    # Check the employee is loaded once and served from the cache afterwards
+    def test_cached_between_requests(self):
+        self.client.get("/home")
+        self.client.get("/home")
+        response = self.client.get("/home")
+
+        self.assertIn(b"Welcome, John Doe!", response.data)
+        self.assertEqual(self.user_cache.stats()["misses"], 1)
+        self.assertEqual(self.user_cache.stats()["hits"], 2)
+
+    # Check updating the employee evicts the cached copy
+    def test_invalidated_on_update(self):
+        self.client.get("/home")
+
+        with self.app.app_context():
+            session = get_session()
+            session.get(Employee, 101).name = "Johnny Doe"
+            session.commit()
+
+        response = self.client.get("/home")
+        self.assertIn(b"Welcome, Johnny Doe!", response.data)
+        self.assertEqual(self.user_cache.stats()["misses"], 2)
+
+    # Check a change is only evicted once it commits, and not at all if rolled back
+    def test_evicted_on_commit_only(self):
+        self.client.get("/home")
+
+        with self.app.app_context():
+            session = get_session()
+            session.get(Employee, 101).name = "Johnny Doe"
+            session.flush()
+            self.assertIsNotNone(self.user_cache.get(101))
+            session.rollback()
+            self.assertIsNotNone(self.user_cache.get(101))
+
+            session.get(Employee, 101).name = "Johnny Doe"
+            session.flush()
+            session.commit()
+            self.assertIsNone(self.user_cache.get(101))
+
+    # Check the cache holds plain user values rather than session bound employees
+    def test_caches_plain_values(self):
+        self.client.get("/home")
+
+        user = self.user_cache.get(101)
+        self.assertIsInstance(user, CachedUser)
+        self.assertEqual(user.get_id(), 101)
+        self.assertEqual(user.username, "johndoe1234")
+        self.assertTrue(user.is_admin)
+        self.assertFalse(hasattr(user, "password"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import gzip
+import unittest
+from werkzeug.test import Client
+from werkzeug.wrappers import Response
+from app.compression import CompressionMiddleware
+from app.tests.unit.base import AppTestCase
+
+HTML = b"<div class='card'>Performance Review</div>\n" * 100
+
+
+def make_client(response, **options):
+    """Client for a WSGI app that always returns the given response"""
+    return Client(CompressionMiddleware(response, **options))
+
+
+class TestCompressionMiddleware(unittest.TestCase):
+
+    # Check large text bodies are gzipped with a matching Content-Length
+    def test_gzip(self):
+        client = make_client(Response(HTML, mimetype="text/html"))
+        response = client.get("/", headers={"Accept-Encoding": "gzip, deflate"})
+
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(int(response.headers["Content-Length"]), len(response.data))
+        self.assertLess(len(response.data), len(HTML))
+        self.assertEqual(gzip.decompress(response.data), HTML)
+        self.assertEqual(response.headers["Vary"], "Accept-Encoding")
+
+    # Check the level is passed through to the compressor
+    def test_level(self):
+        fast = make_client(Response(HTML, mimetype="text/html"), level=1)
+        best = make_client(Response(HTML, mimetype="text/html"), level=9)
+        headers = {"Accept-Encoding": "gzip"}
+
+        self.assertGreaterEqual(
+            len(fast.get("/", headers=headers).data),
+            len(best.get("/", headers=headers).data),
+        )
+
+    # Check clients that do not accept gzip get the body as it is
+    def test_not_accepted(self):
+        client = make_client(Response(HTML, mimetype="text/html"))
+        response = client.get("/")
+
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertEqual(response.data, HTML)
+        self.assertEqual(response.headers["Vary"], "Accept-Encoding")
+
+    # Check small, binary and already encoded bodies are left alone
+    def test_skipped(self):
+        headers = {"Accept-Encoding": "gzip"}
+        small = make_client(Response(b"<p>small</p>", mimetype="text/html"))
+        self.assertEqual(small.get("/", headers=headers).data, b"<p>small</p>")
+
+        responses = [
+            Response(HTML, mimetype="image/png"),
+            Response(HTML, mimetype="text/css", headers={"Content-Encoding": "br"}),
+            Response(
+                HTML, mimetype="text/html", headers={"Cache-Control": "no-transform"}
+            ),
+        ]
+        for original in responses:
+            response = make_client(original).get("/", headers=headers)
+            self.assertEqual(response.data, HTML)
+            self.assertNotEqual(response.headers.get("Content-Encoding"), "gzip")
+
+        head = make_client(Response(HTML, mimetype="text/html")).head(
+            "/", headers=headers
+        )
+        self.assertNotIn("Content-Encoding", head.headers)
+
+    # Check streamed bodies are compressed chunk by chunk
+    def test_streamed(self):
+        chunks = [b"employee_number,goals\n"] + [b"101,Lead the team\n" * 50] * 5
+        client = make_client(Response(iter(chunks), mimetype="text/csv"))
+        response = client.get("/", headers={"Accept-Encoding": "gzip"}, buffered=False)
+
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertNotIn("Content-Length", response.headers)
+        parts = list(response.iter_encoded())
+        self.assertGreater(len([part for part in parts if part]), 1)
+        self.assertEqual(gzip.decompress(b"".join(parts)), b"".join(chunks))
+        response.close()
+
+
+class TestCompressedConditionalGet(AppTestCase):
+
+    CONFIG = {"COMPRESSION_MIN_SIZE": 0}
+
+    def setUp(self):
+        super().setUp()
+        self.login(101)
+
+    # Check compressed responses get their own ETag that still revalidates
+    def test_etag_round_trip(self):
+        headers = {"Accept-Encoding": "gzip"}
+        response = self.client.get("/api/reviews", headers=headers)
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        etag = response.headers["ETag"]
+        self.assertTrue(etag.endswith('-gzip"'))
+
+        unchanged = self.client.get(
+            "/api/reviews", headers={**headers, "If-None-Match": etag}
+        )
+        self.assertEqual(unchanged.status_code, 304)
+        self.assertEqual(unchanged.headers["ETag"], etag)
+
+
+if __name__ == "__main__":
+    unittest.main()
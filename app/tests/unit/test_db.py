@@ -1,48 +1,123 @@
+import os
+import tempfile
 import unittest
+from datetime import datetime
 from unittest.mock import MagicMock, patch
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from app.database import add_employee, add_review, get_session, init_engine
+from flask import Flask
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.schema import CreateTable
+from app.database import (
+    Session,
+    TimedQueuePool,
+    add_employee,
+    add_review,
+    build_engine,
+    get_session,
+    init_engine,
+    init_schema,
+    remove_session,
+)
 from app.models import Base, Employee, Review
+from app.tests.unit.base import AppTestCase
 
 
 class TestDatabaseInitialization(unittest.TestCase):
 
+    @patch("app.database.event")
     @patch("app.database.create_engine")
     @patch("app.database.Base.metadata.create_all")
-    def test_init_engine(self, mock_create_all, mock_create_engine):
-        """Test that the engine is initialized and tables are created."""
+    def test_init_engine(self, mock_create_all, mock_create_engine, mock_event):
+        """Test that the engine is initialized and the schema left to init_schema."""
 
         # Call the init_engine function with test database URI
         test_db_uri = "sqlite:///:memory:"
         init_engine(test_db_uri)
 
-        # Check create_engine was called with the correct database URI
-        mock_create_engine.assert_called_once_with(test_db_uri, echo=True)
-
-        # Check the create_all method was called with the correct engine
-        mock_create_all.assert_called_once_with(mock_create_engine.return_value)
+        # Check create_engine was called with the correct database URI, SQL echo off
+        mock_create_engine.assert_called_once_with(
+            test_db_uri, echo=False, pool_pre_ping=True
+        )
+        mock_create_all.assert_not_called()
 
         from app.database import engine
 
         self.assertEqual(engine, mock_create_engine.return_value)
 
-    @patch("app.database.scoped_session")
-    @patch("app.database.engine")
-    def test_get_session_success(self, mock_engine, mock_scoped_session):
-        """Test that a session is retrieved successfully when engine is initialized."""
+    @patch("app.database.event")
+    @patch("app.database.create_engine")
+    def test_build_engine_pool_options(self, mock_create_engine, mock_event):
+        """Test that pool sizing and SQL echo are read from the options."""
+        build_engine(
+            "sqlite:///epms.db",
+            {"SQLALCHEMY_ECHO": True, "SQLALCHEMY_POOL_SIZE": 3},
+        )
+
+        mock_create_engine.assert_called_once_with(
+            "sqlite:///epms.db",
+            echo=True,
+            pool_pre_ping=True,
+            poolclass=TimedQueuePool,
+            pool_size=3,
+            max_overflow=10,
+            pool_recycle=1800,
+        )
+
+    def test_build_engine_sqlite_pragmas(self):
+        """Test that SQLite connections are opened with the performance pragmas."""
+        with tempfile.TemporaryDirectory() as tmp:
+            test_engine = build_engine(
+                f"sqlite:///{os.path.join(tmp, 'epms.db')}",
+                {"SQLITE_BUSY_TIMEOUT": 1234},
+            )
+            with test_engine.connect() as connection:
+
+                def pragma(name):
+                    return connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+                self.assertEqual(pragma("journal_mode"), "wal")
+                # NORMAL
+                self.assertEqual(pragma("synchronous"), 1)
+                self.assertEqual(pragma("busy_timeout"), 1234)
+                self.assertEqual(pragma("cache_size"), -64000)
+            test_engine.dispose()
+
+    def test_get_session_success(self):
+        """Test that a session bound to the engine is retrieved when engine is initialized."""
+        test_engine = create_engine("sqlite:///:memory:")
 
-        session_instance = get_session()
+        with patch("app.database.engine", new=test_engine):
+            Session.configure(bind=test_engine)
+            session_instance = get_session()
 
-        # Check that scoped_session was called (not concerned with exact sessionmaker)
-        self.assertTrue(mock_scoped_session.called)
+            # Check the same session is returned within one scope
+            self.assertIs(session_instance, get_session())
 
-        # Check that the session instance returned is from the scoped session
-        self.assertEqual(session_instance, mock_scoped_session.return_value())
+            # Check that the session is bound to the engine
+            self.assertEqual(session_instance.get_bind(), test_engine)
 
-        # Check that bind is set to the mocked engine
-        mock_sessionmaker = mock_scoped_session.call_args[0][0]
-        self.assertEqual(mock_sessionmaker.kw['bind'], mock_engine)
+            remove_session()
+
+    def test_session_scoped_to_app_context(self):
+        """Test that each app context gets its own session, closed on teardown."""
+        app = Flask(__name__)
+        app.teardown_appcontext(remove_session)
+        test_engine = create_engine("sqlite:///:memory:")
+
+        with patch("app.database.engine", new=test_engine):
+            Session.configure(bind=test_engine)
+
+            with app.app_context():
+                first = get_session()
+                first.execute(text("SELECT 1"))
+                self.assertTrue(first.in_transaction())
+
+            # Teardown closed the session and released its connection
+            self.assertFalse(first.in_transaction())
+
+            with app.app_context():
+                second = get_session()
+
+            self.assertIsNot(first, second)
 
     def test_get_session_no_engine(self):
         """Test that get_session raises a RuntimeError when engine is not initialized."""
@@ -63,8 +138,8 @@ class TestDatabaseInitialization(unittest.TestCase):
         # Create a mock session instance
         session = mock_session.return_value
 
-        # Mock the count to return 0 (table is empty)
-        session.query.return_value.count.return_value = 0
+        # Mock the first employee to be missing (table is empty)
+        session.query.return_value.first.return_value = None
 
         add_employee(
             session,
@@ -79,6 +154,8 @@ class TestDatabaseInitialization(unittest.TestCase):
         # Check that the new employee was added and session committed
         self.assertEqual(session.add.call_count, 1)
         self.assertEqual(session.commit.call_count, 1)
+        # Check the employees are not counted just to see if any exist
+        session.query.return_value.count.assert_not_called()
 
         # Verify the correct employee was added
         new_employee = session.add.call_args[0][0]
@@ -95,8 +172,8 @@ class TestDatabaseInitialization(unittest.TestCase):
 
         session = mock_session.return_value
 
-        # Mock the count to return 0 (table is empty)
-        session.query.return_value.count.return_value = 0
+        # Mock the first review to be missing (table is empty)
+        session.query.return_value.first.return_value = None
 
         add_review(
             session,
@@ -110,6 +187,8 @@ class TestDatabaseInitialization(unittest.TestCase):
 
         self.assertEqual(session.add.call_count, 1)
         self.assertEqual(session.commit.call_count, 1)
+        # Check the reviews are not counted just to see if any exist
+        session.query.return_value.count.assert_not_called()
 
         # Verify the correct review was added
         new_review = session.add.call_args[0][0]
@@ -122,5 +201,109 @@ class TestDatabaseInitialization(unittest.TestCase):
         self.assertEqual(new_review.reviewer_comments, "Great performance!")
 
 
+class TestFastBoot(AppTestCase):
+
+    CONFIG = {"FAST_BOOT": True}
+
+    def test_init_db_command(self):
+        """Test that fast boot leaves the schema and seed data to init-db."""
+        from app.database import engine
+
+        self.assertEqual(inspect(engine).get_table_names(), [])
+
+        result = self.app.test_cli_runner().invoke(args=["init-db"])
+
+        self.assertIn("Database initialised.", result.output)
+        self.assertIn("reviews", inspect(engine).get_table_names())
+        with self.app.app_context():
+            self.assertEqual(get_session().get(Employee, 101).username, "johndoe1234")
+
+    def test_startup_timings(self):
+        """Test that each phase of create_app is timed and reported."""
+        timings = self.app.extensions["startup_timings"]
+        self.assertEqual(
+            list(timings)[:4], ["configure", "middleware", "csrf", "database"]
+        )
+        self.assertLess(timings["populate"], 0.01)
+
+        result = self.app.test_cli_runner().invoke(args=["startup-report"])
+        self.assertIn("database", result.output)
+        self.assertIn("total", result.output)
+
+
+class TestReviewIds(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine(
+            f"sqlite:///{os.path.join(self.tmp.name, 'epms.db')}"
+        )
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def insert_review(self, connection, review_id=None):
+        values = {
+            "employee_number": 101,
+            "review_date": datetime(2024, 1, 1),
+            "reviewer_id": 102,
+            "overall_performance_rating": "Good",
+            "goals": "Lead the planning sessions",
+            "reviewer_comments": "Good progress",
+        }
+        if review_id is not None:
+            values["review_id"] = review_id
+        return connection.execute(
+            Review.__table__.insert(), values
+        ).inserted_primary_key[0]
+
+    def table_sql(self):
+        with self.engine.connect() as connection:
+            return connection.exec_driver_sql(
+                "SELECT sql FROM sqlite_master WHERE name = 'reviews'"
+            ).scalar()
+
+    def test_deleted_review_id_not_reused(self):
+        """Test that a new review never takes the id of a deleted one."""
+        init_schema(self.engine)
+        with self.engine.begin() as connection:
+            review_id = self.insert_review(connection)
+            connection.execute(Review.__table__.delete())
+            self.assertGreater(self.insert_review(connection), review_id)
+
+    def test_existing_table_rebuilt_with_autoincrement(self):
+        """Test that init_schema rebuilds a reviews table created without AUTOINCREMENT."""
+        legacy = str(CreateTable(Review.__table__).compile(self.engine)).replace(
+            " AUTOINCREMENT", ""
+        )
+        Employee.__table__.create(self.engine)
+        with self.engine.begin() as connection:
+            connection.exec_driver_sql(legacy)
+            self.insert_review(connection, review_id=5)
+
+        init_schema(self.engine)
+
+        self.assertIn("AUTOINCREMENT", self.table_sql())
+        index_names = {
+            index["name"] for index in inspect(self.engine).get_indexes("reviews")
+        }
+        self.assertIn("ix_reviews_employee_date", index_names)
+        with self.engine.begin() as connection:
+            triggers = (
+                connection.exec_driver_sql(
+                    "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+                )
+                .scalars()
+                .all()
+            )
+            self.assertIn("reviews_fts_insert", triggers)
+            self.assertEqual(
+                connection.exec_driver_sql("SELECT review_id FROM reviews").scalar(), 5
+            )
+            connection.execute(Review.__table__.delete())
+            self.assertEqual(self.insert_review(connection), 6)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,146 @@
+import csv
+import io
+import json
+import unittest
+from datetime import date, datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import get_session
+from app.export import export_statement, iter_csv, iter_ndjson
+from app.models import Base, Employee, Review
+from app.tests.unit.base import AppTestCase
+
+
+class TestExportWriters(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+
+        for employee_number in (1, 2):
+            self.session.add(
+                Employee(
+                    name="Jane Doe",
+                    employee_number=employee_number,
+                    username=f"janedoe{employee_number:04}",
+                    email=f"jane{employee_number}@example.com",
+                    password="hashed_password",
+                )
+            )
+        for day in range(1, 6):
+            self.session.add(
+                Review(
+                    review_id=day,
+                    employee_number=1 if day % 2 else 2,
+                    review_date=datetime(2024, 1, day),
+                    reviewer_id=10 + day,
+                    overall_performance_rating="Good",
+                    goals="Goals, with a comma",
+                    reviewer_comments=f"Comment {day}",
+                )
+            )
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def read_csv(self, statement):
+        return list(
+            csv.DictReader(io.StringIO("".join(iter_csv(self.session, statement))))
+        )
+
+    # Check CSV export writes a header and one row per review, newest first
+    def test_csv_export(self):
+        rows = self.read_csv(export_statement())
+
+        self.assertEqual([row["review_id"] for row in rows], ["5", "4", "3", "2", "1"])
+        self.assertEqual(rows[0]["review_date"], "2024-01-05")
+        self.assertEqual(rows[0]["goals"], "Goals, with a comma")
+
+    # Check the header is sent before any rows are fetched
+    def test_csv_header_first(self):
+        chunks = iter_csv(self.session, export_statement())
+        self.assertTrue(next(chunks).startswith("review_id,employee_number"))
+
+    # Check NDJSON export writes one JSON object per line
+    def test_ndjson_export(self):
+        text = "".join(iter_ndjson(self.session, export_statement(sort_order="oldest")))
+        records = [json.loads(line) for line in text.splitlines()]
+
+        self.assertEqual([record["review_id"] for record in records], [1, 2, 3, 4, 5])
+        self.assertEqual(records[0]["review_date"], "2024-01-01")
+        self.assertEqual(records[0]["reviewer_comments"], "Comment 1")
+
+    # Check employee and inclusive date range filters
+    def test_filters(self):
+        rows = self.read_csv(
+            export_statement(
+                employee_number=1,
+                start_date=date(2024, 1, 2),
+                end_date=date(2024, 1, 5),
+            )
+        )
+        self.assertEqual([row["review_id"] for row in rows], ["5", "3"])
+
+
+class TestExportRoute(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        with self.app.app_context():
+            session = get_session()
+            session.add(
+                Employee(
+                    name="Jane Doe",
+                    employee_number=202,
+                    username="janedoe1234",
+                    email="jane@example.com",
+                    password="hashed_password",
+                )
+            )
+            session.commit()
+
+    # Check an admin receives the CSV export
+    def test_admin_export(self):
+        self.login(101)
+        response = self.client.get("/export-reviews?format=csv")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "text/csv")
+        self.assertTrue(response.is_streamed)
+        self.assertIn(b"My main goal", response.data)
+
+    # Check an unsupported format is rejected
+    def test_unsupported_format(self):
+        self.login(101)
+        response = self.client.get("/export-reviews?format=xml")
+        self.assertEqual(response.status_code, 400)
+
+    # Check malformed filters are rejected rather than ignored
+    def test_invalid_filters(self):
+        self.login(101)
+        for query in (
+            "start_date=2024-13-01",
+            "end_date=04/09/2024",
+            "employee_number=abc",
+        ):
+            with self.subTest(query=query):
+                response = self.client.get(f"/export-reviews?{query}")
+                self.assertEqual(response.status_code, 400)
+
+        response = self.client.get("/export-reviews?start_date=2024-09-04&end_date=")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"My main goal", response.data)
+
+    # Check regular users are redirected home
+    def test_regular_user_redirected(self):
+        self.login(202)
+        response = self.client.get("/export-reviews")
+        self.assertEqual(response.status_code, 302)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,16 @@
 import unittest
+from types import SimpleNamespace
 from flask import Flask
 from flask_wtf import FlaskForm
+from sqlalchemy.exc import IntegrityError
 from wtforms.validators import ValidationError
-from app.forms import LoginForm, RegistrationForm, CreateReviewForm
-from app.models import Employee
-from unittest.mock import patch, MagicMock
+from app.forms import (
+    CreateReviewForm,
+    LoginForm,
+    REGISTRATION_CONFLICTS,
+    RegistrationForm,
+)
+from unittest.mock import MagicMock
 from datetime import date
 
 
@@ -49,16 +55,10 @@ class TestRegistrationForm(unittest.TestCase):
         self.session = MagicMock()
 
     def rollback(self):
-        self.session.rollback() 
+        self.session.rollback()
         self.session.remove()
 
-    @patch("app.forms.get_session")
-    def test_valid_registration_form(self, mock_get_session):
-        # Mock the session to simulate that the username and email are not already taken
-        mock_session = mock_get_session.return_value
-        # No employee found
-        mock_session.query(Employee).filter_by.return_value.first.return_value = None
-
+    def test_valid_registration_form(self):
         with self.app.test_request_context():
             form = RegistrationForm(
                 name="Valid Name",
@@ -70,12 +70,11 @@ class TestRegistrationForm(unittest.TestCase):
 
             self.assertTrue(form.validate())
 
-    # Check if username already exists
-    @patch("app.forms.get_session")
-    def test_username_already_taken(self, mock_get_session):
-        mock_session = mock_get_session.return_value
-        mock_session.query(Employee).filter_by.return_value.first.return_value = True
-
+    # Check a duplicate username reported by the database becomes a field error
+    def test_username_already_taken(self):
+        error = IntegrityError(
+            "INSERT", {}, Exception("UNIQUE constraint failed: employees.username")
+        )
         with self.app.test_request_context():
             form = RegistrationForm(
                 name="Valid Name",
@@ -84,8 +83,14 @@ class TestRegistrationForm(unittest.TestCase):
                 username="takenusername",
                 password="ValidPassword1!",
             )
-            with self.assertRaises(ValidationError):
-                form.validate_username(form.username)
+            form.validate()
+            self.assertTrue(form.add_conflict_errors(error))
+            self.assertEqual(
+                form.username.errors,
+                ["That username is taken. Please choose a different one."],
+            )
+            self.assertEqual(form.email.errors, [])
+            self.assertEqual(form.employee_number.errors, [])
 
     # Check password is invalid
     def test_invalid_password_complexity(self):
@@ -101,11 +106,10 @@ class TestRegistrationForm(unittest.TestCase):
                 form.validate_password(form.password)
 
     # Check for existing email
-    @patch("app.forms.get_session")
-    def test_email_already_in_use(self, mock_get_session):
-        mock_session = mock_get_session.return_value
-        mock_session.query(Employee).filter_by.return_value.first.return_value = True
-
+    def test_email_already_in_use(self):
+        error = IntegrityError(
+            "INSERT", {}, Exception("UNIQUE constraint failed: employees.email")
+        )
         with self.app.test_request_context():
             form = RegistrationForm(
                 name="Valid Name",
@@ -114,8 +118,101 @@ class TestRegistrationForm(unittest.TestCase):
                 username="validusername",
                 password="ValidPassword1!",
             )
-            with self.assertRaises(ValidationError):
-                form.validate_email(form.email)
+            form.validate()
+            self.assertTrue(form.add_conflict_errors(error))
+            self.assertEqual(
+                form.email.errors,
+                ["There is already an account with this email. Please login."],
+            )
+            self.assertEqual(form.username.errors, [])
+
+    # Check an existing employee number, the primary key, is reported on its field
+    def test_employee_number_already_registered(self):
+        error = IntegrityError(
+            "INSERT",
+            {},
+            Exception("UNIQUE constraint failed: employees.employee_number"),
+        )
+        with self.app.test_request_context():
+            form = RegistrationForm(employee_number=1234)
+            form.validate()
+            self.assertTrue(form.add_conflict_errors(error))
+            self.assertEqual(
+                form.employee_number.errors,
+                ["This employee number already exists. Please log in instead."],
+            )
+
+    # Check PostgreSQL and MySQL errors are mapped by their constraint names
+    def test_constraint_names(self):
+        messages = {
+            "username": 'duplicate key value violates unique constraint "employees_username_key"',
+            "email": "Duplicate entry 'a@example.com' for key 'employees.email'",
+            "employee_number": 'duplicate key value violates unique constraint "employees_pkey"',
+        }
+        for field, message in messages.items():
+            with self.subTest(field=field), self.app.test_request_context():
+                form = RegistrationForm(
+                    name="Valid Name",
+                    employee_number=1234,
+                    email="valid@example.com",
+                    username="validusername",
+                    password="ValidPassword1!",
+                )
+                form.validate()
+                error = IntegrityError("INSERT", {}, Exception(message))
+
+                self.assertTrue(form.add_conflict_errors(error))
+                self.assertEqual(form.errors, {field: [REGISTRATION_CONFLICTS[field]]})
+
+    def registration_form(self):
+        form = RegistrationForm(
+            name="Valid Name",
+            employee_number=1234,
+            email="valid@example.com",
+            username="validusername",
+            password="ValidPassword1!",
+        )
+        form.validate()
+        return form
+
+    # Check submitted values quoting constraint names cannot pick the field
+    def test_constraint_name_in_value(self):
+        messages = {
+            "email": "Duplicate entry 'ix_employees_email' for key 'employees.email'",
+            "username": "Duplicate entry 'x' for key 'employees.email'' for key "
+            "'employees.username'",
+        }
+        for field, message in messages.items():
+            with self.subTest(field=field), self.app.test_request_context():
+                form = self.registration_form()
+                error = IntegrityError("INSERT", {}, Exception(message))
+
+                self.assertTrue(form.add_conflict_errors(error))
+                self.assertEqual(form.errors, {field: [REGISTRATION_CONFLICTS[field]]})
+
+    # Check PostgreSQL errors are mapped by the constraint name the driver reports
+    def test_postgresql_diagnostics(self):
+        orig = Exception(
+            'duplicate key value violates unique constraint "employees_email_key"\n'
+            "DETAIL:  Key (email)=(employees_username_key) already exists."
+        )
+        orig.diag = SimpleNamespace(constraint_name="employees_email_key")
+        error = IntegrityError("INSERT", {}, orig)
+        with self.app.test_request_context():
+            form = self.registration_form()
+
+            self.assertTrue(form.add_conflict_errors(error))
+            self.assertEqual(form.errors, {"email": [REGISTRATION_CONFLICTS["email"]]})
+
+    # Check errors not naming a unique field are left to the caller
+    def test_unrelated_integrity_error(self):
+        error = IntegrityError(
+            "INSERT", {}, Exception("NOT NULL constraint failed: employees.name")
+        )
+        with self.app.test_request_context():
+            form = RegistrationForm()
+            form.validate()
+            self.assertFalse(form.add_conflict_errors(error))
 
 
 class TestCreateReviewForm(unittest.TestCase):
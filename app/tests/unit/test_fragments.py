@@ -0,0 +1,133 @@
+import unittest
+from datetime import datetime
+from app.database import get_session
+from app.models import Employee, Review
+from app.tests.unit.base import AppTestCase
+
+
+class TestReviewCardCache(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cache = self.app.extensions["review_card_cache"]
+
+        with self.app.app_context():
+            session = get_session()
+            session.add(
+                Employee(
+                    name="Jane Doe",
+                    employee_number=202,
+                    username="janedoe1234",
+                    email="jane@example.com",
+                    password="hashed_password",
+                )
+            )
+            session.add(
+                Review(
+                    employee_number=202,
+                    review_date=datetime(2024, 2, 1),
+                    reviewer_id=101,
+                    overall_performance_rating="Good",
+                    goals="Improve presentation skills",
+                    reviewer_comments="Presented well",
+                )
+            )
+            session.commit()
+
+    def edit(self, review_id, goals):
+        return self.client.post(
+            f"/edit-review/{review_id}",
+            data={
+                "review_date": "2024-02-01",
+                "reviewer_id": 101,
+                "overall_performance_rating": "Good",
+                "goals": goals,
+                "reviewer_comments": "Presented well",
+            },
+        )
+
+    # Check cards are rendered once and then served from the cache
+    def test_cards_cached(self):
+        self.login(101)
+        first = self.client.get("/home?all_reviews=True")
+        self.assertEqual(self.cache.stats()["misses"], 2)
+
+        second = self.client.get("/home?all_reviews=True")
+        self.assertEqual(self.cache.stats()["hits"], 2)
+        self.assertEqual(first.data, second.data)
+        self.assertIn(b"Improve presentation skills", second.data)
+
+    # Check the admin and employee variants of a card are cached separately
+    def test_cards_per_viewer_role(self):
+        self.login(101)
+        admin_page = self.client.get("/home?all_reviews=True")
+        self.assertIn(b"Created By", admin_page.data)
+
+        self.login(202)
+        employee_page = self.client.get("/home")
+        self.assertNotIn(b"Created By", employee_page.data)
+        self.assertEqual(self.cache.stats()["size"], 3)
+
+    # Check editing a review drops its cached card and renders the new content
+    def test_edit_invalidates_card(self):
+        self.login(202)
+        self.client.get("/home")
+        self.assertEqual(self.cache.stats()["size"], 1)
+
+        self.edit(2, "Mentor new starters in the team")
+        self.assertEqual(self.cache.stats()["size"], 0)
+
+        response = self.client.get("/home")
+        self.assertIn(b"Mentor new starters", response.data)
+        self.assertNotIn(b"Improve presentation skills", response.data)
+
+    # Check deleting a review drops its cached card
+    def test_delete_invalidates_card(self):
+        self.login(101)
+        self.client.get("/home?all_reviews=True")
+        self.client.post("/delete-review/2")
+
+        self.assertEqual(self.cache.stats()["size"], 1)
+        response = self.client.get("/home?all_reviews=True")
+        self.assertNotIn(b"Improve presentation skills", response.data)
+
+    # Check a card cached before an edit made elsewhere is not served
+    def test_version_change_misses(self):
+        self.login(202)
+        self.client.get("/home")
+        with self.app.app_context():
+            session = get_session()
+            session.get(Review, 2).goals = "Edited outside the request cycle"
+            session.commit()
+
+        response = self.client.get("/home")
+        self.assertIn(b"Edited outside the request cycle", response.data)
+
+    # Check a review created after a delete made elsewhere gets its own card
+    def test_deleted_review_id_not_reused(self):
+        self.login(202)
+        self.client.get("/home")
+        with self.app.app_context():
+            session = get_session()
+            # Another worker deletes the review, leaving this cache untouched
+            session.delete(session.get(Review, 2))
+            session.commit()
+            session.add(
+                Review(
+                    employee_number=202,
+                    review_date=datetime(2024, 3, 1),
+                    reviewer_id=101,
+                    overall_performance_rating="Good",
+                    goals="Run the team retrospectives",
+                    reviewer_comments="Ran them well",
+                )
+            )
+            session.commit()
+
+        response = self.client.get("/home")
+        self.assertIn(b"Run the team retrospectives", response.data)
+        self.assertNotIn(b"Improve presentation skills", response.data)
+
+
+if __name__ == "__main__":
+    unittest.main()
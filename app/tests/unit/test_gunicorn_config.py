@@ -0,0 +1,39 @@
+import unittest
+import gunicorn_config
+from app import database
+from app.tests.unit.base import AppTestCase
+
+
+class TestWorkerCount(unittest.TestCase):
+
+    # Check workers follow 2 * CPUs + 1 when memory allows
+    def test_cpu_bound(self):
+        self.assertEqual(gunicorn_config.worker_count(1, 4096, 128), 3)
+        self.assertEqual(gunicorn_config.worker_count(4, 4096, 128), 9)
+
+    # Check workers are capped by memory, but never below one
+    def test_memory_bound(self):
+        self.assertEqual(gunicorn_config.worker_count(4, 512, 128), 4)
+        self.assertEqual(gunicorn_config.worker_count(4, 64, 128), 1)
+
+    # Check each worker's password hashing processes count towards memory
+    def test_hash_workers_memory(self):
+        self.assertEqual(gunicorn_config.worker_count(4, 1024, 128, 1, 64), 5)
+        self.assertEqual(gunicorn_config.worker_count(4, 1024, 128, 2, 64), 4)
+
+
+class TestPostFork(AppTestCase):
+
+    # Check a forked worker replaces the pool inherited from the master
+    def test_disposes_inherited_pool(self):
+        pool = database.engine.pool
+        self.assertGreater(pool.checkedin(), 0)
+
+        gunicorn_config.post_fork(None, None)
+
+        self.assertIsNot(database.engine.pool, pool)
+        self.assertEqual(database.engine.pool.checkedin(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,7 @@
 import unittest
 from flask_login import UserMixin
-from app import create_app
 from app.database import get_session
+from app.tests.unit.base import AppTestCase
 
 
 # Set users to differentiate by
@@ -12,16 +12,10 @@ class User(UserMixin):
         self.employee_number = employee_number
 
 
-class ReviewRoutesTestCase(unittest.TestCase):
+class ReviewRoutesTestCase(AppTestCase):
 
     def setUp(self):
-        self.app = create_app(
-            {
-                "TESTING": True,
-                "WTF_CSRF_ENABLED": False,
-            }
-        )
-        self.client = self.app.test_client()
+        super().setUp()
 
         # Create a test user
         self.test_user = User(id="test_user123", employee_number=123, is_admin=False)
@@ -36,13 +30,18 @@ class ReviewRoutesTestCase(unittest.TestCase):
         self.session.rollback = lambda: None
 
         # Push application context
-        self.app.app_context().push()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
 
         # Register the test user in the session
         self.client.post(
             "/login", data={"username": "testuser123", "password": "Testpassword123!"}
         )
 
+    def tearDown(self):
+        self.app_context.pop()
+        super().tearDown()
+
     def login(self, user):
         with self.client:
             self.client.post(
@@ -0,0 +1,121 @@
+import re
+import unittest
+from app.metrics import Histogram, Metrics
+from app.tests.unit.base import AppTestCase
+
+
+def sample(text, name):
+    """Return the value of the sample with the given name and labels"""
+    match = re.search(rf"^{re.escape(name)} (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+class TestHistogram(unittest.TestCase):
+
+    # Check observations land in every bucket at or above them
+    def test_buckets(self):
+        metrics = Metrics()
+        histogram = Histogram("latency", "Latency", ("endpoint",), (0.1, 1))
+        metrics.metrics = [histogram]
+        histogram.observe(0.05, "main.home")
+        histogram.observe(0.5, "main.home")
+        text = metrics.render()
+
+        self.assertIn("# TYPE latency histogram", text)
+        self.assertEqual(
+            sample(text, 'latency_bucket{endpoint="main.home",le="0.1"}'), 1
+        )
+        self.assertEqual(sample(text, 'latency_bucket{endpoint="main.home",le="1"}'), 2)
+        self.assertEqual(
+            sample(text, 'latency_bucket{endpoint="main.home",le="+Inf"}'), 2
+        )
+        self.assertEqual(sample(text, 'latency_sum{endpoint="main.home"}'), 0.55)
+        self.assertEqual(sample(text, 'latency_count{endpoint="main.home"}'), 2)
+
+
+class TestMetricsEndpoint(AppTestCase):
+
+    CONFIG = {
+        "COMPRESSION_LEVEL": 0,
+        "METRICS_ENABLED": True,
+        "METRICS_TOKEN": "scrape-secret",
+    }
+
+    def scrape(self):
+        return self.client.get(
+            "/metrics", headers={"Authorization": "Bearer scrape-secret"}
+        ).get_data(as_text=True)
+
+    # Check requests are counted with their latency, status and SQL queries
+    def test_request_metrics(self):
+        self.login(101)
+        self.client.get("/home")
+        self.client.get("/missing")
+        text = self.scrape()
+
+        home = '{endpoint="main.home",method="GET"}'
+        self.assertEqual(sample(text, f"epms_request_duration_seconds_count{home}"), 1)
+        self.assertEqual(
+            sample(
+                text,
+                'epms_responses_total{endpoint="main.home",method="GET",status="200"}',
+            ),
+            1,
+        )
+        self.assertEqual(
+            sample(
+                text, 'epms_responses_total{endpoint="None",method="GET",status="404"}'
+            ),
+            1,
+        )
+        self.assertEqual(
+            sample(text, 'epms_requests_in_flight{endpoint="main.home"}'), 0
+        )
+        # The metrics request itself is still in flight while it renders
+        self.assertEqual(sample(text, 'epms_requests_in_flight{endpoint="metrics"}'), 1)
+        self.assertGreater(
+            sample(text, 'epms_request_queries_sum{endpoint="main.home"}'), 0
+        )
+        self.assertGreater(sample(text, "epms_db_queries_total"), 0)
+
+    # Check pool, cache and admission stats are collected at render time
+    def test_collected_stats(self):
+        text = self.scrape()
+
+        self.assertIsNotNone(sample(text, "epms_db_pool_checkouts_total"))
+        self.assertEqual(sample(text, "epms_db_pool_size"), 5)
+        self.assertIsNotNone(sample(text, 'epms_cache_hits_total{cache="user_cache"}'))
+        self.assertEqual(
+            sample(text, 'epms_admission_rejected_total{endpoint="auth.login"}'), 0
+        )
+        self.assertEqual(text.count("# TYPE epms_cache_hits_total"), 1)
+
+    # Check the token is required to scrape
+    def test_token(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 404)
+        response = self.client.get(
+            "/metrics", headers={"Authorization": "Bearer wrong"}
+        )
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(
+            "/metrics", headers={"Authorization": "Bearer scrape-secret"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "text/plain")
+
+
+class TestMetricsConfig(AppTestCase):
+
+    # Check metrics are off unless enabled
+    def test_disabled_by_default(self):
+        self.assertNotIn("metrics", self.app.extensions)
+        self.assertEqual(self.client.get("/metrics").status_code, 404)
+
+    # Check metrics cannot be enabled without a token
+    def test_token_required(self):
+        with self.assertRaises(RuntimeError):
+            self.make_app({"METRICS_ENABLED": True, "METRICS_TOKEN": None})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, Employee, Review
+from app.pagination import decode_cursor, encode_cursor, keyset_page
+
+
+class TestKeysetPagination(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+
+        self.session.add(
+            Employee(
+                name="Jane Doe",
+                employee_number=1,
+                username="janedoe1234",
+                email="jane@example.com",
+                password="hashed_password",
+            )
+        )
+        # Two reviews share each date so the review_id tie-breaker is exercised
+        for review_id in range(1, 8):
+            self.session.add(
+                Review(
+                    review_id=review_id,
+                    employee_number=1,
+                    review_date=datetime(2024, 1, (review_id + 1) // 2),
+                    reviewer_id=1,
+                    overall_performance_rating="Good",
+                    goals="Goals for the review",
+                    reviewer_comments="Comments",
+                )
+            )
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def ids(self, page):
+        return [review.review_id for review in page.items]
+
+    def walk(self, sort_order):
+        """Follow next cursors until the last page and return each page's ids"""
+        pages = []
+        cursor = None
+        while True:
+            page = keyset_page(self.session.query(Review), sort_order, 3, after=cursor)
+            pages.append(self.ids(page))
+            cursor = page.next_cursor
+            if cursor is None:
+                return pages
+
+    # Check newest first pages through every review once
+    def test_newest_pages(self):
+        self.assertEqual(self.walk("newest"), [[7, 6, 5], [4, 3, 2], [1]])
+
+    # Check oldest first pages through every review once
+    def test_oldest_pages(self):
+        self.assertEqual(self.walk("oldest"), [[1, 2, 3], [4, 5, 6], [7]])
+
+    # Check the first page has no previous cursor
+    def test_first_page_has_no_prev(self):
+        page = keyset_page(self.session.query(Review), "newest", 3)
+        self.assertIsNone(page.prev_cursor)
+        self.assertIsNotNone(page.next_cursor)
+
+    # Check an empty cursor, as sent by ?after=, is treated as the first page
+    def test_empty_cursor_is_first_page(self):
+        page = keyset_page(self.session.query(Review), "newest", 3, after="")
+        self.assertEqual(self.ids(page), [7, 6, 5])
+        self.assertIsNone(page.prev_cursor)
+
+    # Check the previous cursor returns to the earlier page
+    def test_prev_cursor(self):
+        query = self.session.query(Review)
+        first = keyset_page(query, "newest", 3)
+        second = keyset_page(query, "newest", 3, after=first.next_cursor)
+        back = keyset_page(query, "newest", 3, before=second.prev_cursor)
+
+        self.assertEqual(self.ids(back), [7, 6, 5])
+        self.assertIsNone(back.prev_cursor)
+        self.assertEqual(back.next_cursor, first.next_cursor)
+
+    # Check cursors round trip and invalid cursors are rejected
+    def test_cursor_round_trip(self):
+        review = self.session.get(Review, 3)
+        self.assertEqual(
+            decode_cursor(encode_cursor(review)), (datetime(2024, 1, 2), 3)
+        )
+        with self.assertRaises(ValueError):
+            decode_cursor("not-a-cursor")
+
+
+if __name__ == "__main__":
+    unittest.main()
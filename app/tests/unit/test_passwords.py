@@ -0,0 +1,109 @@
+import unittest
+from werkzeug.security import generate_password_hash
+from app.database import get_session
+from app.models import Employee
+from app.passwords import PasswordHasher, normalize_method
+from app.tests.unit.base import AppTestCase
+
+
+class TestPasswordHasher(unittest.TestCase):
+
+    # Check hash methods are spelled out with Werkzeug's default cost
+    def test_normalize_method(self):
+        self.assertEqual(normalize_method("pbkdf2:sha256:1000"), "pbkdf2:sha256:1000")
+        self.assertEqual(normalize_method("pbkdf2:sha256"), "pbkdf2:sha256:1000000")
+        self.assertEqual(normalize_method("scrypt"), "scrypt:32768:8:1")
+
+    # Check hashes made inline verify and use the configured method
+    def test_inline_hash_and_verify(self):
+        hasher = PasswordHasher("pbkdf2:sha256:1000", workers=0)
+        pwhash = hasher.hash("Password123!")
+
+        self.assertTrue(pwhash.startswith("pbkdf2:sha256:1000$"))
+        self.assertTrue(hasher.verify(pwhash, "Password123!"))
+        self.assertFalse(hasher.verify(pwhash, "WrongPassword1!"))
+
+    # Check hashing in the process pool gives the same results
+    def test_pool_hash_and_verify(self):
+        hasher = PasswordHasher("pbkdf2:sha256:1000", workers=1, timeout=30)
+        try:
+            pwhash = hasher.hash("Password123!")
+            self.assertTrue(hasher.verify(pwhash, "Password123!"))
+        finally:
+            hasher.shutdown()
+
+    # Check only hashes weaker than the configured method or cost need rehashing
+    def test_needs_rehash(self):
+        hasher = PasswordHasher("pbkdf2:sha256:1000", workers=0)
+
+        self.assertFalse(hasher.needs_rehash(hasher.hash("Password123!")))
+        self.assertTrue(hasher.needs_rehash("pbkdf2:sha256:500$salt$hash"))
+        self.assertTrue(hasher.needs_rehash("pbkdf2:sha1:1000$salt$hash"))
+        self.assertFalse(hasher.needs_rehash("pbkdf2:sha256:2000$salt$hash"))
+        self.assertFalse(hasher.needs_rehash(generate_password_hash("Password123!")))
+
+    # Check scrypt hashes are compared by each cost parameter
+    def test_needs_rehash_scrypt(self):
+        hasher = PasswordHasher("scrypt", workers=0)
+
+        self.assertFalse(hasher.needs_rehash("scrypt:32768:8:1$salt$hash"))
+        self.assertFalse(hasher.needs_rehash("scrypt:65536:8:1$salt$hash"))
+        self.assertTrue(hasher.needs_rehash("scrypt:16384:8:1$salt$hash"))
+        self.assertTrue(hasher.needs_rehash("pbkdf2:sha256:1000000$salt$hash"))
+
+
+class TestLoginRehash(AppTestCase):
+
+    CONFIG = {
+        "PASSWORD_HASH_METHOD": "pbkdf2:sha256:2000",
+        "PASSWORD_HASH_WORKERS": 0,
+    }
+
+    def stored_hash(self):
+        with self.app.app_context():
+            return get_session().get(Employee, 101).password
+
+    def store_hash(self, method):
+        with self.app.app_context():
+            session = get_session()
+            employee = session.get(Employee, 101)
+            employee.password = generate_password_hash("Password123!", method)
+            session.commit()
+
+    # Check the seeded admin is hashed with the configured method
+    def test_seed_uses_configured_method(self):
+        self.assertTrue(self.stored_hash().startswith("pbkdf2:sha256:2000$"))
+
+    # Check a login with a weaker hash upgrades it to the configured method
+    def test_login_upgrades_hash(self):
+        self.store_hash("pbkdf2:sha256:500")
+
+        response = self.client.post(
+            "/login", data={"username": "johndoe1234", "password": "Password123!"}
+        )
+
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(self.stored_hash().startswith("pbkdf2:sha256:2000$"))
+
+    # Check a login never downgrades a stronger hash
+    def test_login_keeps_stronger_hash(self):
+        self.store_hash("scrypt")
+
+        response = self.client.post(
+            "/login", data={"username": "johndoe1234", "password": "Password123!"}
+        )
+
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(self.stored_hash().startswith("scrypt:"))
+
+    # Check a failed login leaves the hash untouched
+    def test_failed_login_keeps_hash(self):
+        self.store_hash("pbkdf2:sha256:500")
+        self.client.post(
+            "/login", data={"username": "johndoe1234", "password": "WrongPassword1!"}
+        )
+        self.assertTrue(self.stored_hash().startswith("pbkdf2:sha256:500$"))
+
+
+if __name__ == "__main__":
+    unittest.main()
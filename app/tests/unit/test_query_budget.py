@@ -0,0 +1,101 @@
+import unittest
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from app.database import get_session
+from app.models import Review
+from app.query_budget import (
+    QueryBudgetExceeded,
+    normalize_statement,
+    repeated_statements,
+)
+from app.tests.unit.base import AppTestCase
+from config import Config
+
+
+class TestRepeatedStatements(unittest.TestCase):
+
+    # Check statements differing only in parameters are counted together
+    def test_repeated(self):
+        statements = [
+            "SELECT * FROM employees WHERE employee_number = ?",
+            "SELECT *\nFROM employees WHERE employee_number = ?",
+            "SELECT * FROM employees WHERE employee_number = ?",
+            "SELECT * FROM reviews WHERE review_id IN (?, ?)",
+            "SELECT * FROM reviews WHERE review_id IN (?, ?, ?)",
+        ]
+
+        self.assertEqual(
+            normalize_statement(statements[4]),
+            "SELECT * FROM reviews WHERE review_id IN (?)",
+        )
+        self.assertEqual(
+            repeated_statements(statements, 3),
+            {"SELECT * FROM employees WHERE employee_number = ?": 3},
+        )
+
+
+class TestQueryBudget(AppTestCase):
+
+    CONFIG = {
+        "REVIEW_CARD_CACHE_SIZE": 0,
+        "REVIEWS_PER_PAGE": 100,
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.login(101)
+
+    def add_reviews(self, count):
+        with self.app.app_context():
+            session = get_session()
+            session.execute(
+                insert(Review),
+                [
+                    {
+                        "employee_number": 101,
+                        "review_date": datetime(2023, 1, 1) + timedelta(days=i),
+                        "reviewer_id": 101,
+                        "overall_performance_rating": "Good",
+                        "goals": f"Goal {i}",
+                        "reviewer_comments": "Good progress",
+                    }
+                    for i in range(count)
+                ],
+            )
+            session.commit()
+
+    # Check the home page stays within budget whatever the number of reviews
+    def test_home_within_budget(self):
+        counts = []
+        for extra_reviews in [1, 60]:
+            self.add_reviews(extra_reviews)
+            for url in ["/home", "/home?all_reviews=True"]:
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                counts.append(int(response.headers["X-Query-Count"]))
+
+        self.assertLessEqual(max(counts), self.app.config["QUERY_BUDGETS"]["main.home"])
+        self.assertEqual(counts[1], counts[3])
+
+    # Check a route loading rows one query at a time is flagged and fails its budget
+    def test_n_plus_one(self):
+        self.add_reviews(5)
+
+        def review_goals():
+            session = get_session()
+            return ",".join(session.get(Review, i).goals for i in range(1, 7))
+
+        self.app.add_url_rule("/review-goals", "review_goals", review_goals)
+        self.app.extensions["query_budget"].budgets["review_goals"] = 3
+
+        with self.assertLogs(self.app.logger, "WARNING") as logs:
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get("/review-goals")
+        self.assertIn("Possible N+1 on review_goals", logs.output[0])
+        self.assertIn("statement ran 6 times", logs.output[0])
+        # The budget added above stays with this app
+        self.assertNotIn("review_goals", Config.QUERY_BUDGETS)
+
+
+if __name__ == "__main__":
+    unittest.main()
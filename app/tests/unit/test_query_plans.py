@@ -0,0 +1,131 @@
+import unittest
+from datetime import datetime
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, Employee, Review
+from app.pagination import keyset_page
+
+
+class TestQueryPlans(unittest.TestCase):
+    """Check the hot queries in routes.py are served by an index, not a full scan"""
+
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+
+        self.session.add(
+            Employee(
+                name="Jane Doe",
+                employee_number=1,
+                username="janedoe1234",
+                email="jane@example.com",
+                password="hashed_password",
+            )
+        )
+        for day in range(1, 11):
+            self.session.add(
+                Review(
+                    employee_number=1,
+                    review_date=datetime(2024, 1, day),
+                    reviewer_id=day,
+                    overall_performance_rating="Good",
+                    goals="Goals for the review",
+                    reviewer_comments="Comments",
+                )
+            )
+        self.session.commit()
+        self.session.expunge_all()
+
+        # Record every statement the ORM sends so its plan can be inspected
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute", self.record)
+
+    def tearDown(self):
+        event.remove(self.engine, "before_cursor_execute", self.record)
+        self.session.close()
+        self.engine.dispose()
+
+    def record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append((statement, parameters))
+
+    def assert_uses_index(self, run):
+        """Run the code path and assert no statement it issued scans a whole table"""
+        self.statements.clear()
+        run()
+        statements = list(self.statements)
+        self.assertTrue(statements)
+
+        with self.engine.connect() as connection:
+            for statement, parameters in statements:
+                plan = [
+                    row[-1]
+                    for row in connection.exec_driver_sql(
+                        f"EXPLAIN QUERY PLAN {statement}", parameters
+                    )
+                ]
+                for step in plan:
+                    # A SCAN is only acceptable when it walks an index in order
+                    if step.startswith("SCAN"):
+                        self.assertIn("USING", step, f"{statement}\n{plan}")
+                    self.assertNotIn("TEMP B-TREE", step, f"{statement}\n{plan}")
+
+    def own_reviews(self):
+        return self.session.query(Review).filter_by(employee_number=1)
+
+    # Check home for an employee, newest and oldest, first and later pages
+    def test_home_own_reviews(self):
+        for sort_order in ("newest", "oldest"):
+            first = keyset_page(self.own_reviews(), sort_order, 3)
+            self.assert_uses_index(
+                lambda: keyset_page(self.own_reviews(), sort_order, 3)
+            )
+            self.assert_uses_index(
+                lambda: keyset_page(
+                    self.own_reviews(), sort_order, 3, after=first.next_cursor
+                )
+            )
+            self.assert_uses_index(
+                lambda: keyset_page(
+                    self.own_reviews(), sort_order, 3, before=first.next_cursor
+                )
+            )
+
+    # Check home for an admin viewing all reviews
+    def test_home_all_reviews(self):
+        for sort_order in ("newest", "oldest"):
+            first = keyset_page(self.session.query(Review), sort_order, 3)
+            self.assert_uses_index(
+                lambda: keyset_page(self.session.query(Review), sort_order, 3)
+            )
+            self.assert_uses_index(
+                lambda: keyset_page(
+                    self.session.query(Review), sort_order, 3, after=first.next_cursor
+                )
+            )
+
+    # Check update_review and delete_review look reviews up by primary key
+    def test_review_by_id(self):
+        self.assert_uses_index(lambda: self.session.query(Review).get(5))
+
+    # Check load_user and login look employees up by key
+    def test_employee_lookups(self):
+        self.assert_uses_index(lambda: self.session.query(Employee).get(1))
+        self.assert_uses_index(
+            lambda: self.session.query(Employee)
+            .filter_by(username="janedoe1234")
+            .first()
+        )
+
+    # Check reviews can be found by reviewer
+    def test_reviews_by_reviewer(self):
+        self.assert_uses_index(
+            lambda: self.session.query(Review)
+            .filter_by(reviewer_id=3)
+            .order_by(Review.review_date)
+            .all()
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+import unittest
+from unittest.mock import patch
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import get_session
+from app.models import Base, Employee, Review
+from app.search import (
+    build_match_query,
+    ensure_search_index,
+    like_snippet,
+    search_reviews,
+    search_reviews_like,
+)
+from app.tests.unit.base import AppTestCase
+
+
+class TestSearchReviews(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+
+        for employee_number in (1, 2):
+            self.session.add(
+                Employee(
+                    name="Jane Doe",
+                    employee_number=employee_number,
+                    username=f"janedoe{employee_number:04}",
+                    email=f"jane{employee_number}@example.com",
+                    password="hashed_password",
+                )
+            )
+        # Reviews written before the index exists are indexed when it is created
+        self.add_review(
+            1, "Take part in leadership opportunities", "Great <b>progress</b>"
+        )
+        self.session.commit()
+        with self.engine.begin() as connection:
+            ensure_search_index(connection)
+
+        self.add_review(1, "Improve presentation skills", "Presented well to leaders")
+        self.add_review(2, "Lead the migration project", "Strong leadership shown")
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def add_review(self, employee_number, goals, comments):
+        review = Review(
+            employee_number=employee_number,
+            review_date=datetime(2024, 1, 1),
+            reviewer_id=1,
+            overall_performance_rating="Good",
+            goals=goals,
+            reviewer_comments=comments,
+        )
+        self.session.add(review)
+        return review
+
+    def search(self, terms, employee_number=None):
+        return [
+            result.review.review_id
+            for result in search_reviews(self.session, terms, employee_number)
+        ]
+
+    # Check user input is quoted so FTS5 syntax is matched literally
+    def test_build_match_query(self):
+        self.assertEqual(build_match_query("lead* skills"), '"lead"* "skills"')
+        self.assertEqual(build_match_query('goals" OR NEAR('), '"goals" "OR" "NEAR"')
+        self.assertIsNone(build_match_query(" *** "))
+
+    # Check words are matched in either column, with stemming and prefixes
+    def test_match_and_prefix(self):
+        self.assertEqual(sorted(self.search("leadership")), [1, 3])
+        self.assertEqual(sorted(self.search("lead*")), [1, 2, 3])
+        self.assertEqual(self.search("presentation skills"), [2])
+        self.assertEqual(self.search("nothing"), [])
+
+    # Check results are limited to one employee's reviews when scoped
+    def test_scoped_to_employee(self):
+        self.assertEqual(self.search("leadership", employee_number=2), [3])
+
+    # Check the fallback for other databases matches every word in either column
+    def test_like_fallback(self):
+        def search(terms, employee_number=None):
+            return [
+                result.review.review_id
+                for result in search_reviews_like(self.session, terms, employee_number)
+            ]
+
+        self.assertEqual(search("LEADERSHIP"), [3, 1])
+        self.assertEqual(search("lead*"), [3, 2, 1])
+        self.assertEqual(search("presentation skills"), [2])
+        self.assertEqual(search("leadership", employee_number=1), [1])
+        self.assertEqual(search("100%_"), [])
+        self.assertEqual(search(" *** "), [])
+
+    # Check other databases are searched without FTS5
+    def test_other_dialect_uses_fallback(self):
+        with patch.object(self.engine.dialect, "name", "postgresql"):
+            results = search_reviews(self.session, "migration")
+        self.assertEqual([result.review.review_id for result in results], [3])
+        self.assertIsNone(results[0].rank)
+        self.assertEqual(
+            str(results[0].snippet), "Lead the <mark>migration</mark> project"
+        )
+
+    # Check fallback snippets cut long text around the first match
+    def test_like_snippet(self):
+        text = " ".join(f"word{i}" for i in range(30)) + " target end"
+        snippet = like_snippet(text, ["TARGET"])
+        self.assertTrue(snippet.startswith("…word24"))
+        self.assertIn(f"{chr(2)}target{chr(3)} end", snippet)
+        self.assertFalse(snippet.endswith("…"))
+
+    # Check snippets highlight matches and escape the review text
+    def test_snippet(self):
+        result = search_reviews(self.session, "progress", employee_number=1)[0]
+        self.assertIn("<mark>progress</mark>", result.snippet)
+        self.assertIn("&lt;b&gt;", result.snippet)
+
+    # Check edits and deletes are reflected in the index
+    def test_index_follows_changes(self):
+        review = self.session.get(Review, 2)
+        review.goals = "Mentor new starters"
+        self.session.commit()
+        self.assertEqual(self.search("mentor"), [2])
+        self.assertEqual(self.search("skills"), [])
+
+        self.session.delete(review)
+        self.session.commit()
+        self.assertEqual(self.search("mentor"), [])
+
+
+class TestSearchRoute(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        with self.app.app_context():
+            session = get_session()
+            session.add(
+                Employee(
+                    name="Jane Doe",
+                    employee_number=202,
+                    username="janedoe1234",
+                    email="jane@example.com",
+                    password="hashed_password",
+                )
+            )
+            session.commit()
+
+    # Check the seeded review is found by its author
+    def test_search_own_reviews(self):
+        self.login(101)
+        response = self.client.get("/search?q=leader*")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"1 result for", response.data)
+        self.assertIn(b"<mark>leadership</mark>", response.data)
+
+    # Check other employees cannot find reviews that are not theirs
+    def test_search_other_employee(self):
+        self.login(202)
+        response = self.client.get("/search?q=leadership&all_reviews=True")
+        self.assertIn(b"0 results for", response.data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+import io
+import unittest
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.bulk_import import import_reviews
+from app.models import Base, Employee, Review, ReviewSummary
+from app.summaries import ensure_review_summaries, rebuild_review_summaries
+
+
+class TestReviewSummaries(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+
+        for employee_number in (1, 2):
+            self.session.add(
+                Employee(
+                    name="Jane Doe",
+                    employee_number=employee_number,
+                    username=f"janedoe{employee_number:04}",
+                    email=f"jane{employee_number}@example.com",
+                    password="hashed_password",
+                )
+            )
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def add_review(self, employee_number, day, rating="Good"):
+        review = Review(
+            employee_number=employee_number,
+            review_date=datetime(2024, 1, day),
+            reviewer_id=1,
+            overall_performance_rating=rating,
+            goals="Goals for the review",
+            reviewer_comments="Comments",
+        )
+        self.session.add(review)
+        self.session.commit()
+        return review
+
+    def summaries(self):
+        """Return the summary table as comparable tuples"""
+        self.session.expire_all()
+        return [
+            (
+                summary.employee_number,
+                summary.excellent_count,
+                summary.good_count,
+                summary.needs_improvement_count,
+                summary.total_count,
+                summary.latest_review_date,
+            )
+            for summary in self.session.query(ReviewSummary).order_by(
+                ReviewSummary.employee_number
+            )
+        ]
+
+    def assert_matches_rebuild(self):
+        """Check the incrementally kept summaries equal a full recompute"""
+        maintained = self.summaries()
+        rebuild_review_summaries(self.session.connection())
+        self.session.commit()
+        self.assertEqual(maintained, self.summaries())
+
+    # Check creating reviews counts them and tracks the latest date
+    def test_create(self):
+        self.add_review(1, 5)
+        self.add_review(1, 3, "Excellent")
+        self.add_review(2, 1)
+
+        self.assertEqual(
+            self.summaries(),
+            [
+                (1, 1, 1, 0, 2, datetime(2024, 1, 5)),
+                (2, 0, 1, 0, 1, datetime(2024, 1, 1)),
+            ],
+        )
+        self.assert_matches_rebuild()
+
+    # Check changing the rating, date or employee of a review moves its counts
+    def test_update(self):
+        review = self.add_review(1, 5)
+        self.add_review(1, 3)
+
+        review.overall_performance_rating = "Needs Improvement"
+        self.session.commit()
+        self.assertEqual(self.summaries(), [(1, 0, 1, 1, 2, datetime(2024, 1, 5))])
+
+        review.review_date = datetime(2024, 1, 1)
+        self.session.commit()
+        self.assertEqual(self.summaries(), [(1, 0, 1, 1, 2, datetime(2024, 1, 3))])
+
+        review.employee_number = 2
+        self.session.commit()
+        self.assertEqual(
+            self.summaries(),
+            [
+                (1, 0, 1, 0, 1, datetime(2024, 1, 3)),
+                (2, 0, 0, 1, 1, datetime(2024, 1, 1)),
+            ],
+        )
+        self.assert_matches_rebuild()
+
+    # Check deleting the latest review falls back to the next newest
+    def test_delete(self):
+        latest = self.add_review(1, 5)
+        self.add_review(1, 3)
+
+        self.session.delete(latest)
+        self.session.commit()
+
+        self.assertEqual(self.summaries(), [(1, 0, 1, 0, 1, datetime(2024, 1, 3))])
+        self.assert_matches_rebuild()
+
+    # Check a rolled back change leaves the summaries untouched
+    def test_rollback(self):
+        self.add_review(1, 5)
+        self.session.add(
+            Review(
+                employee_number=1,
+                review_date=datetime(2024, 1, 9),
+                reviewer_id=1,
+                overall_performance_rating="Good",
+                goals="Goals for the review",
+                reviewer_comments="Comments",
+            )
+        )
+        self.session.flush()
+        self.session.rollback()
+
+        self.assertEqual(self.summaries(), [(1, 0, 1, 0, 1, datetime(2024, 1, 5))])
+
+    # Check bulk imported reviews are counted
+    def test_bulk_import(self):
+        self.add_review(1, 5)
+        stream = io.StringIO(
+            '{"employee_number": 1, "review_date": "2024-01-09", "reviewer_id": 1, '
+            '"overall_performance_rating": "Excellent", "goals": "Goals for the review", '
+            '"reviewer_comments": "Comments"}\n'
+        )
+        import_reviews(self.session, stream, "ndjson")
+
+        self.assertEqual(self.summaries(), [(1, 1, 1, 0, 2, datetime(2024, 1, 9))])
+        self.assert_matches_rebuild()
+
+    # Check summaries are built for existing reviews when the table is empty
+    def test_ensure_builds_missing_summaries(self):
+        self.add_review(1, 5)
+        with self.engine.begin() as connection:
+            connection.execute(ReviewSummary.__table__.delete())
+            ensure_review_summaries(connection)
+
+        self.assertEqual(self.summaries(), [(1, 0, 1, 0, 1, datetime(2024, 1, 5))])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import random
+import unittest
+from datetime import date
+from sqlalchemy import select
+from app.database import get_session
+from app.forms import COMMENTS_MAX_LENGTH, GOALS_MIN_LENGTH
+from app.models import Employee, Review, ReviewSummary
+from app.search import search_reviews
+from app.synthetic import RATING_WEIGHTS, generate_data, generate_reviews
+from app.tests.unit.base import AppTestCase
+
+
+class TestGenerateReviews(unittest.TestCase):
+
+    # Check the same seed gives the same reviews
+    def test_deterministic(self):
+        def reviews(seed):
+            rng = random.Random(seed)
+            return list(
+                generate_reviews(
+                    rng, [1, 2, 3], 50, date(2021, 1, 1), date(2025, 12, 31)
+                )
+            )
+
+        self.assertEqual(reviews(7), reviews(7))
+        self.assertNotEqual(reviews(7), reviews(8))
+
+    # Check generated values pass the Create Review form's rules
+    def test_valid(self):
+        rng = random.Random(0)
+        for review in generate_reviews(
+            rng, [1, 2, 3], 500, date(2021, 1, 1), date(2025, 12, 31)
+        ):
+            self.assertIn(review["overall_performance_rating"], RATING_WEIGHTS)
+            self.assertGreaterEqual(len(review["goals"]), GOALS_MIN_LENGTH)
+            self.assertLessEqual(len(review["reviewer_comments"]), COMMENTS_MAX_LENGTH)
+            self.assertNotEqual(review["reviewer_id"], review["employee_number"])
+            self.assertTrue(
+                date(2021, 1, 1) <= review["review_date"].date() <= date(2025, 12, 31)
+            )
+
+
+class TestGenerateData(AppTestCase):
+
+    # Check rows are inserted with summaries and the search index kept in sync
+    def test_generate(self):
+        with self.app.app_context():
+            session = get_session()
+            generate_data(session, "hash", employees=20, reviews=300, batch_size=64)
+
+            self.assertEqual(session.query(Employee).count(), 21)
+            self.assertEqual(session.query(Review).count(), 301)
+            self.assertEqual(
+                sum(session.scalars(select(ReviewSummary.total_count))), 301
+            )
+            self.assertTrue(search_reviews(session, "leadership"))
+
+            # Triggers are restored, so later writes are indexed again
+            session.add(
+                Review(
+                    employee_number=101,
+                    review_date=date(2025, 1, 1),
+                    reviewer_id=102,
+                    overall_performance_rating="Good",
+                    goals="Learn zymurgy for the brewing team",
+                    reviewer_comments="Keen",
+                )
+            )
+            session.commit()
+            self.assertEqual(len(search_reviews(session, "zymurgy")), 1)
+
+    # Check the command reports what it generated
+    def test_command(self):
+        result = self.app.test_cli_runner().invoke(
+            args=["generate-data", "--employees", "5", "--reviews", "40"]
+        )
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Generated 5 employees and 40 reviews", result.output)
+
+
+if __name__ == "__main__":
+    unittest.main()
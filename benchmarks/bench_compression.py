@@ -0,0 +1,113 @@
+"""Measure response size and compression CPU cost per gzip level and brotli quality
+
+Run from the root directory:
+
+    python -m benchmarks.bench_compression --reviews 500 --repeat 20
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app import compression, create_app
+from app import database
+from app.compression import CompressionMiddleware
+from app.database import get_session
+from app.models import Review
+
+# Responses measured, as an admin seeing every review
+PAGES = {
+    "home": "/home?all_reviews=True",
+    "api": "/api/reviews?all_reviews=True",
+    "export": "/export-reviews?format=csv",
+}
+
+
+def build_app(db_path, reviews):
+    """Create an app with the given number of reviews, all on one page"""
+    app = create_app(
+        {
+            "TESTING": True,
+            "SECRET_KEY": "benchmark",
+            # Measure the routes themselves, not load shedding
+            "ADMISSION_LIMITS": {},
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}",
+            "REVIEWS_PER_PAGE": reviews,
+            # Measure the raw bodies, compression is applied below
+            "COMPRESSION_LEVEL": 0,
+        }
+    )
+    start = datetime(2020, 1, 1)
+    with app.app_context():
+        session = get_session()
+        session.execute(
+            insert(Review),
+            [
+                {
+                    "employee_number": 101,
+                    "review_date": start + timedelta(days=i % 1500),
+                    "reviewer_id": 101 + i % 20,
+                    "overall_performance_rating": "Good",
+                    "goals": f"Goal {i}: take part in leadership opportunities.",
+                    "reviewer_comments": "Has shown great progress in their goals.",
+                }
+                for i in range(reviews)
+            ],
+        )
+        session.commit()
+    return app
+
+
+def fetch_bodies(app):
+    """Return the uncompressed body of each measured page"""
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = "101"
+        session["_fresh"] = True
+    return {name: client.get(url).data for name, url in PAGES.items()}
+
+
+def measure(middleware, body, encoding, repeat):
+    """Return (compressed bytes, CPU ms per compression)"""
+    start = time.process_time()
+    for _ in range(repeat):
+        compressed = middleware.compress(body, encoding)
+    return len(compressed), (time.process_time() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reviews", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, "bench.db"), args.reviews)
+        bodies = fetch_bodies(app)
+        app.extensions["password_hasher"].shutdown()
+        database.engine.dispose()
+
+    settings = [("gzip", level) for level in range(1, 10)]
+    if compression.brotli is not None:
+        settings += [("br", quality) for quality in (1, 4, 6, 9, 11)]
+    else:
+        print("Brotli is not installed, measuring gzip only")
+
+    print(f"{'page':>8} {'encoding':>9} {'bytes':>10} {'ratio':>7} {'cpu ms':>8}")
+    for name, body in bodies.items():
+        print(f"{name:>8} {'identity':>9} {len(body):>10} {1:>7.2f} {0:>8.2f}")
+        for encoding, level in settings:
+            middleware = CompressionMiddleware(None, level=level, brotli_quality=level)
+            size, cpu = measure(middleware, body, encoding, args.repeat)
+            label = f"{encoding}-{level}"
+            print(
+                f"{name:>8} {label:>9} {size:>10} {len(body) / size:>7.2f} {cpu:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
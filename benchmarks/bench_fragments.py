@@ -0,0 +1,93 @@
+"""Measure review card rendering with the fragment cache on and off
+
+Run from the root directory:
+
+    python -m benchmarks.bench_fragments --cards 1000 10000 --repeat 5
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from flask import render_template_string
+
+from app import create_app
+from app import database
+from app.models import Employee, Review
+
+# The review loop of home.html
+CARD_LOOP = "{% for review in reviews %}{{ review_card(review, user) }}{% endfor %}"
+
+
+def build_app(db_path, cache_size):
+    """Create an app on a fresh database with the given card cache size"""
+    return create_app(
+        {
+            "TESTING": True,
+            "SECRET_KEY": "benchmark",
+            # Measure the routes themselves, not load shedding
+            "ADMISSION_LIMITS": {},
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}",
+            "REVIEW_CARD_CACHE_SIZE": cache_size,
+        }
+    )
+
+
+def make_reviews(count):
+    """Build unsaved reviews with distinct ids, as loaded by the home page"""
+    start = datetime(2020, 1, 1)
+    return [
+        Review(
+            review_id=review_id,
+            employee_number=101 + review_id % 50,
+            review_date=start + timedelta(days=review_id % 1500),
+            reviewer_id=101,
+            overall_performance_rating="Good",
+            goals="Take part in leadership opportunities in the next term. " * 3,
+            reviewer_comments="Has shown great progress in their career goals.",
+            version_id=1,
+        )
+        for review_id in range(1, count + 1)
+    ]
+
+
+def render(app, user, reviews):
+    """Render every card once and return the elapsed seconds"""
+    with app.test_request_context("/home"):
+        start = time.perf_counter()
+        render_template_string(CARD_LOOP, reviews=reviews, user=user)
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    admin = Employee(employee_number=101, is_admin=True)
+    print(f"{'cards':>8} {'cache':>6} {'first ms':>10} {'p50 ms':>8} {'cards/s':>10}")
+    for count in args.cards:
+        reviews = make_reviews(count)
+        for cache_size in (0, count):
+            with tempfile.TemporaryDirectory() as tmp:
+                app = build_app(os.path.join(tmp, "bench.db"), cache_size)
+                # The first pass fills the cache when it is on
+                first = render(app, admin, reviews)
+                timings = [render(app, admin, reviews) for _ in range(args.repeat)]
+                median = statistics.median(timings)
+                print(
+                    f"{count:>8} {'on' if cache_size else 'off':>6} "
+                    f"{first * 1000:>10.1f} {median * 1000:>8.1f} "
+                    f"{count / median:>10.0f}"
+                )
+
+                app.extensions["password_hasher"].shutdown()
+                database.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""Closed-loop load test of a running server with a weighted mix of user flows
+
+Each worker process logs in as its own synthetic employee (see `flask
+generate-data`), then loops over home, create, edit and delete flows, picking
+each by weight and waiting for every response before the next request. Only
+servers on this machine are accepted.
+
+Run from the root directory against a server using the same database:
+
+    flask generate-data --employees 100 --reviews 10000
+    gunicorn -c gunicorn_config.py main:app &
+    python -m benchmarks.bench_load --users 8 --duration 30
+"""
+
+import argparse
+import http.client
+import multiprocessing
+import random
+import re
+import statistics
+import time
+import urllib.parse
+from datetime import date
+from http.cookies import SimpleCookie
+
+from sqlalchemy import create_engine, select
+
+from app.models import Employee
+from app.synthetic import SYNTHETIC_PASSWORD
+from config import Config
+
+LOCAL_HOSTS = {"127.0.0.1", "localhost", "::1"}
+CSRF_TOKEN = re.compile(r'name="csrf_token"\s+value="([^"]+)"')
+# Share of flows of each kind, overridden with --mix
+DEFAULT_MIX = {"home": 60, "create": 15, "edit": 15, "delete": 10}
+# Times a login is retried when the server sheds it with a 503
+LOGIN_ATTEMPTS = 10
+
+
+class Client:
+    """Keep-alive HTTP client holding one user's cookies"""
+
+    def __init__(self, host, port, timeout=30):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.cookies = SimpleCookie()
+        self.connection = None
+
+    def request(self, method, path, data=None):
+        """Return (status, body), reconnecting once if the server closed the socket"""
+        body = urllib.parse.urlencode(data) if data is not None else None
+        headers = {}
+        if body is not None:
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        if self.cookies:
+            headers["Cookie"] = "; ".join(
+                f"{name}={morsel.value}" for name, morsel in self.cookies.items()
+            )
+
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(
+                    self.host, self.port, timeout=self.timeout
+                )
+            try:
+                self.connection.request(method, path, body, headers)
+                response = self.connection.getresponse()
+                content = response.read()
+                break
+            except (http.client.HTTPException, ConnectionError):
+                self.connection.close()
+                self.connection = None
+                if attempt:
+                    raise
+
+        for header in response.headers.get_all("Set-Cookie") or []:
+            self.cookies.load(header)
+        return response.status, content.decode("utf-8", "replace")
+
+
+class VirtualUser:
+    """One logged in employee running flows and timing each request"""
+
+    def __init__(self, client, username, rng):
+        self.client = client
+        self.username = username
+        self.rng = rng
+        self.csrf_token = None
+        self.created = []
+        self.samples = []
+
+    def request(self, route, method, path, data=None, expect=(200,)):
+        start = time.perf_counter()
+        try:
+            status, body = self.client.request(method, path, data)
+        except (OSError, http.client.HTTPException):
+            status, body = None, ""
+        self.samples.append((route, time.perf_counter() - start, status in expect))
+        match = CSRF_TOKEN.search(body)
+        if match:
+            self.csrf_token = match.group(1)
+        return status, body
+
+    def login(self):
+        for _ in range(LOGIN_ATTEMPTS):
+            self.request("GET /login", "GET", "/login")
+            status, _ = self.request(
+                "POST /login",
+                "POST",
+                "/login",
+                {
+                    "csrf_token": self.csrf_token,
+                    "username": self.username,
+                    "password": SYNTHETIC_PASSWORD,
+                },
+                expect=(302,),
+            )
+            if status == 302:
+                return
+            # Shed by admission control, back off before trying again
+            time.sleep(self.rng.uniform(0.5, 2))
+        raise RuntimeError(f"Could not log in as {self.username}")
+
+    def review_form(self):
+        return {
+            "csrf_token": self.csrf_token,
+            "review_date": date.today().isoformat(),
+            "reviewer_id": "101",
+            "overall_performance_rating": self.rng.choice(
+                ["Excellent", "Good", "Satisfactory"]
+            ),
+            "goals": "Lead the quarterly planning sessions for the team.",
+            "reviewer_comments": "Load test review, safe to delete.",
+        }
+
+    def home(self):
+        sort = self.rng.choice(["newest", "oldest"])
+        self.request("GET /home", "GET", f"/home?sort={sort}")
+
+    def create(self):
+        self.request("GET /create-review", "GET", "/create-review")
+        status, _ = self.request(
+            "POST /create-review",
+            "POST",
+            "/create-review",
+            self.review_form(),
+            expect=(302,),
+        )
+        if status == 302:
+            # Dated today, so the new review leads the newest first list
+            _, body = self.request(
+                "GET /api/reviews", "GET", "/api/reviews?sort=newest"
+            )
+            ids = [
+                int(review_id)
+                for review_id in re.findall(r'"review_id":\s*(\d+)', body)
+            ]
+            if ids:
+                self.created.append(max(ids))
+
+    def edit(self):
+        if not self.created:
+            return self.create()
+        review_id = self.rng.choice(self.created)
+        self.request("GET /edit-review", "GET", f"/edit-review/{review_id}")
+        self.request(
+            "POST /edit-review",
+            "POST",
+            f"/edit-review/{review_id}",
+            self.review_form(),
+            expect=(302,),
+        )
+
+    def delete(self):
+        # Only reviews this user created, so the seeded data is left alone
+        if not self.created:
+            return self.create()
+        review_id = self.created.pop()
+        self.request(
+            "POST /delete-review",
+            "POST",
+            f"/delete-review/{review_id}",
+            {"csrf_token": self.csrf_token},
+            expect=(302,),
+        )
+
+
+def run_user(host, port, username, mix, seed, start_at, duration, results):
+    """Worker process: log in, then run flows until the duration has passed"""
+    rng = random.Random(seed)
+    user = VirtualUser(Client(host, port), username, rng)
+    samples = []
+    try:
+        user.login()
+        user.home()
+
+        # Start together once every user is logged in, so logins are not measured
+        time.sleep(max(0, start_at - time.time()))
+        user.samples = []
+        flows, weights = zip(*mix.items())
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            getattr(user, rng.choices(flows, weights)[0])()
+
+        # Clean up the reviews created during the run, outside the measurements
+        samples, user.samples = user.samples, []
+        while user.created:
+            user.delete()
+    finally:
+        # Always report, so the parent is never left waiting on a failed user
+        results.put(samples)
+
+
+def load_usernames(database_uri, count):
+    """Usernames of the first synthetic employees, skipping the seeded admin"""
+    engine = create_engine(database_uri)
+    with engine.connect() as connection:
+        usernames = connection.scalars(
+            select(Employee.username)
+            .where(Employee.is_admin.is_(False))
+            .order_by(Employee.employee_number)
+            .limit(count)
+        ).all()
+    engine.dispose()
+    if len(usernames) < count:
+        raise SystemExit(
+            f"Found {len(usernames)} synthetic employees, run "
+            f"`flask generate-data --employees {count}` first"
+        )
+    return usernames
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(","):
+        flow, weight = part.split("=")
+        if flow not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown flow {flow}")
+        mix[flow] = float(weight)
+    return mix
+
+
+def report(samples, duration):
+    """Print throughput, errors and latency percentiles per route"""
+    routes = {}
+    for route, latency, ok in samples:
+        routes.setdefault(route, []).append((latency, ok))
+
+    print(
+        f"{'route':<22} {'requests':>9} {'req/s':>8} {'errors':>7} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    for route, rows in sorted(routes.items()) + [
+        ("all", [(s[1], s[2]) for s in samples])
+    ]:
+        latencies = [latency * 1000 for latency, _ in rows]
+        errors = sum(1 for _, ok in rows if not ok)
+        cuts = (
+            statistics.quantiles(latencies, n=100)
+            if len(latencies) > 1
+            else latencies * 99
+        )
+        print(
+            f"{route:<22} {len(rows):>9} {len(rows) / duration:>8.1f} {errors:>7} "
+            f"{cuts[49]:>8.1f} {cuts[94]:>8.1f} {cuts[98]:>8.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--users", type=int, default=8, help="worker processes")
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=DEFAULT_MIX,
+        help="weights per flow, e.g. home=60,create=15,edit=15,delete=10",
+    )
+    parser.add_argument(
+        "--database",
+        default=Config.SQLALCHEMY_DATABASE_URI,
+        help="database of the server, to find synthetic employees",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    url = urllib.parse.urlsplit(args.url)
+    if url.scheme != "http" or url.hostname not in LOCAL_HOSTS:
+        parser.error("only http servers on 127.0.0.1 or localhost can be load tested")
+
+    usernames = load_usernames(args.database, args.users)
+    results = multiprocessing.Queue()
+    # Leave every user time to log in before the measured run starts
+    start_at = time.time() + 5 + args.users * 0.5
+    processes = [
+        multiprocessing.Process(
+            target=run_user,
+            args=(
+                url.hostname,
+                url.port or 80,
+                username,
+                args.mix,
+                args.seed + i,
+                start_at,
+                args.duration,
+                results,
+            ),
+        )
+        for i, username in enumerate(usernames)
+    ]
+    for process in processes:
+        process.start()
+    samples = []
+    for _ in processes:
+        samples.extend(results.get())
+    for process in processes:
+        process.join()
+
+    print(f"{args.users} users for {args.duration:.0f} s against {args.url}")
+    report(samples, args.duration)
+
+
+if __name__ == "__main__":
+    main()
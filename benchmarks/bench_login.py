@@ -0,0 +1,91 @@
+"""Measure login throughput as the password hashing pool grows
+
+Run from the root directory:
+
+    python -m benchmarks.bench_login --workers 0 1 2 4 --threads 8 --duration 10
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from app import create_app
+from app import database
+from config import Config
+
+USERNAME = "johndoe1234"
+PASSWORD = "Password123!"
+
+
+def build_app(db_path, method, workers):
+    """Create an app on a fresh database hashing with the given pool size"""
+    return create_app(
+        {
+            "TESTING": True,
+            "WTF_CSRF_ENABLED": False,
+            "SECRET_KEY": "benchmark",
+            # Measure the routes themselves, not load shedding
+            "ADMISSION_LIMITS": {},
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}",
+            "PASSWORD_HASH_METHOD": method,
+            "PASSWORD_HASH_WORKERS": workers,
+        }
+    )
+
+
+def login(app):
+    """Log the admin in with a fresh client and return the request latency"""
+    client = app.test_client()
+    start = time.perf_counter()
+    response = client.post("/login", data={"username": USERNAME, "password": PASSWORD})
+    assert response.status_code == 302, response.status_code
+    return time.perf_counter() - start
+
+
+def worker(app, deadline, latencies):
+    while time.perf_counter() < deadline:
+        latencies.append(login(app))
+
+
+def run(app, threads, duration):
+    """Return (logins per second, median latency) across the threads"""
+    latencies = []
+    deadline = time.perf_counter() + duration
+    pool = [
+        threading.Thread(target=worker, args=(app, deadline, latencies))
+        for _ in range(threads)
+    ]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return len(latencies) / duration, statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--method", default=Config.PASSWORD_HASH_METHOD)
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'logins/s':>10} {'p50 ms':>8}")
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as tmp:
+            app = build_app(os.path.join(tmp, "bench.db"), args.method, workers)
+            # Warm up the pool, the seeded hash already uses the benchmark method
+            login(app)
+
+            rate, median = run(app, args.threads, args.duration)
+            print(f"{workers:>8} {rate:>10.1f} {median * 1000:>8.1f}")
+
+            app.extensions["password_hasher"].shutdown()
+            database.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""Time the hot routes through the test client on seeded SQLite databases
+
+Each case runs against in-memory and file-backed databases seeded with every
+requested number of reviews, and the results are written as JSON so runs from
+two branches can be compared.
+
+Run from the root directory:
+
+    python -m benchmarks.bench_routes --reviews 1000 100000 1000000 --output main.json
+    python -m benchmarks.bench_routes --reviews 1000 100000 --compare main.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import insert, select
+
+from app import create_app
+from app import database
+from app.models import Employee, Review
+from app.summaries import rebuild_review_summaries
+
+ADMIN = 101
+RATINGS = ["Excellent", "Good", "Satisfactory", "Needs Improvement", "Unsatisfactory"]
+# Reviews inserted per executemany while seeding
+SEED_BATCH_SIZE = 10000
+# Login hashes with the production method, so it gets fewer iterations
+LOGIN_ITERATIONS = 10
+REVIEW_FORM = {
+    "review_date": "2024-06-01",
+    "reviewer_id": "102",
+    "overall_performance_rating": "Good",
+    "goals": "Lead the quarterly planning sessions.",
+    "reviewer_comments": "Benchmark review comments",
+}
+
+
+def database_uri(kind, tmp, reviews):
+    if kind == "memory":
+        return "sqlite:///:memory:"
+    return f"sqlite:///{os.path.join(tmp, f'bench-{reviews}.db')}"
+
+
+def build_app(uri):
+    """Create an app configured as in production, without CSRF or load shedding"""
+    return create_app(
+        {
+            "WTF_CSRF_ENABLED": False,
+            "SECRET_KEY": "benchmark",
+            # Measure the routes themselves, not load shedding
+            "ADMISSION_LIMITS": {},
+            "SQLALCHEMY_DATABASE_URI": uri,
+        }
+    )
+
+
+def seed(app, reviews):
+    """Add employees and reviews, about 100 reviews per employee"""
+    employees = max(10, min(reviews // 100, 10000))
+    employee_numbers = [ADMIN] + [1000 + i for i in range(employees - 1)]
+    start = date(2015, 1, 1)
+
+    with app.app_context():
+        session = database.get_session()
+        session.execute(
+            insert(Employee),
+            [
+                {
+                    "name": f"Employee {number}",
+                    "employee_number": number,
+                    "username": f"employee{number:06d}",
+                    "email": f"employee{number}@example.com",
+                    # Never logged in to, so no real hash is needed
+                    "password": "unused",
+                }
+                for number in employee_numbers[1:]
+            ],
+        )
+        for offset in range(0, reviews, SEED_BATCH_SIZE):
+            session.execute(
+                insert(Review),
+                [
+                    {
+                        "employee_number": employee_numbers[i % employees],
+                        "review_date": start + timedelta(days=i % 3650),
+                        "reviewer_id": employee_numbers[(i + 1) % employees],
+                        "overall_performance_rating": RATINGS[i % len(RATINGS)],
+                        "goals": f"Goal {i}: take part in leadership opportunities.",
+                        "reviewer_comments": "Has shown great progress in their goals.",
+                    }
+                    for i in range(offset, min(offset + SEED_BATCH_SIZE, reviews))
+                ],
+            )
+        rebuild_review_summaries(session.connection())
+        session.commit()
+
+
+def logged_in_client(app):
+    client = app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session["_user_id"] = str(ADMIN)
+        flask_session["_fresh"] = True
+    return client
+
+
+def time_calls(call, iterations, warmup=3):
+    """Return the latency of each call in ms, after a few untimed warm up calls"""
+    for _ in range(warmup):
+        call()
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def get(client, url, status=200):
+    def call():
+        response = client.get(url)
+        assert response.status_code == status, (url, response.status_code)
+
+    return call
+
+
+def post(client, url, data=None, status=302):
+    def call():
+        response = client.post(url, data=data)
+        assert response.status_code == status, (url, response.status_code)
+
+    return call
+
+
+def cases(app, iterations):
+    """Yield (name, latencies) for every benchmarked case"""
+    client = logged_in_client(app)
+
+    for scope, query in [("own", ""), ("all", "all_reviews=True&")]:
+        for sort in ["newest", "oldest"]:
+            url = f"/home?{query}sort={sort}"
+            yield f"home_{scope}_{sort}", time_calls(get(client, url), iterations)
+
+    # Reviews created here are updated then deleted, leaving the data as seeded
+    yield "create_review", time_calls(
+        post(client, "/create-review", REVIEW_FORM), iterations, warmup=0
+    )
+    with app.app_context():
+        review_ids = (
+            database.get_session()
+            .scalars(
+                select(Review.review_id)
+                .order_by(Review.review_id.desc())
+                .limit(iterations)
+            )
+            .all()
+        )
+    updates = iter(review_ids)
+    yield "update_review", time_calls(
+        lambda: post(client, f"/edit-review/{next(updates)}", REVIEW_FORM)(),
+        iterations,
+        warmup=0,
+    )
+    deletes = iter(review_ids)
+    yield "delete_review", time_calls(
+        lambda: post(client, f"/delete-review/{next(deletes)}")(),
+        iterations,
+        warmup=0,
+    )
+
+    # A fresh client per attempt, a logged in client is only redirected
+    yield "login", time_calls(
+        lambda: post(
+            app.test_client(),
+            "/login",
+            {"username": "johndoe1234", "password": "Password123!"},
+        )(),
+        min(iterations, LOGIN_ITERATIONS),
+        warmup=1,
+    )
+
+    # The user loader run by Flask-Login on every authenticated request
+    load_user = app.login_manager._user_callback
+    user_cache = app.extensions["user_cache"]
+    with app.test_request_context():
+        yield "load_user_cached", time_calls(lambda: load_user(str(ADMIN)), iterations)
+
+        def load_user_uncached():
+            user_cache.clear()
+            load_user(str(ADMIN))
+
+        yield "load_user_uncached", time_calls(load_user_uncached, iterations)
+
+
+def summarize(latencies):
+    cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies
+    return {
+        "iterations": len(latencies),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(cuts[94] if len(cuts) > 94 else max(latencies), 3),
+        "min_ms": round(min(latencies), 3),
+    }
+
+
+def environment():
+    """Describe the code and machine the results came from"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results, baseline_path):
+    """Print each case's p50 next to the same case in a baseline run"""
+    with open(baseline_path) as f:
+        baseline = {
+            (r["database"], r["reviews"], r["case"]): r for r in json.load(f)["results"]
+        }
+    print(
+        f"\n{'database':>8} {'reviews':>8} {'case':>20} {'base p50':>9} {'p50':>9} {'change':>8}"
+    )
+    for result in results:
+        key = (result["database"], result["reviews"], result["case"])
+        if key not in baseline:
+            continue
+        before, after = baseline[key]["p50_ms"], result["p50_ms"]
+        change = f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+        print(
+            f"{key[0]:>8} {key[1]:>8} {key[2]:>20} {before:>9.3f} {after:>9.3f} {change:>8}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--reviews", type=int, nargs="+", default=[1000, 100000, 1000000]
+    )
+    parser.add_argument(
+        "--databases", nargs="+", choices=["memory", "file"], default=["memory", "file"]
+    )
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON results of a baseline run")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'database':>8} {'reviews':>8} {'case':>20} {'p50 ms':>8} {'p95 ms':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for kind in args.databases:
+            for reviews in args.reviews:
+                app = build_app(database_uri(kind, tmp, reviews))
+                start = time.perf_counter()
+                seed(app, reviews)
+                seed_seconds = time.perf_counter() - start
+
+                for case, latencies in cases(app, args.iterations):
+                    result = {
+                        "database": kind,
+                        "reviews": reviews,
+                        "case": case,
+                        **summarize(latencies),
+                    }
+                    results.append(result)
+                    print(
+                        f"{kind:>8} {reviews:>8} {case:>20} "
+                        f"{result['p50_ms']:>8.3f} {result['p95_ms']:>8.3f}"
+                    )
+                print(
+                    f"{kind:>8} {reviews:>8} {'(seeded in)':>20} {seed_seconds:>8.1f}s"
+                )
+
+                app.extensions["password_hasher"].shutdown()
+                database.engine.dispose()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {"environment": environment(), "args": vars(args), "results": results},
+                f,
+                indent=2,
+            )
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
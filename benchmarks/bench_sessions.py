@@ -0,0 +1,105 @@
+"""Measure /home throughput as the number of worker threads grows
+
+Run from the root directory:
+
+    python -m benchmarks.bench_sessions --threads 1 2 4 8 --duration 5
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from app import create_app
+from app import database
+from app.models import Employee, Review
+
+EMPLOYEE_NUMBER = 101
+
+
+def build_app(db_path, review_count):
+    """Create an app on a file-backed SQLite database seeded with reviews"""
+    app = create_app(
+        {
+            "TESTING": True,
+            "WTF_CSRF_ENABLED": False,
+            "SECRET_KEY": "benchmark",
+            # Measure the routes themselves, not load shedding
+            "ADMISSION_LIMITS": {},
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}",
+        }
+    )
+    with app.app_context():
+        session = database.get_session()
+        if session.query(Review).count() < review_count:
+            start = date(2020, 1, 1)
+            session.add_all(
+                Review(
+                    employee_number=EMPLOYEE_NUMBER,
+                    review_date=start + timedelta(days=i),
+                    reviewer_id=1,
+                    overall_performance_rating="Good",
+                    goals="Benchmark review goals",
+                    reviewer_comments="Benchmark review comments",
+                )
+                for i in range(review_count)
+            )
+            session.commit()
+        assert session.get(Employee, EMPLOYEE_NUMBER) is not None
+    return app
+
+
+def worker(app, deadline, counts, index):
+    """Issue /home requests as the admin until the deadline passes"""
+    client = app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session["_user_id"] = str(EMPLOYEE_NUMBER)
+        flask_session["_fresh"] = True
+
+    done = 0
+    while time.perf_counter() < deadline:
+        response = client.get("/home")
+        assert response.status_code == 200, response.status_code
+        done += 1
+    counts[index] = done
+
+
+def run(app, threads, duration):
+    """Return requests per second achieved by the given number of threads"""
+    counts = [0] * threads
+    deadline = time.perf_counter() + duration
+    pool = [
+        threading.Thread(target=worker, args=(app, deadline, counts, i))
+        for i in range(threads)
+    ]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return sum(counts) / duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--reviews", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, "bench.db"), args.reviews)
+
+        print(f"{'threads':>8} {'req/s':>10} {'speedup':>8}")
+        baseline = None
+        for threads in args.threads:
+            rate = run(app, threads, args.duration)
+            baseline = baseline or rate
+            print(f"{threads:>8} {rate:>10.1f} {rate / baseline:>8.2f}")
+
+        database.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -14,8 +14,131 @@ class Config:
         "DATABASE_URL", f"sqlite:///{os.path.join(APP_DIR, 'instance', 'epmstore.db')}"
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Skip schema creation and seeding at startup, run `flask init-db` once instead
+    FAST_BOOT = os.getenv("FAST_BOOT", "False").lower() == "true"
+
+    # Log every SQL statement, only switch on when diagnosing queries
+    SQLALCHEMY_ECHO = os.getenv("SQLALCHEMY_ECHO", "False").lower() == "true"
+
+    # Connection pool sizing
+    SQLALCHEMY_POOL_SIZE = int(os.getenv("SQLALCHEMY_POOL_SIZE", 5))
+    SQLALCHEMY_MAX_OVERFLOW = int(os.getenv("SQLALCHEMY_MAX_OVERFLOW", 10))
+    SQLALCHEMY_POOL_PRE_PING = True
+    # Seconds before a pooled connection is replaced
+    SQLALCHEMY_POOL_RECYCLE = int(os.getenv("SQLALCHEMY_POOL_RECYCLE", 1800))
+
+    # SQLite pragmas applied to every new connection
+    SQLITE_JOURNAL_MODE = "WAL"
+    SQLITE_SYNCHRONOUS = "NORMAL"
+    # Milliseconds to wait on a locked database before raising
+    SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", 5000))
+    SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+    # Negative values are in KiB, i.e. a 64MB page cache
+    SQLITE_CACHE_SIZE = -64000
     WTF_CSRF_ENABLED = True
 
+    # Password hash method and cost, e.g. scrypt:65536:8:1 or pbkdf2:sha256:1000000.
+    # Defaults to Werkzeug's. Stored hashes with a weaker method or lower cost are
+    # upgraded at the next login, stronger ones are kept
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt")
+    # Processes hashing passwords off the request thread, 0 hashes inline
+    PASSWORD_HASH_WORKERS = int(
+        os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1))
+    )
+    # Seconds to wait for a hash before failing the request
+    PASSWORD_HASH_TIMEOUT = int(os.getenv("PASSWORD_HASH_TIMEOUT", 30))
+
+    # Employees cached by the login user loader. Changes are evicted in-process,
+    # the TTL bounds how stale another worker's copy can be
+    USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 1024))
+    USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", 300))
+    # Seconds before a worker reloads the usernames and emails it checks
+    # availability against. New employees are added in-process straight away
+    AVAILABILITY_REFRESH_INTERVAL = int(os.getenv("AVAILABILITY_REFRESH_INTERVAL", 60))
+
+    # Cache lifetime of fingerprinted static assets, a year as their names change
+    # with their content
+    ASSETS_MAX_AGE = int(os.getenv("ASSETS_MAX_AGE", 31536000))
+
+    # Response compression: gzip level 1-9 (0 disables compression), brotli
+    # quality 0-11 when the Brotli package is installed, and the smallest body
+    # worth compressing in bytes
+    COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 500))
+
+    # Rendered review cards cached per review version and viewer role, 0 disables
+    REVIEW_CARD_CACHE_SIZE = int(os.getenv("REVIEW_CARD_CACHE_SIZE", 4096))
+
+    # Number of review cards shown per page on the home page
+    REVIEWS_PER_PAGE = int(os.getenv("REVIEWS_PER_PAGE", 24))
+    # Maximum number of results returned by review search
+    SEARCH_RESULTS_LIMIT = int(os.getenv("SEARCH_RESULTS_LIMIT", 50))
+    # Maximum number of review ids accepted by one API multi-get
+    API_MAX_REVIEW_IDS = int(os.getenv("API_MAX_REVIEW_IDS", 100))
+
+    # Admission control for expensive routes, per worker process: concurrent and
+    # queued requests per route, see EXPENSIVE_REQUESTS in app/admission.py
+    ADMISSION_LIMITS = {
+        "auth.login": (
+            int(os.getenv("ADMISSION_LOGIN_LIMIT", 2)),
+            int(os.getenv("ADMISSION_LOGIN_QUEUE", 4)),
+        ),
+        "auth.register": (
+            int(os.getenv("ADMISSION_REGISTER_LIMIT", 1)),
+            int(os.getenv("ADMISSION_REGISTER_QUEUE", 2)),
+        ),
+        "main.home": (
+            int(os.getenv("ADMISSION_ALL_REVIEWS_LIMIT", 1)),
+            int(os.getenv("ADMISSION_ALL_REVIEWS_QUEUE", 2)),
+        ),
+        "api.list_reviews": (
+            int(os.getenv("ADMISSION_ALL_REVIEWS_LIMIT", 1)),
+            int(os.getenv("ADMISSION_ALL_REVIEWS_QUEUE", 2)),
+        ),
+        "main.export_reviews": (int(os.getenv("ADMISSION_EXPORT_LIMIT", 1)), 0),
+        "api.check_availability": (
+            int(os.getenv("ADMISSION_AVAILABILITY_LIMIT", 2)),
+            int(os.getenv("ADMISSION_AVAILABILITY_QUEUE", 4)),
+        ),
+    }
+    # Optional cap on expensive requests running or queued at once across all
+    # routes, 0 for none. When set it must be at least every route's limit plus
+    # queue, or that route's queue could never fill
+    ADMISSION_TOTAL_LIMIT = int(os.getenv("ADMISSION_TOTAL_LIMIT", 0))
+    # Seconds a queued request waits for a slot before it is shed
+    ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 2))
+    # Seconds clients are told to wait before retrying a shed request
+    ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", 5))
+
+    # Serve request, database and cache metrics for Prometheus at /metrics. Off
+    # by default, and enabling it needs METRICS_TOKEN, which scrapers must send
+    # as a bearer token. Metrics are kept per worker process, so each scrape
+    # reports whichever gunicorn worker answers it
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "False").lower() == "true"
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+    # Count the SQL statements of each request, always on in debug and tests,
+    # where a route over its budget fails the request
+    QUERY_BUDGET_ENABLED = os.getenv("QUERY_BUDGET_ENABLED", "False").lower() == "true"
+    # Most SQL statements each route may run, whatever the number of rows shown
+    QUERY_BUDGETS = {
+        "main.home": 3,
+        "main.search": 3,
+        "main.review_summary": 2,
+        # The API selects review keys for the ETag, then the text only on a miss
+        "api.list_reviews": 3,
+        "api.get_review": 3,
+        "api.get_reviews": 3,
+        # One INSERT, duplicates are caught by the unique constraints
+        "auth.register": 1,
+        # Served from memory, one SELECT when the index is (re)loaded
+        "api.check_availability": 1,
+    }
+    # Runs of the same statement in one request reported as a likely N+1
+    QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", 3))
+
     # Use the environment variable for SECRET_KEY, fallback to None if not set
     SECRET_KEY = os.getenv(
         "SECRET_KEY"
@@ -0,0 +1,105 @@
+"""Gunicorn settings for production, used with `gunicorn -c gunicorn_config.py main:app`
+
+Every setting can be overridden with a GUNICORN_* environment variable.
+"""
+
+import os
+
+
+def cpu_count():
+    """CPUs this process may use, honouring affinity and cgroup v2 quotas"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    # Containers limited with --cpus report the host CPUs above
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def memory_mb():
+    """Memory available to this process in MB, honouring cgroup v2 limits"""
+    total = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+
+    try:
+        with open("/sys/fs/cgroup/memory.max") as f:
+            limit = f.read().strip()
+        if limit != "max":
+            total = min(total, int(limit))
+    except (OSError, ValueError):
+        pass
+    return total // (1024 * 1024)
+
+
+def worker_count(cpus, memory, worker_memory, hash_workers=0, hash_worker_memory=0):
+    """2 * CPUs + 1 workers, fewer if they and their hash pools would not fit"""
+    per_worker = worker_memory + hash_workers * hash_worker_memory
+    return max(1, min(2 * cpus + 1, memory // per_worker))
+
+
+def post_fork(server, worker):
+    """Drop database connections inherited from the master process
+
+    With preload_app the app, and so its engine pools, are created before the
+    fork. Sharing a pooled connection between processes corrupts it, so each
+    worker discards the inherited connections without closing them for the
+    parent and opens its own.
+    """
+    from app import database
+
+    if database.engine is not None:
+        database.engine.dispose(close=False)
+
+
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', 5000)}")
+
+# gthread serves each worker's requests from a thread pool, gevent from greenlets
+# (install gevent first, SQLite calls still block the worker while they run)
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+# Every worker starts its own password hashing pool. Default to one process each,
+# the workers already cover the CPUs. Set before the app is loaded and reads it
+hash_workers = int(os.environ.setdefault("PASSWORD_HASH_WORKERS", "1"))
+# Expected resident memory of one worker and of one of its hashing processes
+# (an scrypt hash alone needs 32MB), used to cap the worker count
+worker_memory_mb = int(os.getenv("GUNICORN_WORKER_MEMORY_MB", 128))
+hash_worker_memory_mb = int(os.getenv("GUNICORN_HASH_WORKER_MEMORY_MB", 64))
+workers = int(
+    os.getenv(
+        "GUNICORN_WORKERS",
+        worker_count(
+            cpu_count(),
+            memory_mb(),
+            worker_memory_mb,
+            hash_workers,
+            hash_worker_memory_mb,
+        ),
+    )
+)
+# Threads per gthread worker, keep within the engine's pool size plus overflow
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+# Concurrent clients per gevent worker
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 1000))
+
+# Load the app once in the master so workers share its memory and start faster
+preload_app = os.getenv("GUNICORN_PRELOAD", "True").lower() == "true"
+
+# Seconds an idle client connection is kept open, above the proxy's idle timeout
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+# Seconds a worker may stay silent before it is killed and replaced
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+# Seconds in-flight requests get to finish on restart or shutdown
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+# Recycle workers after this many requests, jittered so they do not all restart
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+# Set to "-" to log each request to stdout
+accesslog = os.getenv("GUNICORN_ACCESS_LOG")
+errorlog = "-"